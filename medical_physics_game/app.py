@@ -1,3 +1,5 @@
+import os
+
 from flask import Flask, render_template, jsonify
 
 def create_app(config_name='development'):
@@ -6,14 +8,46 @@ def create_app(config_name='development'):
                template_folder='frontend/templates')
     
     # Load configuration
-    if config_name == 'development':
-        app.config['DEBUG'] = True
-        app.config['SECRET_KEY'] = 'dev-secret-key'
+    config_modules = {'development': 'development', 'production': 'production',
+                      'test': 'test', 'testing': 'test'}
+    if config_name in config_modules:
+        app.config.from_object(f'config.{config_modules[config_name]}')
+    
+    # Behind reverse proxies, trust only the X-Forwarded-* hops they append
+    proxy_hops = int(app.config.get('PROXY_FIX_HOPS') or os.environ.get('PROXY_FIX_HOPS', 0))
+    if proxy_hops > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops, x_proto=proxy_hops)
     
     # Register blueprints - MUST import here to avoid circular imports
     from backend.api.routes import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    from backend.api.feedback_routes import feedback_bp
+    app.register_blueprint(feedback_bp, url_prefix='/api')
+    
+    # Request metrics, exposed at /metrics
+    from backend.utils.metrics import init_metrics
+    init_metrics(app)
+    
+    # Admission control for the write endpoints
+    from backend.utils.rate_limiter import init_rate_limiting
+    init_rate_limiting(app)
+    
+    # Keep generated floors ready before runs ask for them
+    from backend.core.floor_pool import init_floor_pool
+    init_floor_pool(app)
+    
+    # Session storage, swept for abandoned runs where the config enables it
+    from backend.core.session_registry import init_session_reaper, init_session_store
+    init_session_store(app)
+    init_session_reaper(app)
+    
+    # Spawn the run builder's workers now where the config asks for it,
+    # otherwise on the first prebuilt run
+    from backend.core.run_builder import init_run_builder
+    init_run_builder(app)
+    
     # Test route to verify the app is working
     @app.route('/test')
     def test():
@@ -0,0 +1,206 @@
+"""
+ASGI entry point for the Medical Physics Game.
+
+Serves the same Flask blueprints as wsgi.py on the async bridge's thread
+pool, so Flask requests run concurrently as under gunicorn's threaded
+workers, and handles the streaming endpoints natively on the event loop,
+so idle SSE and long-poll connections cost a coroutine rather than a thread:
+
+    uvicorn asgi:app --workers 4
+
+Channels are session IDs; every GameState change of a session is published
+on its channel. Events are numbered per channel: SSE clients resume with the
+Last-Event-ID header and long-poll clients pass the cursor of their previous
+response, so events published between two requests are not lost.
+"""
+
+import asyncio
+import json
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app import create_app
+from backend.utils.async_bridge import event_broker, run_sync
+
+STREAM_PREFIX = '/api/stream/'
+POLL_PREFIX = '/api/poll/'
+HEARTBEAT_INTERVAL = 15
+MAX_POLL_TIMEOUT = 60
+
+
+class ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    """WSGI request runner that uses the bridge pool instead of asgiref's single sync thread"""
+
+    async def run_wsgi_app(self, body):
+        # asgiref wraps run_wsgi_app in a thread-sensitive sync_to_async, which
+        # serializes every request of the process on one thread
+        await run_sync(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func, self, body)
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi adapter running requests concurrently on the bridge pool"""
+
+    async def __call__(self, scope, receive, send):
+        await ThreadPoolWsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+flask_app = create_app('production')
+wsgi_app = ThreadPoolWsgiToAsgi(flask_app)
+
+
+async def _wait_for_disconnect(receive):
+    """Consume request messages until the client goes away"""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode('ascii'))]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def stream_events(channel, cursor, receive, send):
+    """Server-sent event stream of everything published on a channel after a cursor"""
+    queue = event_broker.subscribe(channel)
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream'),
+                        (b'cache-control', b'no-cache')]
+        })
+
+        # Replay what the client missed since its last event; the queue may
+        # hold some of the same events, which are skipped below
+        if cursor is None:
+            cursor = event_broker.last_event(channel)
+        for number, event in event_broker.events_since(channel, cursor):
+            await send({'type': 'http.response.body', 'body': _sse_chunk(number, event),
+                        'more_body': True})
+            cursor = number
+
+        while not disconnect.done():
+            next_event = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({next_event, disconnect},
+                                         timeout=HEARTBEAT_INTERVAL,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if next_event in done:
+                number, event = next_event.result()
+                if number <= cursor:
+                    continue
+                if number > cursor + 1:
+                    # The queue overflowed; catch up from the channel buffer
+                    missed = event_broker.events_since(channel, cursor)
+                else:
+                    missed = [(number, event)]
+                chunk = b''.join(_sse_chunk(n, e) for n, e in missed)
+                cursor = max(number, missed[-1][0]) if missed else number
+            else:
+                next_event.cancel()
+                if disconnect in done:
+                    break
+                chunk = b": heartbeat\n\n"
+
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnect.cancel()
+        event_broker.unsubscribe(channel, queue)
+
+
+def _sse_chunk(number, event):
+    return f"id: {number}\ndata: {json.dumps(event)}\n\n".encode('utf-8')
+
+
+async def poll_event(channel, cursor, timeout, receive, send):
+    """
+    Long-poll for the events published on a channel after a cursor.
+
+    Responds at once with any buffered events newer than the cursor, or with
+    the next event to arrive; 204 when the timeout expires first. The JSON
+    body carries the cursor to poll with next.
+    """
+    next_cursor, events = await event_broker.wait_for_events(channel, cursor, timeout)
+    if not events:
+        await send({'type': 'http.response.start', 'status': 204,
+                    'headers': [(b'x-event-cursor', str(next_cursor).encode('ascii'))]})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    await _send_json(send, 200, {'cursor': next_cursor,
+                                 'events': [event for _, event in events]})
+
+
+def _query_params(scope):
+    params = {}
+    for pair in scope.get('query_string', b'').decode('latin-1').split('&'):
+        key, _, value = pair.partition('=')
+        if key:
+            params[key] = value
+    return params
+
+
+def _poll_timeout(params):
+    """Parse ?timeout=N, clamped to MAX_POLL_TIMEOUT"""
+    try:
+        return max(0.0, min(float(params.get('timeout', 25.0)), MAX_POLL_TIMEOUT))
+    except ValueError:
+        return 25.0
+
+
+def _cursor(value):
+    """Parse an event cursor; None (only new events) when absent or malformed"""
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _last_event_id(scope):
+    for name, value in scope.get('headers', []):
+        if name.lower() == b'last-event-id':
+            return value.decode('latin-1')
+    return None
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    path = scope.get('path', '')
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        if path.startswith(STREAM_PREFIX) and len(path) > len(STREAM_PREFIX):
+            params = _query_params(scope)
+            cursor = _cursor(_last_event_id(scope) or params.get('cursor'))
+            await stream_events(path[len(STREAM_PREFIX):], cursor, receive, send)
+            return
+        if path.startswith(POLL_PREFIX) and len(path) > len(POLL_PREFIX):
+            params = _query_params(scope)
+            await poll_event(path[len(POLL_PREFIX):], _cursor(params.get('cursor')),
+                             _poll_timeout(params), receive, send)
+            return
+
+    await wsgi_app(scope, receive, send)
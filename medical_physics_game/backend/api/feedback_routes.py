@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
+from backend.utils.logging import GameLogger
 
 feedback_bp = Blueprint('feedback', __name__)
+logger = GameLogger()
 
 @feedback_bp.route('/feedback', methods=['POST'])
 def submit_feedback():
@@ -20,7 +22,7 @@ def submit_feedback():
     }
     
     # Log the feedback
-    print(f"Feedback received: {feedback['category']} - Rating: {feedback['rating']}")
+    logger.info(f"Feedback received: {feedback['category']} - Rating: {feedback['rating']}", logger_name='api')
     
     # Store the feedback (placeholder for actual repository call)
     # FeedbackRepository.add_feedback(feedback)
@@ -47,7 +49,7 @@ def submit_bug_report():
     }
     
     # Log the bug report
-    print(f"Bug report: {bug_report['description']}")
+    logger.info(f"Bug report: {bug_report['description']}", logger_name='api')
     
     # Store the bug report (placeholder for actual repository call)
     # FeedbackRepository.add_bug_report(bug_report)
@@ -0,0 +1,233 @@
+"""
+Event log for the Medical Physics Game.
+Records every state mutation of a run as an ordered, sequence-numbered
+event and writes a full snapshot every few events, so the run can be
+rebuilt at any point from the nearest snapshot plus a short replay.
+"""
+
+import json
+import os
+
+from backend.utils.db_utils import get_data_path
+from backend.utils.save_format import SaveFormatError, decode_save, encode_save
+from backend.utils.save_writer import get_background_saver
+
+# Events between two snapshots, bounding the replay needed for any rebuild
+SNAPSHOT_INTERVAL = 50
+
+
+class EventLog:
+    """
+    Append-only event stream and snapshots for one run.
+
+    Each snapshot starts a new event segment file, so replaying from a
+    snapshot reads only the segments after it rather than the whole stream.
+
+    A log holds the stream of a single owner: GameState change records and
+    EventSystem events are different record kinds, numbered independently,
+    and cannot be replayed from a shared stream.
+    """
+
+    def __init__(self, run_id, directory=None, snapshot_interval=SNAPSHOT_INTERVAL, saver=None):
+        """
+        Initialize the log and pick up where an existing stream left off.
+
+        Args:
+            run_id (str): Run identifier, used as the directory name
+            directory (str, optional): Directory holding event logs,
+                defaults to <data>/events
+            snapshot_interval (int, optional): Events between snapshots
+            saver (BackgroundSaver, optional): Writer for the log files
+        """
+        safe_id = ''.join(c for c in str(run_id) if c.isalnum() or c in '-_')
+        self.run_id = run_id
+        self.run_dir = os.path.join(directory or os.path.join(get_data_path(), 'events'), safe_id)
+        self.snapshot_interval = snapshot_interval
+        self.saver = saver or get_background_saver()
+        self.owner = None
+
+        # Anything still queued for this run must land before we scan it
+        self.saver.flush()
+        self.snapshot_seqs = self._list_files('.sav')
+        self.segments = self._list_files('.events')
+        self.segment_start = max(self.segments[-1:] + self.snapshot_seqs[-1:] + [0])
+        self.last_seq = self._read_last_seq()
+
+    def _list_files(self, extension):
+        try:
+            names = os.listdir(self.run_dir)
+        except FileNotFoundError:
+            return []
+        stems = (name[:-len(extension)] for name in names if name.endswith(extension))
+        return sorted(int(stem) for stem in stems if stem.isdigit())
+
+    def _path(self, seq, extension):
+        return os.path.join(self.run_dir, f'{seq:010d}{extension}')
+
+    def _read_last_seq(self):
+        last_seq = self.segment_start
+        for event in self._read_segment(self.segment_start):
+            last_seq = max(last_seq, event['seq'])
+        return last_seq
+
+    def claim(self, owner):
+        """
+        Reserve the log for the object that writes its stream.
+
+        Args:
+            owner (object): GameState or EventSystem writing to this log
+
+        Raises:
+            ValueError: If another object already writes to this log
+        """
+        if self.owner is not None and self.owner is not owner:
+            raise ValueError(f"Event log of run {self.run_id!r} is already written by "
+                             f"a {type(self.owner).__name__}")
+        self.owner = owner
+
+    @property
+    def last_snapshot_seq(self):
+        """int: Sequence number of the newest snapshot, or -1 if there is none"""
+        return self.snapshot_seqs[-1] if self.snapshot_seqs else -1
+
+    def append(self, event):
+        """
+        Add an event to the end of the stream.
+
+        Args:
+            event (dict): Event data; a 'seq' key is assigned here
+
+        Returns:
+            int: Sequence number of the event, or None if it could not be written
+        """
+        event = dict(event, seq=self.last_seq + 1)
+        try:
+            line = json.dumps(event, separators=(',', ':')) + '\n'
+        except (TypeError, ValueError):
+            return None
+
+        path = self._path(self.segment_start, '.events')
+        if self.saver.append(path, line.encode('utf-8')).success is False:
+            return None
+        if self.segment_start not in self.segments:
+            self.segments.append(self.segment_start)
+        self.last_seq = event['seq']
+        return self.last_seq
+
+    def needs_snapshot(self):
+        """Check whether enough events have accumulated since the last snapshot"""
+        return self.last_seq - self.last_snapshot_seq >= self.snapshot_interval
+
+    def write_snapshot(self, state, seq=None):
+        """
+        Store the full state as of an event.
+
+        Args:
+            state (dict): Serialized state after the event was applied
+            seq (int, optional): Event the state reflects, defaults to the last one
+
+        Returns:
+            bool: True if the snapshot was queued (or written, in sync mode)
+        """
+        seq = self.last_seq if seq is None else seq
+        try:
+            blob = encode_save(state)
+        except (TypeError, ValueError):
+            return False
+
+        if self.saver.write(self._path(seq, '.sav'), blob).success is False:
+            return False
+        if seq not in self.snapshot_seqs:
+            self.snapshot_seqs.append(seq)
+            self.snapshot_seqs.sort()
+        if seq == self.last_seq:
+            # Events after this snapshot go to a fresh segment
+            self.segment_start = seq
+        return True
+
+    def _read_segment(self, start):
+        events = []
+        try:
+            with open(self._path(start, '.events'), 'r') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-append; drop the tail
+                        break
+        except FileNotFoundError:
+            pass
+        return events
+
+    def read_events(self, after=0, until=None):
+        """
+        Read events in sequence order.
+
+        Args:
+            after (int, optional): Return only events with a larger sequence number
+            until (int, optional): Return only events up to this sequence number
+
+        Returns:
+            list: Event dicts
+        """
+        self.saver.flush()
+
+        events = []
+        segments = sorted(self.segments)
+        for i, start in enumerate(segments):
+            if until is not None and start >= until:
+                break
+            # Segment i holds the events after its start up to the next segment's
+            if i + 1 < len(segments) and segments[i + 1] <= after:
+                continue
+            for event in self._read_segment(start):
+                seq = event.get('seq', 0)
+                if seq > after and (until is None or seq <= until):
+                    events.append(event)
+        return events
+
+    def load_snapshot(self, at_seq=None):
+        """
+        Load the newest snapshot taken at or before an event.
+
+        Args:
+            at_seq (int, optional): Event to rebuild up to, defaults to the last one
+
+        Returns:
+            tuple: (snapshot seq, state dict), or (None, None) if no snapshot qualifies
+        """
+        self.saver.flush()
+
+        for seq in reversed(self.snapshot_seqs):
+            if at_seq is not None and seq > at_seq:
+                continue
+            try:
+                with open(self._path(seq, '.sav'), 'rb') as f:
+                    return seq, decode_save(f.read())
+            except (FileNotFoundError, SaveFormatError):
+                # A snapshot lost in a crash; fall back to an older one
+                continue
+        return None, None
+
+    def rebuild(self, restore, apply, at_seq=None):
+        """
+        Rebuild state from the nearest snapshot plus the events after it.
+
+        Args:
+            restore (callable): Called with the snapshot dict to reset the state
+            apply (callable): Called with each later event in order
+            at_seq (int, optional): Event to stop after, defaults to the last one
+
+        Returns:
+            int: Sequence number the state reflects, or None without a snapshot
+        """
+        snapshot_seq, snapshot = self.load_snapshot(at_seq)
+        if snapshot is None:
+            return None
+
+        restore(snapshot)
+        seq = snapshot_seq
+        for event in self.read_events(after=snapshot_seq, until=at_seq):
+            apply(event)
+            seq = event['seq']
+        return seq
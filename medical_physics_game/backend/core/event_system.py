@@ -1,14 +1,50 @@
 # backend/core/event_system.py
+import copy
 from datetime import datetime
 
+from backend.utils.async_bridge import event_broker
+
 class EventSystem:
-    def __init__(self, game_state):
+    def __init__(self, game_state, event_log=None, channel=None):
         self.game_state = game_state
         self.event_queue = []
         self.event_history = []
+        # Optional EventLog every processed event is streamed to, used by no other writer
+        if event_log is not None:
+            event_log.claim(self)
+        self.event_log = event_log
+        # Optional event broker channel every processed event is published on
+        self.channel = channel
+        self._replaying = False
+        if event_log is not None and not event_log.snapshot_seqs:
+            # Baseline the stream so it can be replayed from the start
+            self.snapshot()
+        
+    @classmethod
+    def rebuild(cls, event_log, at_seq=None):
+        """Rebuild a game state dict from an event log, up to an optional event"""
+        system = cls({})
+        
+        def restore(snapshot):
+            system.game_state = snapshot
+            
+        def apply(event):
+            system._replay_event(event)
+            
+        if event_log.rebuild(restore, apply, at_seq) is None:
+            return None
+        return system.game_state
+        
+    def snapshot(self):
+        """Write the current game state to the event log as a snapshot"""
+        if self.event_log is not None:
+            self.event_log.write_snapshot(copy.deepcopy(self.game_state))
         
     def queue_event(self, event_type, data=None):
         """Add an event to the queue"""
+        if self._replaying:
+            # Follow-up events are in the log themselves and replay on their own
+            return
         event = {
             'type': event_type,
             'data': data or {},
@@ -23,6 +59,23 @@ class EventSystem:
             self._process_event(event)
             self.event_history.append(event)
             
+            if self.event_log is not None:
+                event['seq'] = self.event_log.append(event)
+                if self.event_log.needs_snapshot():
+                    self.snapshot()
+                    
+            if self.channel is not None:
+                event_broker.publish(self.channel, event)
+                    
+    def _replay_event(self, event):
+        """Apply a logged event without queueing its follow-up events"""
+        self._replaying = True
+        try:
+            self._process_event(event)
+        finally:
+            self._replaying = False
+        self.event_history.append(event)
+            
     def _process_event(self, event):
         """Process a single event"""
         event_type = event['type']
@@ -0,0 +1,226 @@
+"""
+Floor graph for the Medical Physics Game.
+Stores a floor as parallel arrays indexed by integer node number, with
+CSR adjacency (one offsets array plus one flat targets array), a hashed
+edge set for constant-time adjacency checks and a cached start node. Node objects are only built at the edges, when a
+caller asks for one, so a floor costs a few arrays rather than a Node,
+three dicts and a list per node.
+"""
+
+import sys
+from array import array
+
+from backend.data.models.node import Node
+
+
+class FloorGraph:
+    """Compact, read-only, indexed view of a floor's nodes."""
+
+    __slots__ = ('ids', 'index', 'types', 'rows', 'cols', 'int_cols', 'offsets', 'targets',
+                 'edges', 'metadata', '_extra', 'start_index')
+
+    def __init__(self, nodes=None):
+        """
+        Build the graph.
+
+        Args:
+            nodes (list, optional): Node objects making up the floor
+        """
+        self._build([(node.id, node.type, node.position, node.connections, node.metadata)
+                     for node in nodes or ()])
+
+    @classmethod
+    def from_dicts(cls, node_dicts):
+        """
+        Build the graph straight from serialized Node dictionaries.
+
+        Args:
+            node_dicts (list): Node dictionaries as produced by Node.to_dict
+
+        Returns:
+            FloorGraph: New graph
+        """
+        graph = cls.__new__(cls)
+        graph._build([(data.get('id'), data.get('type', 'generic'), data.get('position'),
+                       data.get('connections', []), data.get('metadata'))
+                      for data in node_dicts])
+        return graph
+
+    def _build(self, records):
+        self.ids = tuple(record[0] for record in records)
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+        # Type names repeat across every floor; intern them so runs share one copy
+        self.types = tuple(sys.intern(record[1]) for record in records)
+        self.rows = array('h')
+        # Generated floors spread nodes over fractional columns, so columns are
+        # doubles, with a flag per node to give integer columns back as ints
+        self.cols = array('d')
+        self.int_cols = bytearray()
+        self.offsets = array('I', [0])
+        self.targets = array('I')
+        # Positions that are not plain row/col grids and connections to nodes
+        # outside the floor are rare; keep them aside so round trips stay exact
+        self._extra = {}
+
+        metadata = []
+        for i, (_, _, position, connections, node_metadata) in enumerate(records):
+            position = position or {}
+            row, col = position.get('row'), position.get('col')
+            if (isinstance(row, int) and isinstance(col, (int, float))
+                    and not isinstance(col, bool) and len(position) == 2):
+                self.rows.append(row)
+                self.cols.append(col)
+                self.int_cols.append(isinstance(col, int))
+            else:
+                self.rows.append(0)
+                self.cols.append(0)
+                self.int_cols.append(1)
+                self._extra[('position', i)] = dict(position)
+
+            dangling = []
+            for target in connections or ():
+                j = self.index.get(target)
+                if j is None:
+                    dangling.append(target)
+                else:
+                    self.targets.append(j)
+            if dangling:
+                self._extra[('connections', i)] = list(connections)
+            self.offsets.append(len(self.targets))
+
+            metadata.append(node_metadata or None)
+        self.metadata = tuple(metadata)
+        # Edge i -> j keyed as one int (targets are 32-bit), so is_connected is a set lookup
+        self.edges = frozenset((i << 32) | j for i in range(len(self.ids))
+                               for j in self.targets[self.offsets[i]:self.offsets[i + 1]])
+
+        self.start_index = next((i for i, node_type in enumerate(self.types) if node_type == 'start'),
+                                0 if self.ids else None)
+
+    @property
+    def start_id(self):
+        """str: ID of the 'start' node, or of the first node if there is none"""
+        return None if self.start_index is None else self.ids[self.start_index]
+
+    def index_of(self, node_id):
+        """Get a node's integer index, or None if it is not on this floor"""
+        return self.index.get(node_id)
+
+    def neighbors(self, i):
+        """Get the indexes of the nodes reachable from node i"""
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def col(self, i):
+        """Get the column of node i, as the int or float it was given as"""
+        return int(self.cols[i]) if self.int_cols[i] else self.cols[i]
+
+    def position(self, i):
+        """Get the position dict of node i"""
+        extra = self._extra.get(('position', i))
+        return dict(extra) if extra is not None else {'row': self.rows[i], 'col': self.col(i)}
+
+    def connections(self, i):
+        """Get the connected node IDs of node i"""
+        extra = self._extra.get(('connections', i))
+        if extra is not None:
+            return list(extra)
+        return [self.ids[j] for j in self.neighbors(i)]
+
+    def node_dict(self, i):
+        """Serialize node i in the Node.to_dict format"""
+        return {
+            'id': self.ids[i],
+            'type': self.types[i],
+            'position': self.position(i),
+            'connections': self.connections(i),
+            'metadata': dict(self.metadata[i] or {}),
+            'visited': False
+        }
+
+    def node(self, i):
+        """Build a Node object for node i"""
+        return Node(self.ids[i], self.types[i], self.position(i),
+                    connections=self.connections(i), metadata=dict(self.metadata[i] or {}))
+
+    @property
+    def nodes(self):
+        """tuple: Node objects of the whole floor, built on every access"""
+        return tuple(self.node(i) for i in range(len(self.ids)))
+
+    def get(self, node_id):
+        """
+        Get a node by ID.
+
+        Args:
+            node_id (str): Node ID to find
+
+        Returns:
+            Node: Node object if found, None otherwise
+        """
+        i = self.index.get(node_id)
+        return None if i is None else self.node(i)
+
+    def is_connected(self, from_id, to_id):
+        """
+        Check whether an edge leads from one node to another.
+
+        Args:
+            from_id (str): Source node ID
+            to_id (str): Destination node ID
+
+        Returns:
+            bool: True if the edge exists
+        """
+        i = self.index.get(from_id)
+        j = self.index.get(to_id)
+        if i is None or j is None:
+            return False
+        return ((i << 32) | j) in self.edges
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+
+class VisitedSet:
+    """Per-run visited flags over a floor's node indexes, as a bitset plus visit order."""
+
+    __slots__ = ('bits', 'order')
+
+    def __init__(self, size=0):
+        """
+        Initialize an empty set.
+
+        Args:
+            size (int, optional): Number of nodes on the floor; the set grows if needed
+        """
+        self.bits = bytearray((size + 7) // 8)
+        self.order = array('I')
+
+    def add(self, i):
+        """
+        Mark node i as visited.
+
+        Returns:
+            bool: True if the node was not visited before
+        """
+        byte, bit = divmod(i, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        if self.bits[byte] & (1 << bit):
+            return False
+        self.bits[byte] |= 1 << bit
+        self.order.append(i)
+        return True
+
+    def __contains__(self, i):
+        byte = i >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (i & 7)))
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
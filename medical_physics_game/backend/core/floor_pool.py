@@ -0,0 +1,268 @@
+"""
+Floor pool for the Medical Physics Game.
+Keeps a few generated and validated layouts ready for every generated
+floor in maps/floors.json, refilled by a background thread, so starting
+a run or entering the next floor takes a ready map instead of paying for
+generation and validation on the request path.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from backend.core.map_geometry import layout_geometry
+from backend.core.map_generator import fallback_floor_layout, validate_map
+from backend.core.map_prefabs import generate_layout
+
+# Layouts kept ready per floor
+DEFAULT_POOL_DEPTH = 8
+
+# Generation attempts before giving up on producing a valid layout
+MAX_ATTEMPTS = 5
+
+# Window over which the refill rate is measured, in seconds
+RATE_WINDOW = 60.0
+
+
+class FloorPool:
+    """Per-floor queues of ready layouts with a background refill thread."""
+
+    def __init__(self, depth=None, generate=generate_layout, validate=validate_map):
+        """
+        Initialize the pool.
+
+        Args:
+            depth (int, optional): Layouts kept ready per floor, defaults to the
+                FLOOR_POOL_DEPTH environment variable or DEFAULT_POOL_DEPTH
+            generate (callable, optional): Layout generator (floor_number, floor_data)
+            validate (callable, optional): Layout validator returning a bool
+        """
+        self.depth = int(depth or os.environ.get('FLOOR_POOL_DEPTH', DEFAULT_POOL_DEPTH))
+        self.generate = generate
+        self.validate = validate
+
+        self._floors = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._refill_times = deque(maxlen=1000)
+
+    def _floor(self, floor_number, floor_data):
+        """Get the pool entry of a floor, resetting it if its configuration changed"""
+        entry = self._floors.get(floor_number)
+        if entry is None or entry['config'] != floor_data:
+            entry = self._floors[floor_number] = {
+                'config': floor_data,
+                'layouts': deque(),
+                'stats': {'hits': 0, 'misses': 0, 'generated': 0, 'rejected': 0, 'fallbacks': 0}
+            }
+        return entry
+
+    def prime(self, floor_configs):
+        """
+        Register floors to keep layouts ready for.
+
+        Args:
+            floor_configs (dict): Floor configurations keyed by floor number;
+                authored floors (with a 'nodes' list) are skipped
+        """
+        with self._condition:
+            for floor_number, floor_data in floor_configs.items():
+                if not floor_data.get('nodes'):
+                    self._floor(floor_number, floor_data)
+            self._condition.notify_all()
+
+    def _generate_valid(self, floor_number, floor_data, entry):
+        """Generate layouts until one validates, falling back to a layout that is valid by construction"""
+        generated = rejected = 0
+        layout = None
+        for _ in range(MAX_ATTEMPTS):
+            candidate = self.generate(floor_number, floor_data)
+            generated += 1
+            if self.validate(candidate):
+                layout = candidate
+                break
+            rejected += 1
+
+        with self._condition:
+            stats = entry['stats']
+            stats['generated'] += generated
+            stats['rejected'] += rejected
+            if layout is None:
+                stats['fallbacks'] += 1
+        return layout if layout is not None else fallback_floor_layout(floor_number, floor_data)
+
+    def take(self, floor_number, floor_data):
+        """
+        Take a ready layout for a floor, generating one inline if the pool is empty.
+
+        Args:
+            floor_number (int): Floor number
+            floor_data (dict): Floor configuration
+
+        Returns:
+            dict: Validated layout, owned by the caller
+        """
+        with self._condition:
+            entry = self._floor(floor_number, floor_data)
+            layout = entry['layouts'].popleft() if entry['layouts'] else None
+            entry['stats']['hits' if layout is not None else 'misses'] += 1
+            self._condition.notify_all()
+
+        if layout is None:
+            layout = self._generate_valid(floor_number, floor_data, entry)
+        self.start()
+        return layout
+
+    def ready(self, floor_number):
+        """Get the number of layouts ready for a floor"""
+        with self._condition:
+            entry = self._floors.get(floor_number)
+            return len(entry['layouts']) if entry else 0
+
+    def wait_full(self, timeout=None):
+        """
+        Wait until every known floor has a full pool.
+
+        Returns:
+            bool: True if the pools filled before the timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(self._all_full, timeout)
+
+    def _all_full(self):
+        return all(len(entry['layouts']) >= self.depth for entry in self._floors.values())
+
+    def _next_to_refill(self):
+        """Pick the floor with the fewest ready layouts, or None if all are full"""
+        candidates = [(len(entry['layouts']), floor_number)
+                      for floor_number, entry in self._floors.items()
+                      if len(entry['layouts']) < self.depth]
+        return min(candidates)[1] if candidates else None
+
+    def start(self):
+        """Start the refill thread if it is not running"""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='floor-pool', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the refill thread"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopping or self._next_to_refill() is not None)
+                if self._stopping:
+                    return
+                floor_number = self._next_to_refill()
+                entry = self._floors[floor_number]
+
+            # Generate and lay out outside the lock so takers are never blocked behind it
+            layout = self._generate_valid(floor_number, entry['config'], entry)
+            layout_geometry(layout)
+
+            with self._condition:
+                # Drop the layout if the floor was reconfigured meanwhile
+                if self._floors.get(floor_number) is entry and len(entry['layouts']) < self.depth:
+                    entry['layouts'].append(layout)
+                    self._refill_times.append(time.monotonic())
+                self._condition.notify_all()
+
+    def refill_rate(self):
+        """Get the layouts added to the pool per second over the last RATE_WINDOW"""
+        cutoff = time.monotonic() - RATE_WINDOW
+        with self._condition:
+            recent = sum(1 for t in self._refill_times if t >= cutoff)
+        return recent / RATE_WINDOW
+
+    def get_stats(self):
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: Depth, per-floor readiness and counters, and refill rate
+        """
+        with self._condition:
+            floors = {floor_number: dict(entry['stats'], ready=len(entry['layouts']))
+                      for floor_number, entry in self._floors.items()}
+        return {'depth': self.depth, 'floors': floors, 'refill_rate': self.refill_rate()}
+
+    def collect_metrics(self):
+        """Pool depth and refill counters as metrics for the /metrics endpoint"""
+        from backend.utils.metrics import Counter, Gauge
+
+        ready = Gauge('floor_pool_ready', 'Pre-generated layouts ready per floor', ('floor',))
+        takes = Counter('floor_pool_takes_total', 'Layouts taken from the pool by outcome',
+                        ('floor', 'outcome'))
+        generated = Counter('floor_pool_generated_total', 'Layouts generated, including rejected ones',
+                            ('floor',))
+        rejected = Counter('floor_pool_rejected_total', 'Generated layouts that failed validation',
+                           ('floor',))
+        fallbacks = Counter('floor_pool_fallbacks_total', 'Fallback layouts served after generation kept failing',
+                            ('floor',))
+        rate = Gauge('floor_pool_refill_rate', 'Layouts added to the pool per second')
+
+        stats = self.get_stats()
+        for floor_number, floor_stats in stats['floors'].items():
+            floor = str(floor_number)
+            ready.set(floor, value=floor_stats['ready'])
+            takes.inc(floor, 'hit', amount=floor_stats['hits'])
+            takes.inc(floor, 'miss', amount=floor_stats['misses'])
+            generated.inc(floor, amount=floor_stats['generated'])
+            rejected.inc(floor, amount=floor_stats['rejected'])
+            fallbacks.inc(floor, amount=floor_stats['fallbacks'])
+        rate.set(value=stats['refill_rate'])
+        return [ready, takes, generated, rejected, fallbacks, rate]
+
+
+# Global pool instance
+_floor_pool = None
+_pool_lock = threading.Lock()
+
+def get_floor_pool():
+    """
+    Get the global floor pool, registering its metrics on first use.
+
+    Returns:
+        FloorPool: Global floor pool
+    """
+    global _floor_pool
+    if _floor_pool is None:
+        with _pool_lock:
+            if _floor_pool is None:
+                from backend.utils.metrics import MetricsRegistry
+                _floor_pool = FloorPool()
+                MetricsRegistry().add_collector('floor_pool', _floor_pool.collect_metrics)
+    return _floor_pool
+
+
+def init_floor_pool(app):
+    """
+    Start pre-generating layouts for every generated floor of floors.json.
+
+    Args:
+        app (Flask): Application whose config may set FLOOR_POOL_DEPTH
+
+    Returns:
+        FloorPool: The global floor pool
+    """
+    from backend.core.floor_templates import FloorTemplateRegistry
+
+    pool = get_floor_pool()
+    if app.config.get('FLOOR_POOL_DEPTH'):
+        pool.depth = int(app.config['FLOOR_POOL_DEPTH'])
+    pool.prime(FloorTemplateRegistry.get_floor_configs())
+    pool.start()
+    return pool
@@ -0,0 +1,299 @@
+"""
+Floor templates for the Medical Physics Game.
+Parses maps/floors.json once and shares each authored floor, read-only,
+across every run. Seeded floors (daily challenges, reruns) are shared the
+same way through a bounded cache keyed by seed. Runs keep only their own
+overlay (visited nodes and resolved node content) on top of the shared
+template.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from backend.core.floor_graph import FloorGraph
+from backend.data.models.node import Node
+from backend.utils.db_utils import get_data_path
+
+# Seeded floor templates kept in memory; evicted ones are regenerated from their seed
+SEEDED_CACHE_SIZE = 256
+
+
+class FloorTemplate:
+    """Immutable floor layout; never modified by the runs that share it."""
+
+    __slots__ = ('key', 'graph', 'config', '_geometry')
+
+    def __init__(self, nodes, key=None, config=None, geometry=None):
+        """
+        Initialize the template.
+
+        Args:
+            nodes (list or FloorGraph): Node objects making up the floor,
+                or an already built graph
+            key (str, optional): Registry key for shared templates, None for
+                templates private to one run
+            config (dict, optional): Floor configuration the template came from
+            geometry (dict, optional): Drawing coordinates already computed
+                for the floor, see map_geometry
+        """
+        self.key = key
+        self.graph = nodes if isinstance(nodes, FloorGraph) else FloorGraph(nodes)
+        self.config = config or {}
+        self._geometry = geometry
+
+    @classmethod
+    def from_node_dicts(cls, node_dicts, key=None, config=None):
+        """Create a template from serialized Node dictionaries"""
+        return cls(FloorGraph.from_dicts(node_dicts), key, config)
+
+    @classmethod
+    def from_layout(cls, layout, key=None, config=None):
+        """Create a template from a map_generator layout, keeping its cached geometry"""
+        return cls(layout_to_nodes(layout), key, config, layout.get('geometry'))
+
+    @property
+    def nodes(self):
+        """tuple: Node objects of the floor"""
+        return self.graph.nodes
+
+    @property
+    def geometry(self):
+        """dict: Crossing-reduced drawing coordinates, computed once per template"""
+        if self._geometry is None:
+            from backend.core.map_geometry import graph_geometry
+            self._geometry = graph_geometry(self.graph)
+        return self._geometry
+
+    def node_dicts(self):
+        """Serialize the template's nodes"""
+        return [self.graph.node_dict(i) for i in range(len(self.graph))]
+
+    def __len__(self):
+        return len(self.graph)
+
+
+def layout_to_nodes(layout):
+    """
+    Convert a generated layout to Node objects.
+
+    Args:
+        layout (dict): Layout produced by map_generator.generate_floor_layout
+
+    Returns:
+        list: Node objects, start first and boss last
+    """
+    node_dicts = [layout['start']] + list(layout.get('nodes', {}).values())
+    if layout.get('boss'):
+        node_dicts.append(layout['boss'])
+
+    nodes = []
+    for node_data in node_dicts:
+        metadata = {key: node_data[key] for key in ('title', 'description', 'difficulty')
+                    if key in node_data}
+        nodes.append(Node(
+            id=node_data['id'],
+            type=node_data.get('type', 'generic'),
+            position=node_data.get('position', {'row': 0, 'col': 0}),
+            connections=list(node_data.get('paths', [])),
+            metadata=metadata
+        ))
+    return nodes
+
+
+class FloorTemplateRegistry:
+    """Process-wide cache of floor configurations and shared templates."""
+
+    _floor_configs = None
+    _templates = {}
+    _seeded = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _load_floor_configs(cls):
+        """Load and index maps/floors.json by floor number"""
+        floor_path = os.path.join(get_data_path(), 'maps', 'floors.json')
+        try:
+            with open(floor_path, 'r') as f:
+                floors_data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            floors_data = []
+
+        if isinstance(floors_data, dict):
+            floors_data = floors_data.get('floors', [])
+
+        configs = {}
+        for floor_data in floors_data:
+            floor_number = floor_data.get('floor', floor_data.get('id'))
+            if floor_number is not None:
+                configs[int(floor_number)] = floor_data
+        return configs
+
+    @classmethod
+    def get_floor_configs(cls):
+        """
+        Get every floor configuration.
+
+        Returns:
+            dict: Floor configurations keyed by floor number
+        """
+        if cls._floor_configs is None:
+            with cls._lock:
+                if cls._floor_configs is None:
+                    cls._floor_configs = cls._load_floor_configs()
+        return cls._floor_configs
+
+    @classmethod
+    def get_floor_config(cls, floor_number):
+        """
+        Get the configuration of one floor.
+
+        Args:
+            floor_number (int): Floor number
+
+        Returns:
+            dict: Floor configuration, or None if the floor does not exist
+        """
+        return cls.get_floor_configs().get(floor_number)
+
+    @classmethod
+    def get_template(cls, key):
+        """
+        Get a shared template by key, building it on first use.
+
+        Keys are 'floor:<number>' for authored floors and
+        'seed:<number>:<run seed>' for seeded generated floors.
+
+        Args:
+            key (str): Template key, as stored in FloorTemplate.key
+
+        Returns:
+            FloorTemplate: Shared template, or None if the key is unknown
+        """
+        template = cls._templates.get(key)
+        if template is not None:
+            return template
+
+        kind, _, floor_number = key.partition(':')
+        if kind == 'seed':
+            floor_number, _, run_seed = floor_number.partition(':')
+            if not floor_number.isdigit():
+                return None
+            return cls.get_seeded_template(int(floor_number), run_seed)
+        if kind != 'floor' or not floor_number.isdigit():
+            return None
+
+        config = cls.get_floor_config(int(floor_number))
+        if not config or not config.get('nodes'):
+            return None
+
+        with cls._lock:
+            template = cls._templates.get(key)
+            if template is None:
+                template = FloorTemplate.from_node_dicts(config['nodes'], key, config)
+                cls._templates[key] = template
+        return template
+
+    @classmethod
+    def get_seeded_template(cls, floor_number, run_seed):
+        """
+        Get the template a seeded run plays on a floor, generating it at most
+        once while it stays in the cache.
+
+        Args:
+            floor_number (int): Floor number
+            run_seed (str): Seed of the run
+
+        Returns:
+            FloorTemplate: Shared template, or None if the floor does not exist
+        """
+        key = f'seed:{floor_number}:{run_seed}'
+        with cls._lock:
+            template = cls._seeded.get(key)
+            if template is not None:
+                cls._seeded.move_to_end(key)
+                return template
+
+        config = cls.get_floor_config(floor_number)
+        if not config:
+            return None
+
+        # Each call draws from its own generator, so concurrent runs never
+        # contend on (or perturb) the global random module
+        from backend.core.run_builder import build_floor_layout
+        layout = build_floor_layout(floor_number, config, run_seed)
+        return cls._add_seeded(key, FloorTemplate.from_layout(layout, key, config))
+
+    @classmethod
+    def _add_seeded(cls, key, template):
+        """Cache a seeded template, keeping the one already cached under its key"""
+        with cls._lock:
+            # Another thread may have generated the same floor meanwhile
+            template = cls._seeded.setdefault(key, template)
+            cls._seeded.move_to_end(key)
+            while len(cls._seeded) > SEEDED_CACHE_SIZE:
+                cls._seeded.popitem(last=False)
+        return template
+
+    @classmethod
+    def plan_template(cls, floor_number, run_seed, layout):
+        """
+        Build the template of a floor prebuilt for a seeded run.
+
+        The template is private to the run rather than cached, so prebuilt
+        runs do not evict the seeds runs really share (daily challenges).
+        It carries the floor's seeded key, so saves store the key and a
+        restored run regenerates the same floor from its seed.
+
+        Args:
+            floor_number (int): Floor number
+            run_seed (str): Seed of the run
+            layout (dict): Layout from the run plan
+
+        Returns:
+            FloorTemplate: Template for the floor, or None if the floor does not exist
+        """
+        config = cls.get_floor_config(floor_number)
+        if not config or not layout:
+            return None
+        return FloorTemplate.from_layout(layout, f'seed:{floor_number}:{run_seed}', config)
+
+    @classmethod
+    def create_floor(cls, floor_number, run_seed=None):
+        """
+        Get the template a new run should play on a floor.
+
+        Authored floors (with a 'nodes' list) share one template across all
+        runs. Other floors are generated: seeded runs share the template of
+        their seed, and unseeded runs take a pre-generated layout from the
+        floor pool and keep the resulting template to themselves.
+
+        Args:
+            floor_number (int): Floor number
+            run_seed (str, optional): Seed of the run
+
+        Returns:
+            FloorTemplate: Template for the floor, or None if the floor does not exist
+        """
+        config = cls.get_floor_config(floor_number)
+        if not config:
+            return None
+
+        if config.get('nodes'):
+            return cls.get_template(f'floor:{floor_number}')
+
+        if run_seed is not None:
+            return cls.get_seeded_template(floor_number, str(run_seed))
+
+        # Generated floors come ready-made from the background pool
+        from backend.core.floor_pool import get_floor_pool
+        return FloorTemplate.from_layout(get_floor_pool().take(floor_number, config), config=config)
+
+    @classmethod
+    def clear(cls):
+        """Drop cached configurations and templates, e.g. after editing floors.json"""
+        with cls._lock:
+            cls._floor_configs = None
+            cls._templates = {}
+            cls._seeded = OrderedDict()
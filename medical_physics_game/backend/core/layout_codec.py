@@ -0,0 +1,306 @@
+"""
+Compact layout encoding for the Medical Physics Game.
+Converts generated layouts and floor graphs to a flat, JSON-safe form:
+integer node numbers, a node-type code table, row/col arrays and CSR
+adjacency (one offsets list plus one flat targets list). Repeated node
+fields such as titles and difficulties are stored as dictionary-coded
+columns. Decoding gives back exactly the structure that was encoded, so
+the format can be used for session storage and as an API encoding.
+"""
+
+from backend.core.floor_graph import FloorGraph
+
+LAYOUT_FORMAT = 'layout-csr'
+FLOOR_FORMAT = 'floor-csr'
+FORMAT_VERSION = 1
+
+# Layout node keys with their own arrays rather than a field column
+_STRUCTURAL_KEYS = ('id', 'type', 'position', 'paths')
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class _Missing:
+    """Marker for a field a node does not have, as opposed to one set to None"""
+    __slots__ = ()
+
+
+_MISSING = _Missing()
+
+
+class LayoutCodecError(ValueError):
+    """Raised when encoded layout data is malformed or of an unknown format"""
+
+
+def _default_ids(count, has_boss):
+    """IDs generate_floor_layout gives a floor of this size"""
+    inner = count - 1 - (1 if has_boss else 0)
+    return ['start'] + [f"node_{k}" for k in range(1, inner + 1)] + (['boss'] if has_boss else [])
+
+
+def _encode_column(values):
+    """
+    Dictionary-code one field across nodes.
+
+    Args:
+        values (list): Field value per node, _MISSING where the node lacks it
+
+    Returns:
+        dict: {'values': distinct values, 'codes': index per node, -1 if absent}
+    """
+    table = []
+    lookup = {}
+    codes = []
+    for value in values:
+        if value is _MISSING:
+            codes.append(-1)
+            continue
+        # 1, 1.0 and True compare equal but must decode to their own type
+        key = (type(value), value)
+        code = lookup.get(key)
+        if code is None:
+            code = lookup[key] = len(table)
+            table.append(value)
+        codes.append(code)
+    return {'values': table, 'codes': codes}
+
+
+def _encode_fields(records):
+    """Split per-node field dicts into scalar columns and per-node leftovers"""
+    names = []
+    for record in records:
+        for name in record:
+            if name not in names:
+                names.append(name)
+
+    columns = {}
+    extra = {}
+    for name in names:
+        values = []
+        for i, record in enumerate(records):
+            value = record.get(name, _MISSING)
+            if value is not _MISSING and not isinstance(value, _SCALARS):
+                extra.setdefault(str(i), {})[name] = value
+                value = _MISSING
+            values.append(value)
+        columns[name] = _encode_column(values)
+    return columns, extra
+
+
+def _decode_fields(columns, count):
+    records = [{} for _ in range(count)]
+    for name, column in columns.items():
+        table = column['values']
+        for i, code in enumerate(column['codes']):
+            if code >= 0:
+                records[i][name] = table[code]
+    return records
+
+
+def _is_grid_position(position):
+    return (isinstance(position, dict) and len(position) == 2
+            and all(isinstance(position.get(axis), (int, float)) and not isinstance(position.get(axis), bool)
+                    for axis in ('row', 'col')))
+
+
+def encode_layout(layout):
+    """
+    Encode a generated layout in the compact CSR format.
+
+    Args:
+        layout (dict): Layout produced by map_generator.generate_floor_layout
+
+    Returns:
+        dict: JSON-safe encoded layout
+    """
+    boss = layout.get('boss')
+    node_map = layout.get('nodes', {})
+    nodes = [layout['start']] + list(node_map.values()) + ([boss] if boss else [])
+    ids = [node.get('id') for node in nodes]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+
+    rows, cols = [], []
+    offsets, targets = [0], []
+    records = []
+    special = {}
+    for i, node in enumerate(nodes):
+        leftover = {}
+        missing = [key for key in ('position', 'paths') if key not in node]
+
+        position = node.get('position', {'row': 0, 'col': 0})
+        if _is_grid_position(position):
+            rows.append(position['row'])
+            cols.append(position['col'])
+        else:
+            rows.append(0)
+            cols.append(0)
+            leftover['@position'] = position
+
+        paths = node.get('paths', [])
+        if isinstance(paths, list) and all(target in index for target in paths):
+            targets.extend(index[target] for target in paths)
+        else:
+            # Paths to nodes outside the floor are kept verbatim
+            leftover['@paths'] = paths
+        offsets.append(len(targets))
+
+        if missing:
+            leftover['@missing'] = missing
+        if leftover:
+            special[str(i)] = leftover
+        records.append({key: value for key, value in node.items() if key not in _STRUCTURAL_KEYS})
+
+    type_column = _encode_column([node.get('type', _MISSING) for node in nodes])
+    fields, extra = _encode_fields(records)
+    for i, leftover in special.items():
+        extra.setdefault(i, {}).update(leftover)
+
+    encoded = {
+        'format': LAYOUT_FORMAT,
+        'version': FORMAT_VERSION,
+        'count': len(nodes),
+        'boss': bool(boss),
+        'ids': None if ids == _default_ids(len(nodes), bool(boss)) else ids,
+        'types': type_column['values'],
+        'type_codes': type_column['codes'],
+        'rows': rows,
+        'cols': cols,
+        'offsets': offsets,
+        'targets': targets,
+        'fields': fields,
+        'extra': extra
+    }
+    if list(node_map) != ids[1:len(ids) - (1 if boss else 0)]:
+        encoded['keys'] = list(node_map)
+    layout_extra = {key: value for key, value in layout.items() if key not in ('start', 'nodes', 'boss')}
+    if layout_extra:
+        encoded['layout'] = layout_extra
+    return encoded
+
+
+def _check_format(encoded, expected):
+    if not isinstance(encoded, dict) or encoded.get('format') != expected:
+        raise LayoutCodecError(f"Not a {expected} encoding")
+    if encoded.get('version', 0) > FORMAT_VERSION:
+        raise LayoutCodecError(f"Unsupported {expected} version: {encoded.get('version')}")
+
+
+def decode_layout(encoded):
+    """
+    Rebuild the layout dict from its compact encoding.
+
+    Args:
+        encoded (dict): Data produced by encode_layout
+
+    Returns:
+        dict: Layout with 'start', 'nodes' and 'boss', equal to the encoded one
+
+    Raises:
+        LayoutCodecError: If the data is not a layout encoding
+    """
+    _check_format(encoded, LAYOUT_FORMAT)
+    try:
+        count = encoded['count']
+        has_boss = encoded['boss']
+        ids = encoded['ids'] or _default_ids(count, has_boss)
+        types = encoded['types']
+        offsets, targets = encoded['offsets'], encoded['targets']
+        records = _decode_fields(encoded['fields'], count)
+        extra = encoded.get('extra', {})
+
+        nodes = []
+        for i in range(count):
+            leftover = extra.get(str(i), {})
+            missing = leftover.get('@missing', ())
+            node = {'id': ids[i]}
+            code = encoded['type_codes'][i]
+            if code >= 0:
+                node['type'] = types[code]
+            if 'position' not in missing:
+                node['position'] = leftover.get('@position', {'row': encoded['rows'][i], 'col': encoded['cols'][i]})
+            if 'paths' not in missing:
+                node['paths'] = leftover.get('@paths', [ids[j] for j in targets[offsets[i]:offsets[i + 1]]])
+            node.update(records[i])
+            node.update((key, value) for key, value in leftover.items() if not key.startswith('@'))
+            nodes.append(node)
+    except (KeyError, IndexError, TypeError) as e:
+        raise LayoutCodecError(f"Malformed layout encoding: {e}")
+
+    inner = nodes[1:count - 1] if has_boss else nodes[1:]
+    keys = encoded.get('keys') or [node['id'] for node in inner]
+    layout = dict(encoded.get('layout', {}))
+    layout.update({
+        'start': nodes[0],
+        'nodes': dict(zip(keys, inner)),
+        'boss': nodes[-1] if has_boss else None
+    })
+    return layout
+
+
+def encode_floor_graph(graph):
+    """
+    Encode a floor graph in the compact CSR format, for session storage.
+
+    Args:
+        graph (FloorGraph): Floor to encode
+
+    Returns:
+        dict: JSON-safe encoded floor
+    """
+    type_column = _encode_column(list(graph.types))
+    fields, extra = _encode_fields([metadata or {} for metadata in graph.metadata])
+    for (kind, i), value in graph._extra.items():
+        extra.setdefault(str(i), {})[f'@{kind}'] = value
+
+    return {
+        'format': FLOOR_FORMAT,
+        'version': FORMAT_VERSION,
+        'ids': list(graph.ids),
+        'types': type_column['values'],
+        'type_codes': type_column['codes'],
+        'rows': graph.rows.tolist(),
+        'cols': [graph.col(i) for i in range(len(graph))],
+        'offsets': graph.offsets.tolist(),
+        'targets': graph.targets.tolist(),
+        'metadata': fields,
+        'extra': extra
+    }
+
+
+def decode_floor_graph(encoded):
+    """
+    Rebuild a floor graph from its compact encoding.
+
+    Args:
+        encoded (dict): Data produced by encode_floor_graph
+
+    Returns:
+        FloorGraph: Graph with the same nodes as the encoded one
+
+    Raises:
+        LayoutCodecError: If the data is not a floor encoding
+    """
+    _check_format(encoded, FLOOR_FORMAT)
+    try:
+        ids = encoded['ids']
+        types = encoded['types']
+        offsets, targets = encoded['offsets'], encoded['targets']
+        records = _decode_fields(encoded['metadata'], len(ids))
+        extra = encoded.get('extra', {})
+
+        node_dicts = []
+        for i, node_id in enumerate(ids):
+            leftover = extra.get(str(i), {})
+            metadata = records[i]
+            metadata.update((key, value) for key, value in leftover.items() if not key.startswith('@'))
+            node_dicts.append({
+                'id': node_id,
+                'type': types[encoded['type_codes'][i]],
+                'position': leftover.get('@position', {'row': encoded['rows'][i], 'col': encoded['cols'][i]}),
+                'connections': leftover.get('@connections',
+                                            [ids[j] for j in targets[offsets[i]:offsets[i + 1]]]),
+                'metadata': metadata
+            })
+    except (KeyError, IndexError, TypeError) as e:
+        raise LayoutCodecError(f"Malformed floor encoding: {e}")
+    return FloorGraph.from_dicts(node_dicts)
@@ -0,0 +1,216 @@
+"""
+Map analytics for the Medical Physics Game.
+Measures floor balance with dynamic programming over the row DAG of
+generated layouts: how many start-to-boss paths a floor has, how many
+nodes of each type a player meets on an average path, and the easiest
+and hardest total difficulty a path can add up to. The batch mode runs
+the same recurrences on NumPy arrays to profile a floor configuration
+over a large number of generated layouts.
+"""
+
+from backend.core.map_generator import MIN_ROWS, NODES_PER_ROW, generate_floor_layouts, np
+
+
+def analyze_layout(layout):
+    """
+    Compute path statistics for one generated layout.
+
+    Every start-to-boss path is counted once, and node-type exposure is the
+    expected number of nodes of each type on a path chosen uniformly among
+    them. Start and boss nodes are on every path and are not counted as types.
+
+    Args:
+        layout (dict): Layout produced by generate_floor_layout
+
+    Returns:
+        dict: 'path_count', 'expected_node_types' (type -> expected count),
+              'min_difficulty' and 'max_difficulty' (total difficulty of the
+              easiest and hardest path, boss included), or None for maps
+              without a path to the boss
+    """
+    start = layout['start']
+    boss = layout.get('boss')
+    nodes = layout.get('nodes', {})
+    if not boss or not nodes:
+        return None
+
+    # Paths only lead to the next row, so row order is a topological order
+    order = sorted(nodes.values(), key=lambda node: node['position']['row'])
+    boss_id = boss['id']
+
+    forward = {node['id']: 0 for node in order}
+    easiest = {}
+    hardest = {}
+    for node_id in start.get('paths', []):
+        if node_id in forward:
+            forward[node_id] = 1
+            easiest[node_id] = hardest[node_id] = nodes[node_id].get('difficulty', 0)
+
+    total_paths = 0
+    min_total = max_total = None
+    for node in order:
+        node_id = node['id']
+        if not forward[node_id]:
+            continue
+        for target in node.get('paths', []):
+            if target == boss_id:
+                total_paths += forward[node_id]
+                boss_difficulty = boss.get('difficulty', 0)
+                low, high = easiest[node_id] + boss_difficulty, hardest[node_id] + boss_difficulty
+                min_total = low if min_total is None else min(min_total, low)
+                max_total = high if max_total is None else max(max_total, high)
+            elif target in forward:
+                forward[target] += forward[node_id]
+                difficulty = nodes[target].get('difficulty', 0)
+                easiest[target] = min(easiest.get(target, float('inf')), easiest[node_id] + difficulty)
+                hardest[target] = max(hardest.get(target, float('-inf')), hardest[node_id] + difficulty)
+
+    if not total_paths:
+        return None
+
+    # Paths from each node to the boss, in reverse row order
+    backward = {}
+    for node in reversed(order):
+        backward[node['id']] = sum(1 if target == boss_id else backward.get(target, 0)
+                                   for target in node.get('paths', []))
+
+    exposure = {}
+    for node in order:
+        through = forward[node['id']] * backward[node['id']]
+        if through:
+            exposure[node['type']] = exposure.get(node['type'], 0) + through
+
+    return {
+        'path_count': total_paths,
+        'expected_node_types': {node_type: count / total_paths for node_type, count in exposure.items()},
+        'min_difficulty': min_total,
+        'max_difficulty': max_total
+    }
+
+
+def analyze_layout_batch(batch):
+    """
+    Compute analyze_layout's statistics for every layout of a batch at once.
+
+    Args:
+        batch (LayoutBatch): Layouts from map_generator.generate_floor_layouts
+
+    Returns:
+        dict: NumPy arrays over the batch: 'path_count' (count,),
+              'expected_node_types' (count, types) in batch.type_names order,
+              'min_difficulty' and 'max_difficulty' (count,)
+    """
+    if np is None:
+        raise ImportError("analyze_layout_batch requires numpy")
+
+    count, width = batch.types.shape
+    row_count = -(-width // NODES_PER_ROW)
+    padded = row_count * NODES_PER_ROW
+    columns = range(NODES_PER_ROW)
+
+    def by_row(values, fill=0):
+        """Reshape (count, width) node values to node-major (row, column, count)"""
+        out = np.full((padded, count), fill, dtype=values.dtype)
+        out[:width] = values.T
+        return out.reshape(row_count, NODES_PER_ROW, count)
+
+    j = np.arange(padded)
+    valid = (j[:, None] < batch.node_counts).reshape(row_count, NODES_PER_ROW, count)
+    rows = np.maximum(MIN_ROWS - 1, -(-batch.node_counts // NODES_PER_ROW))
+    last_row = valid & (np.arange(row_count)[:, None, None] == rows - 1)
+    difficulty = by_row(batch.difficulties.astype(np.int64))
+
+    # Links only lead to the next row, so the DP works on one (column ->
+    # next-row column) link mask per row, each a contiguous vector over the batch
+    next_column = [by_row(batch.links[:, :, k].astype(np.int64), fill=-1)
+                   - (j // NODES_PER_ROW + 1).reshape(row_count, NODES_PER_ROW, 1) * NODES_PER_ROW
+                   for k in range(batch.links.shape[2])]
+    links = np.zeros((row_count, NODES_PER_ROW, NODES_PER_ROW, count), dtype=bool)
+    for c in columns:
+        for column in next_column:
+            links[:, :, c] |= column == c
+
+    # Forward pass: start links to the whole first row; unreached nodes keep
+    # sentinel difficulties that never win a min/max against a real path
+    big = np.iinfo(np.int64).max // 4
+    forward = np.zeros(valid.shape, dtype=np.int64)
+    easiest = np.full(valid.shape, big, dtype=np.int64)
+    hardest = np.full(valid.shape, -big, dtype=np.int64)
+    forward[0] = valid[0]
+    easiest[0] = np.where(valid[0], difficulty[0], big)
+    hardest[0] = np.where(valid[0], difficulty[0], -big)
+    for r in range(1, row_count):
+        for c in columns:
+            for i in columns:
+                linked = links[r - 1, i, c]
+                forward[r, c] += np.where(linked, forward[r - 1, i], 0)
+                reached = linked & (forward[r - 1, i] > 0)
+                np.minimum(easiest[r, c], np.where(reached, easiest[r - 1, i], big), out=easiest[r, c])
+                np.maximum(hardest[r, c], np.where(reached, hardest[r - 1, i], -big), out=hardest[r, c])
+        reached = forward[r] > 0
+        easiest[r] = np.where(reached, easiest[r] + difficulty[r], big)
+        hardest[r] = np.where(reached, hardest[r] + difficulty[r], -big)
+
+    # Backward pass: the last row links to the boss
+    backward = last_row.astype(np.int64)
+    for r in range(row_count - 2, -1, -1):
+        for i in columns:
+            for c in columns:
+                backward[r, i] += np.where(links[r, i, c], backward[r + 1, c], 0)
+
+    path_count = np.where(last_row, forward, 0).sum(axis=(0, 1))
+    through = (forward * backward).reshape(padded, count)[:width]
+    types = batch.types.T
+    exposure = np.zeros((count, len(batch.type_names)))
+    for code in range(len(batch.type_names)):
+        exposure[:, code] = np.where(types == code, through, 0).sum(axis=0)
+    exposure /= np.maximum(path_count, 1)[:, None]
+
+    boss_difficulty = batch.floor_data.get('boss', {}).get('difficulty', min(3, batch.floor_number))
+    reached_last = last_row & (forward > 0)
+    min_difficulty = np.where(reached_last, easiest, big).min(axis=(0, 1)) + boss_difficulty
+    max_difficulty = np.where(reached_last, hardest, -big).max(axis=(0, 1)) + boss_difficulty
+
+    return {
+        'path_count': path_count,
+        'expected_node_types': exposure,
+        'min_difficulty': min_difficulty,
+        'max_difficulty': max_difficulty
+    }
+
+
+def profile_floor_config(floor_number, floor_data, count=100000, seed=None):
+    """
+    Profile the balance of a floor configuration over many generated layouts.
+
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration, as in maps/floors.json
+        count (int, optional): Number of layouts to generate and analyze
+        seed (int, optional): Seed for reproducible profiles
+
+    Returns:
+        dict: Distribution summaries of path counts, expected node types per
+              path and path difficulty across the generated layouts
+    """
+    batch = generate_floor_layouts(floor_number, floor_data, count, seed=seed)
+    stats = analyze_layout_batch(batch)
+
+    def summary(values):
+        return {
+            'min': float(values.min()),
+            'mean': float(values.mean()),
+            'p50': float(np.percentile(values, 50)),
+            'p95': float(np.percentile(values, 95)),
+            'max': float(values.max())
+        }
+
+    mean_exposure = stats['expected_node_types'].mean(axis=0)
+    return {
+        'layouts': count,
+        'path_count': summary(stats['path_count']),
+        'expected_node_types': {name: float(mean_exposure[code])
+                                for code, name in enumerate(batch.type_names)},
+        'min_difficulty': summary(stats['min_difficulty']),
+        'max_difficulty': summary(stats['max_difficulty'])
+    }
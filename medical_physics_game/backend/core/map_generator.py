@@ -1,15 +1,50 @@
 import random
 import uuid
+from collections import deque
+from functools import lru_cache
 
-def generate_floor_layout(floor_number, floor_data):
-    """Generate a random floor layout based on floor data with at least 10 rows"""
-    # Determine number of nodes
-    min_nodes = floor_data.get('node_count', {}).get('min', 15)  # Increased default minimum
-    max_nodes = floor_data.get('node_count', {}).get('max', 25)  # Increased default maximum
-    node_count = random.randint(min_nodes, max_nodes)
+try:
+    import numpy as np
+except ImportError:  # Batch generation is optional
+    np = None
+
+# Every floor has at least this many rows, counting the start row
+MIN_ROWS = 10
+
+# Fixed number of columns
+NODES_PER_ROW = 3
+
+def floor_rng(run_seed, floor_number):
+    """
+    Create the random generator for one floor of a seeded run.
     
-    # IMPORTANT: Set minimum rows to 10
-    MIN_ROWS = 10
+    Args:
+        run_seed (int or str): Seed of the run
+        floor_number (int): Floor number
+        
+    Returns:
+        random.Random: Generator that yields the same layout in every process
+    """
+    # String seeds are hashed with SHA-512, so this does not depend on PYTHONHASHSEED
+    return random.Random(f"{run_seed}:{floor_number}")
+
+def generate_floor_layout(floor_number, floor_data, rng=None):
+    """
+    Generate a random floor layout based on floor data with at least 10 rows
+    
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration
+        rng (random.Random, optional): Generator to draw from, e.g. from
+            floor_rng(); defaults to a fresh unseeded generator so concurrent
+            calls never share the global one
+            
+    Returns:
+        dict: Layout with 'start', 'nodes' and 'boss'
+    """
+    rng = rng or random.Random()
+    
+    node_count = _draw_node_count(floor_data, rng)
     
     # Create layout structure
     layout = {
@@ -24,48 +59,38 @@ def generate_floor_layout(floor_number, floor_data):
         "boss": None
     }
     
-    # Setup grid parameters
-    nodes_per_row = 3  # Fixed number of columns
-    
-    # Ensure we have at least MIN_ROWS rows
-    # Calculate how many nodes we need for MIN_ROWS (excluding start and boss)
-    min_required_nodes = (MIN_ROWS - 1) * nodes_per_row
-    
-    # Adjust node count if needed
-    node_count = max(node_count, min_required_nodes)
+    rows = _row_count(node_count)
     
-    # Calculate rows based on node count
-    rows = max(MIN_ROWS - 1, (node_count + nodes_per_row - 1) // nodes_per_row)
+    # Weight and difficulty tables are the same for every node on the floor
+    sampler = node_type_sampler(floor_data)
+    difficulty_ranges = {}
     
-    print(f"Generating map with {node_count} nodes across {rows} rows (plus start and boss)")
-    
-    # Create nodes in a grid pattern
+    # Create nodes in a grid pattern, bucketed by row as they are made
+    row_buckets = [[] for _ in range(rows + 1)]
     node_id = 1
     for row in range(1, rows + 1):
         # Calculate how many nodes in this row
-        row_nodes = min(nodes_per_row, node_count - (row - 1) * nodes_per_row)
+        row_nodes = min(NODES_PER_ROW, node_count - (row - 1) * NODES_PER_ROW)
         
         for col in range(row_nodes):
-            # Distribute nodes evenly across columns
-            if row_nodes == 1:
-                pos_col = 1  # Center if only one node
-            else:
-                pos_col = col * (2.0 / (row_nodes - 1))  # Distribute nodes
-            
-            node_type = determine_node_type(floor_data)
-            node_difficulty = determine_node_difficulty(floor_data, node_type)
+            node_type = sampler.sample(rng)
+            difficulty_range = difficulty_ranges.get(node_type)
+            if difficulty_range is None:
+                difficulty_range = difficulty_ranges[node_type] = _difficulty_range(floor_data, node_type)
             
             # Create the node
             node_id_str = f"node_{node_id}"
-            layout["nodes"][node_id_str] = {
+            node = {
                 "id": node_id_str,
                 "type": node_type,
                 "title": get_node_title(node_type),
-                "position": {"row": row, "col": pos_col},
-                "difficulty": node_difficulty,
+                "position": {"row": row, "col": _column_position(col, row_nodes)},
+                "difficulty": _draw_difficulty(difficulty_range, rng),
                 "paths": [],
                 "visited": False
             }
+            layout["nodes"][node_id_str] = node
+            row_buckets[row].append(node)
             
             # If this is a first row node, connect from start
             if row == 1:
@@ -73,101 +98,365 @@ def generate_floor_layout(floor_number, floor_data):
             
             node_id += 1
     
-    # Add boss at row MIN_ROWS (after all other rows)
-    boss_row = rows + 1
+    # Always add a boss node at the bottom, after all other rows
+    layout["boss"] = _boss_node(floor_number, floor_data, rows + 1)
+    
+    # Connect each node to 1-2 of the closest nodes in the next row
+    for row in range(1, rows):
+        current_row_nodes = row_buckets[row]
+        next_row_nodes = row_buckets[row + 1]
+        next_ids = [n["id"] for n in next_row_nodes]
+        
+        for col, node in enumerate(current_row_nodes):
+            connections_count = 2 if len(next_row_nodes) > 1 and rng.random() < 0.5 else 1
+            nearest = _nearest_columns(col, len(current_row_nodes), len(next_row_nodes))
+            node["paths"].extend(next_ids[i] for i in nearest[:connections_count])
+    
+    # Every node in the last row leads to the boss
+    for node in row_buckets[rows]:
+        node["paths"].append("boss")
+    
+    return layout
+
+def fallback_floor_layout(floor_number, floor_data):
+    """
+    Build the layout served when generation keeps failing validation.
     
+    A single path of question nodes from the start to the boss, so it is
+    valid by construction and the same every time.
+    
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration
+        
+    Returns:
+        dict: Layout with 'start', 'nodes' and 'boss'
+    """
+    rows = MIN_ROWS - 1
+    difficulty = _difficulty_range(floor_data, "question")[0]
+    layout = {
+        "start": {
+            "id": "start",
+            "type": "start",
+            "position": {"row": 0, "col": 1},
+            "paths": ["node_1"],
+            "visited": True
+        },
+        "nodes": {},
+        "boss": _boss_node(floor_number, floor_data, rows + 1)
+    }
+    for row in range(1, rows + 1):
+        node_id = f"node_{row}"
+        layout["nodes"][node_id] = {
+            "id": node_id,
+            "type": "question",
+            "title": get_node_title("question"),
+            "position": {"row": row, "col": 1},
+            "difficulty": difficulty,
+            "paths": [f"node_{row + 1}" if row < rows else "boss"],
+            "visited": False
+        }
+    return layout
+
+def generate_floor_layouts(floor_number, floor_data, count, seed=None):
+    """
+    Generate a batch of floor layouts at once with NumPy.
+    
+    Layouts follow the same rules as generate_floor_layout but are drawn as
+    arrays for the whole batch; individual layout dicts are only built when
+    requested from the returned LayoutBatch.
+    
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration
+        count (int): Number of layouts
+        seed (int, optional): Seed for the batch's random generator
+        
+    Returns:
+        LayoutBatch: Generated layouts
+    """
+    if np is None:
+        raise ImportError("generate_floor_layouts requires numpy")
+    
+    rng = np.random.default_rng(seed)
+    min_nodes = floor_data.get('node_count', {}).get('min', 15)
+    max_nodes = floor_data.get('node_count', {}).get('max', 25)
+    node_counts = np.maximum(rng.integers(min_nodes, max_nodes + 1, size=count),
+                             (MIN_ROWS - 1) * NODES_PER_ROW)
+    width = int(node_counts.max()) if count else 0
+    
+    # Node j of a layout sits in row j // 3 + 1, column j % 3
+    j = np.arange(width)
+    row = j // NODES_PER_ROW + 1
+    col = j % NODES_PER_ROW
+    rows = np.maximum(MIN_ROWS - 1, -(-node_counts // NODES_PER_ROW))[:, None]
+    last_row_size = node_counts[:, None] - (rows - 1) * NODES_PER_ROW
+    valid = j < node_counts[:, None]
+    row_size = np.where(row < rows, NODES_PER_ROW, last_row_size)
+    next_size = np.where(row + 1 < rows, NODES_PER_ROW, np.where(row + 1 == rows, last_row_size, 0))
+    
+    # Node types from the floor's alias table, difficulties per type
+    sampler = node_type_sampler(floor_data)
+    type_names = sampler.types
+    types = sampler.sample_codes(rng, (count, width))
+    ranges = np.array([_difficulty_range(floor_data, name) for name in type_names])
+    difficulties = rng.integers(ranges[types, 0], ranges[types, 1] + 1).astype(np.int16)
+    
+    # Closest next-row columns from a lookup table over the (few) row shapes
+    nearest = _nearest_table()
+    src_size = np.clip(row_size, 1, NODES_PER_ROW)
+    dst_size = np.clip(next_size, 1, NODES_PER_ROW)
+    first = nearest[src_size, np.minimum(col, src_size - 1), dst_size, 0]
+    second = nearest[src_size, np.minimum(col, src_size - 1), dst_size, 1]
+    two = (next_size >= 2) & (rng.random((count, width)) < 0.5)
+    next_start = row * NODES_PER_ROW
+    has_next = valid & (next_size > 0)
+    links = np.full((count, width, 2), -1, dtype=np.int16)
+    links[..., 0] = np.where(has_next, next_start + first, -1)
+    links[..., 1] = np.where(has_next & two, next_start + second, -1)
+    
+    return LayoutBatch(floor_number, floor_data, node_counts, type_names, types, difficulties, links)
+
+class LayoutBatch:
+    """Array-backed batch of generated layouts; see generate_floor_layouts."""
+    
+    def __init__(self, floor_number, floor_data, node_counts, type_names, types, difficulties, links):
+        self.floor_number = floor_number
+        self.floor_data = floor_data
+        self.node_counts = node_counts
+        self.type_names = type_names
+        self.types = types
+        self.difficulties = difficulties
+        self.links = links
+        
+    def __len__(self):
+        return len(self.node_counts)
+        
+    def __iter__(self):
+        return (self.layout(i) for i in range(len(self)))
+        
+    def layout(self, i):
+        """Build layout i in the generate_floor_layout format"""
+        node_count = int(self.node_counts[i])
+        rows = _row_count(node_count)
+        boss_data = self.floor_data.get('boss', {
+            "name": "Chief Medical Physicist",
+            "description": "The final challenge of this floor.",
+            "difficulty": min(3, self.floor_number)
+        })
+        
+        layout = {
+            "start": {"id": "start", "type": "start", "position": {"row": 0, "col": 1},
+                      "paths": [f"node_{j + 1}" for j in range(min(NODES_PER_ROW, node_count))],
+                      "visited": True},
+            "nodes": {},
+            "boss": {
+                "id": "boss",
+                "type": "boss",
+                "title": boss_data.get('name', 'Boss'),
+                "description": boss_data.get('description', ''),
+                "position": {"row": rows + 1, "col": 1},
+                "difficulty": boss_data.get('difficulty', min(3, self.floor_number)),
+                "paths": [],
+                "visited": False
+            }
+        }
+        
+        types = self.types[i].tolist()
+        difficulties = self.difficulties[i].tolist()
+        links = self.links[i].tolist()
+        for j in range(node_count):
+            row = j // NODES_PER_ROW + 1
+            row_nodes = min(NODES_PER_ROW, node_count - (row - 1) * NODES_PER_ROW)
+            node_type = self.type_names[types[j]]
+            paths = [f"node_{t + 1}" for t in links[j] if t >= 0]
+            if row == rows:
+                paths.append("boss")
+            layout["nodes"][f"node_{j + 1}"] = {
+                "id": f"node_{j + 1}",
+                "type": node_type,
+                "title": get_node_title(node_type),
+                "position": {"row": row, "col": _column_position(j % NODES_PER_ROW, row_nodes)},
+                "difficulty": difficulties[j],
+                "paths": paths,
+                "visited": False
+            }
+        return layout
+
+def _draw_node_count(floor_data, rng):
+    """Draw a floor's number of regular nodes, enough for at least MIN_ROWS rows"""
+    min_nodes = floor_data.get('node_count', {}).get('min', 15)  # Increased default minimum
+    max_nodes = floor_data.get('node_count', {}).get('max', 25)  # Increased default maximum
+    # At least MIN_ROWS rows, excluding start and boss
+    return max(rng.randint(min_nodes, max_nodes), (MIN_ROWS - 1) * NODES_PER_ROW)
+
+def _boss_node(floor_number, floor_data, row):
+    """Build the boss node, centered in the given row"""
     # Get boss data from floor_data or create default
     boss_data = floor_data.get('boss', {
         "name": "Chief Medical Physicist",
         "description": "The final challenge of this floor.",
         "difficulty": min(3, floor_number)
     })
-    
-    # Always add a boss node at the bottom
-    layout["boss"] = {
+    return {
         "id": "boss",
         "type": "boss",
         "title": boss_data.get('name', 'Boss'),
         "description": boss_data.get('description', ''),
-        "position": {"row": boss_row, "col": 1},  # Center the boss
+        "position": {"row": row, "col": 1},
         "difficulty": boss_data.get('difficulty', min(3, floor_number)),
         "paths": [],
         "visited": False
     }
+
+def _row_count(node_count):
+    """Rows of regular nodes for a node count, never fewer than MIN_ROWS - 1"""
+    return max(MIN_ROWS - 1, (node_count + NODES_PER_ROW - 1) // NODES_PER_ROW)
+
+def _column_position(col, row_nodes):
+    """Horizontal position of a node, spreading the row evenly over columns 0-2"""
+    if row_nodes == 1:
+        return 1  # Center if only one node
+    return col * (2.0 / (row_nodes - 1))
+
+@lru_cache(maxsize=None)
+def _nearest_columns(col, row_nodes, next_row_nodes):
+    """Indexes of the next row's nodes ordered by column distance from a node"""
+    position = _column_position(col, row_nodes)
+    return sorted(range(next_row_nodes),
+                  key=lambda i: abs(_column_position(i, next_row_nodes) - position))
+
+def _link_rows(previous, nodes, rng):
+    """
+    Connect a row of node dicts to the next row, making sure every node of
+    the next row is entered.
+    """
+    ids = [node["id"] for node in nodes]
+    entered = set()
+    for col, node in enumerate(previous):
+        connections_count = 2 if len(nodes) > 1 and rng.random() < 0.5 else 1
+        nearest = _nearest_columns(col, len(previous), len(nodes))
+        for i in nearest[:connections_count]:
+            node["paths"].append(ids[i])
+            entered.add(i)
     
-    # Create connections between nodes (rows 1 to rows-1)
-    for row in range(1, rows):
-        # Get nodes in current row
-        current_row_nodes = [n for n in layout["nodes"].values() 
-                            if n["position"]["row"] == row]
-        
-        # Get nodes in next row
-        next_row_nodes = [n for n in layout["nodes"].values() 
-                          if n["position"]["row"] == row + 1]
-        
-        if not next_row_nodes:
-            continue  # Skip if no nodes in next row
-        
-        # Connect each node in current row to at least one node in next row
-        for node in current_row_nodes:
-            # Determine number of connections (1-2)
-            connections_count = random.randint(1, min(2, len(next_row_nodes)))
-            
-            # Sort next row nodes by column proximity for more natural paths
-            sorted_next_nodes = sorted(next_row_nodes, 
-                key=lambda n: abs(n["position"]["col"] - node["position"]["col"]))
-            
-            # Connect to the closest nodes
-            for target_node in sorted_next_nodes[:connections_count]:
-                # Add path if not already connected
-                if target_node["id"] not in node["paths"]:
-                    node["paths"].append(target_node["id"])
-    
-    # Connect last row nodes to boss
-    last_row_nodes = [n for n in layout["nodes"].values() 
-                     if n["position"]["row"] == rows]
-    
-    # Make sure at least one node connects to the boss
-    if last_row_nodes:
-        for node in last_row_nodes:
-            node["paths"].append("boss")
-    
-    return layout
+    # Nearest-column links enter every node of the row shapes used today;
+    # link any node they miss from its nearest predecessor all the same
+    for i in range(len(nodes)):
+        if i not in entered:
+            source = _nearest_columns(i, len(nodes), len(previous))[0]
+            previous[source]["paths"].append(ids[i])
+
+@lru_cache(maxsize=None)
+def _nearest_table():
+    """_nearest_columns for every row shape as a [size, col, next size, rank] array"""
+    table = np.zeros((NODES_PER_ROW + 1, NODES_PER_ROW, NODES_PER_ROW + 1, 2), dtype=np.int16)
+    for size in range(1, NODES_PER_ROW + 1):
+        for col in range(size):
+            for next_size in range(1, NODES_PER_ROW + 1):
+                order = _nearest_columns(col, size, next_size)
+                table[size, col, next_size] = (order + order)[:2]
+    return table
 
 # Update the determine_node_type function:
-def determine_node_type(floor_data):
-    """Determine a node type based on weights in floor data"""
-    # Get default weights from configuration
-    default_weights = get_node_type_weights()
+def determine_node_type(floor_data, rng=None):
+    """Determine a node type based on weights in floor data, drawing from rng if given"""
+    return node_type_sampler(floor_data).sample(rng or random)
+
+class NodeTypeSampler:
+    """
+    Node-type distribution of a floor compiled into an alias table (Vose).
     
-    # Override with floor-specific weights if provided
-    node_types = floor_data.get('node_types', {})
+    Each draw picks a column uniformly and then either the column's own type
+    or its alias, so sampling costs O(1) whatever the number of types.
+    """
     
-    # Build combined weights
-    weights = {}
-    for node_type, weight in default_weights.items():
-        # Use floor weight if specified, otherwise use default
-        weights[node_type] = node_types.get(node_type, {}).get('weight', weight)
+    __slots__ = ('types', 'probability', 'alias')
     
-    # Calculate total weight
-    total_weight = sum(weights.values())
+    def __init__(self, weights):
+        """
+        Compile the table.
+        
+        Args:
+            weights (dict): Node type -> non-negative weight; with no positive
+                weight every draw is "question"
+        """
+        weights = {node_type: weight for node_type, weight in weights.items() if weight > 0}
+        if not weights:
+            weights = {"question": 1}
+        
+        self.types = tuple(weights)
+        count = len(self.types)
+        total = sum(weights.values())
+        scaled = [weight * count / total for weight in weights.values()]
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+        
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding and keeps its own type
     
-    # If no weights, return default
-    if total_weight <= 0:
-        return "question"
+    def sample(self, rng):
+        """
+        Draw one node type.
+        
+        Args:
+            rng (random.Random): Generator to draw from
+            
+        Returns:
+            str: Node type
+        """
+        # One uniform draw: the integer part picks the column, the fraction flips the coin
+        u = rng.random() * len(self.types)
+        column = int(u)
+        if u - column < self.probability[column]:
+            return self.types[column]
+        return self.types[self.alias[column]]
     
-    # Pick a random number
-    roll = random.randint(1, total_weight)
+    def sample_codes(self, rng, size):
+        """
+        Draw many node types at once as indexes into self.types.
+        
+        Args:
+            rng (numpy.random.Generator): Generator to draw from
+            size (int or tuple): Shape of the result
+            
+        Returns:
+            numpy.ndarray: int8 type codes
+        """
+        u = rng.random(size) * len(self.types)
+        column = u.astype(np.intp)
+        keep = (u - column) < np.asarray(self.probability)[column]
+        return np.where(keep, column, np.asarray(self.alias)[column]).astype(np.int8)
+
+@lru_cache(maxsize=256)
+def _compiled_sampler(weights):
+    return NodeTypeSampler(dict(weights))
+
+def node_type_sampler(floor_data):
+    """
+    Get the compiled node-type sampler of a floor configuration.
     
-    # Determine node type based on weights
-    current_weight = 0
-    for node_type, weight in weights.items():
-        current_weight += weight
-        if roll <= current_weight:
-            return node_type
+    Samplers are cached by their weights, so each floor config of
+    floors.json is compiled once per process.
     
-    # Default fallback
-    return "question"
+    Args:
+        floor_data (dict): Floor configuration
+        
+    Returns:
+        NodeTypeSampler: Sampler for the floor
+    """
+    node_types = floor_data.get('node_types', {})
+    # Use floor weight if specified, otherwise use default
+    weights = tuple((node_type, node_types.get(node_type, {}).get('weight', weight))
+                    for node_type, weight in get_node_type_weights().items())
+    return _compiled_sampler(weights)
 
 # Import node type weights from JavaScript registry
 def get_node_type_weights():
@@ -183,79 +472,195 @@ def get_node_type_weights():
         "gamble": 10
     }
 
-def determine_node_difficulty(floor_data, node_type):
-    """Determine difficulty for a node based on floor data"""
-    # Get difficulty range for node type
+def determine_node_difficulty(floor_data, node_type, rng=None):
+    """Determine difficulty for a node based on floor data, drawing from rng if given"""
+    return _draw_difficulty(_difficulty_range(floor_data, node_type), rng or random)
+
+def _draw_difficulty(difficulty_range, rng):
+    """Draw a difficulty from a (min, max) range, without a draw for fixed ranges"""
+    min_difficulty, max_difficulty = difficulty_range
+    if min_difficulty >= max_difficulty:
+        return min_difficulty
+    return rng.randint(min_difficulty, max_difficulty)
+
+def _difficulty_range(floor_data, node_type):
+    """Get the (min, max) difficulty for a node type on a floor"""
     difficulty_range = floor_data.get('node_types', {}).get(node_type, {}).get('difficulty_range', [1, 1])
     
     # Get min and max difficulty, defaulting to 1 if not specified
     min_difficulty = difficulty_range[0] if len(difficulty_range) > 0 else 1
     max_difficulty = difficulty_range[1] if len(difficulty_range) > 1 else min_difficulty
-    
-    # Get random difficulty in range
-    return random.randint(min_difficulty, max_difficulty)
+    return min_difficulty, max_difficulty
+
+NODE_TITLES = {
+    "start": "Starting Point",
+    "question": "Physics Question",
+    "elite": "Challenging Question",
+    "boss": "Final Assessment",
+    "patient_case": "Patient Case",
+    "treasure": "Equipment Found",
+    "rest": "Break Room",
+    "shop": "Department Store",
+    "event": "Random Event",
+    "gamble": "Research Opportunity"
+}
 
 def get_node_title(node_type):
     """Get a descriptive title for a node based on its type"""
-    titles = {
-        "start": "Starting Point",
-        "question": "Physics Question",
-        "elite": "Challenging Question",
-        "boss": "Final Assessment",
-        "patient_case": "Patient Case",
-        "treasure": "Equipment Found",
-        "rest": "Break Room",
-        "shop": "Department Store",
-        "event": "Random Event",
-        "gamble": "Research Opportunity"
-    }
+    return NODE_TITLES.get(node_type, "Unknown Node")
+
+def _map_graph(layout):
+    """
+    Read a map into plain adjacency.
+    
+    Accepts a generated layout ({'start', 'nodes', 'boss'} with 'paths') or an
+    authored floor (a list of node dicts with 'connections').
+    
+    Returns:
+        tuple: (adjacency dict of node ID -> list of target IDs, start ID, boss ID),
+               or None if the map has no start or no other nodes
+    """
+    if isinstance(layout, dict):
+        if "start" not in layout or not layout.get("nodes"):
+            return None
+        node_list = [layout["start"]] + list(layout["nodes"].values())
+        if layout.get("boss"):
+            node_list.append(layout["boss"])
+        adjacency = {node["id"]: node.get("paths", []) for node in node_list}
+        # A layout with a boss slot must reach "boss", even if the slot is empty
+        boss_id = "boss" if "boss" in layout else None
+        if boss_id and boss_id not in adjacency:
+            adjacency[boss_id] = []
+        return adjacency, layout["start"]["id"], boss_id
+    
+    if isinstance(layout, (list, tuple)) and len(layout) > 1:
+        adjacency = {node["id"]: node.get("connections", node.get("paths", [])) for node in layout}
+        start_id = next((node["id"] for node in layout if node.get("type") == "start"), layout[0]["id"])
+        boss_id = next((node["id"] for node in layout if node.get("type") == "boss"), None)
+        return adjacency, start_id, boss_id
     
-    return titles.get(node_type, "Unknown Node")
+    return None
+
+def _reachable(adjacency, start_id):
+    """Breadth-first search from the start; each node and edge is visited once"""
+    seen = {start_id}
+    queue = deque([start_id])
+    while queue:
+        for target in adjacency.get(queue.popleft(), ()):
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
 
 def validate_map(layout):
     """Validate a generated map to ensure all nodes are reachable"""
-    # Check if layout is valid
-    if not layout or not isinstance(layout, dict):
+    graph = _map_graph(layout)
+    if graph is None:
         return False
+    adjacency, start_id, _ = graph
     
-    # Check if start node exists
-    if "start" not in layout:
-        return False
+    reachable = _reachable(adjacency, start_id)
+    return all(node_id in reachable for node_id in adjacency)
+
+def analyze_map(layout):
+    """
+    Validate a map and report why it is or is not playable, in linear time.
     
-    # Check if nodes exist
-    if "nodes" not in layout or not layout["nodes"]:
-        return False
+    Args:
+        layout (dict or list): Generated layout or authored list of node dicts
+        
+    Returns:
+        dict: Report with 'valid' (every node reachable from the start, as in
+              validate_map), 'unreachable' and 'dead_ends' (nodes that cannot
+              reach the boss) node IDs, 'missing_targets' (paths to unknown
+              nodes), 'max_path_length' (edges on the longest start-to-boss
+              path, None if there is no boss or the map has a cycle) and
+              'branching' (out-degree statistics of reachable nodes)
+    """
+    graph = _map_graph(layout)
+    if graph is None:
+        return {'valid': False, 'node_count': 0, 'edge_count': 0, 'unreachable': [],
+                'dead_ends': [], 'missing_targets': [], 'max_path_length': None,
+                'branching': {'min': 0, 'max': 0, 'mean': 0.0, 'branch_nodes': 0}}
+    adjacency, start_id, boss_id = graph
     
-    # Check if all nodes are reachable from start
-    reachable = set(["start"])
-    new_nodes = True
-    
-    # Keep exploring until no new nodes are found
-    while new_nodes:
-        new_nodes = False
-        for node_id in list(reachable):
-            # Get the node
-            node = None
-            if node_id == "start":
-                node = layout["start"]
-            elif node_id == "boss" and "boss" in layout:
-                node = layout["boss"]
-            elif node_id in layout["nodes"]:
-                node = layout["nodes"][node_id]
-            
-            # If node not found, skip
-            if not node:
+    reachable = _reachable(adjacency, start_id)
+    unreachable = [node_id for node_id in adjacency if node_id not in reachable]
+    missing_targets = sorted({target for targets in adjacency.values() for target in targets
+                              if target not in adjacency})
+    
+    # Reverse search from the boss finds every node that can still finish the floor
+    reverse = {node_id: [] for node_id in adjacency}
+    for node_id, targets in adjacency.items():
+        for target in targets:
+            if target in reverse:
+                reverse[target].append(node_id)
+    dead_ends = []
+    if boss_id is not None:
+        finishing = _reachable(reverse, boss_id)
+        dead_ends = [node_id for node_id in adjacency if node_id not in finishing]
+    
+    # Longest path over the reachable part in topological order (Kahn)
+    indegree = {node_id: 0 for node_id in reachable}
+    for node_id in reachable:
+        for target in adjacency.get(node_id, ()):
+            if target in indegree:
+                indegree[target] += 1
+    depth = {start_id: 0}
+    queue = deque(node_id for node_id, degree in indegree.items() if degree == 0)
+    ordered = 0
+    while queue:
+        node_id = queue.popleft()
+        ordered += 1
+        for target in adjacency.get(node_id, ()):
+            if target not in indegree:
                 continue
-            
-            # Check paths from this node
-            for path in node.get("paths", []):
-                if path not in reachable:
-                    reachable.add(path)
-                    new_nodes = True
-    
-    # Check if all nodes are reachable
-    all_nodes = set(["start"] + list(layout["nodes"].keys()))
-    if "boss" in layout:
-        all_nodes.add("boss")
-    
-    return all_nodes.issubset(reachable)
\ No newline at end of file
+            if node_id in depth:
+                depth[target] = max(depth.get(target, 0), depth[node_id] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+    acyclic = ordered == len(indegree)
+    max_path_length = depth.get(boss_id) if acyclic and boss_id in reachable else None
+    
+    degrees = [len(adjacency[node_id]) for node_id in reachable
+               if node_id in adjacency and node_id != boss_id]
+    edge_count = sum(len(targets) for targets in adjacency.values())
+    return {
+        'valid': not unreachable,
+        'node_count': len(adjacency),
+        'edge_count': edge_count,
+        'unreachable': unreachable,
+        'dead_ends': dead_ends,
+        'missing_targets': missing_targets,
+        'max_path_length': max_path_length,
+        'branching': {
+            'min': min(degrees, default=0),
+            'max': max(degrees, default=0),
+            'mean': sum(degrees) / len(degrees) if degrees else 0.0,
+            'branch_nodes': sum(1 for degree in degrees if degree > 1)
+        }
+    }
+
+def validate_maps(layouts):
+    """
+    Analyze many maps in one call, e.g. a generated batch or every authored floor.
+    
+    Args:
+        layouts (iterable): Layouts or authored node lists, or a LayoutBatch
+        
+    Returns:
+        dict: 'total', 'valid' and 'with_dead_ends' counts, 'invalid' indexes,
+              the longest 'max_path_length' seen, and the per-map 'reports'
+    """
+    reports = [analyze_map(layout) for layout in layouts]
+    path_lengths = [report['max_path_length'] for report in reports
+                    if report['max_path_length'] is not None]
+    return {
+        'total': len(reports),
+        'valid': sum(1 for report in reports if report['valid']),
+        'invalid': [i for i, report in enumerate(reports) if not report['valid']],
+        'with_dead_ends': sum(1 for report in reports if report['dead_ends']),
+        'max_path_length': max(path_lengths, default=None),
+        'reports': reports
+    }
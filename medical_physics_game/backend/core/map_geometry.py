@@ -0,0 +1,139 @@
+"""
+Map geometry for the Medical Physics Game.
+Computes the drawing coordinates of a floor once on the server: nodes are
+reordered within their rows with barycenter sweeps over the row DAG to
+reduce edge crossings, then spread evenly across the row. The result is
+cached with the layout (or floor template), so clients draw it as is.
+"""
+
+from backend.core.map_generator import NODES_PER_ROW
+
+# Down-and-up barycenter passes before settling for the best order found
+MAX_SWEEPS = 4
+
+
+def _crossings(upper, lower, successors):
+    """Count edge crossings between two adjacent rows"""
+    lower_index = {node_id: i for i, node_id in enumerate(lower)}
+    edges = [(i, lower_index[target]) for i, node_id in enumerate(upper)
+             for target in successors.get(node_id, ()) if target in lower_index]
+    # Rows hold a handful of nodes, so comparing edge pairs directly is cheapest
+    return sum(1 for a in range(len(edges)) for b in range(a + 1, len(edges))
+               if (edges[a][0] - edges[b][0]) * (edges[a][1] - edges[b][1]) < 0)
+
+
+def _total_crossings(order, successors):
+    return sum(_crossings(order[r], order[r + 1], successors) for r in range(len(order) - 1))
+
+
+def _sweep(order, neighbors, passes):
+    """Reorder rows by the mean position of each node's neighbors in a reference row"""
+    for row, reference_row in passes:
+        reference = {node_id: i for i, node_id in enumerate(order[reference_row])}
+
+        def barycenter(item):
+            i, node_id = item
+            linked = [reference[other] for other in neighbors.get(node_id, ()) if other in reference]
+            # Nodes without neighbors there keep their place
+            return (sum(linked) / len(linked) if linked else i, i)
+
+        order[row] = [node_id for _, node_id in sorted(enumerate(order[row]), key=barycenter)]
+
+
+def compute_geometry(nodes, max_sweeps=MAX_SWEEPS):
+    """
+    Compute crossing-reduced drawing coordinates for a floor.
+
+    Args:
+        nodes (iterable): (node ID, row, column, target IDs) per node
+        max_sweeps (int, optional): Down-and-up barycenter passes
+
+    Returns:
+        dict: 'positions' (node ID -> {'x', 'y'}, x spread over the generator's
+              0-2 column range and y the row), 'rows' (node IDs per row, left to
+              right) and 'crossings' (edge crossings left in the drawing)
+    """
+    by_row = {}
+    successors = {}
+    predecessors = {}
+    for node_id, row, col, targets in nodes:
+        by_row.setdefault(row, []).append((col, node_id))
+        successors[node_id] = list(targets)
+        for target in targets:
+            predecessors.setdefault(target, []).append(node_id)
+
+    row_numbers = sorted(by_row)
+    order = [[node_id for _, node_id in sorted(by_row[row], key=lambda item: item[0])]
+             for row in row_numbers]
+
+    best = [list(row) for row in order]
+    best_crossings = _total_crossings(order, successors)
+    down = [(r, r - 1) for r in range(1, len(order))]
+    up = [(r, r + 1) for r in range(len(order) - 2, -1, -1)]
+    for _ in range(max_sweeps):
+        improved = False
+        for neighbors, passes in ((predecessors, down), (successors, up)):
+            if not best_crossings:
+                break
+            _sweep(order, neighbors, passes)
+            crossings = _total_crossings(order, successors)
+            if crossings < best_crossings:
+                best = [list(row) for row in order]
+                best_crossings = crossings
+                improved = True
+        if not improved:
+            break
+
+    width = NODES_PER_ROW - 1
+    positions = {}
+    for row, node_ids in zip(row_numbers, best):
+        for i, node_id in enumerate(node_ids):
+            x = width / 2 if len(node_ids) == 1 else i * width / (len(node_ids) - 1)
+            positions[node_id] = {'x': x, 'y': row}
+
+    return {
+        'positions': positions,
+        'rows': best,
+        'crossings': best_crossings
+    }
+
+
+def layout_geometry(layout):
+    """
+    Get a generated layout's geometry, computing and caching it on first use.
+
+    Args:
+        layout (dict): Layout produced by map_generator.generate_floor_layout;
+            the geometry is stored in its 'geometry' key
+
+    Returns:
+        dict: Geometry as returned by compute_geometry
+    """
+    geometry = layout.get('geometry')
+    if geometry is None:
+        node_list = [layout['start']] + list(layout.get('nodes', {}).values())
+        if layout.get('boss'):
+            node_list.append(layout['boss'])
+        geometry = layout['geometry'] = compute_geometry(
+            (node['id'], node.get('position', {}).get('row', 0), node.get('position', {}).get('col', 0),
+             node.get('paths', []))
+            for node in node_list)
+    return geometry
+
+
+def graph_geometry(graph):
+    """
+    Compute the geometry of a floor graph.
+
+    Args:
+        graph (FloorGraph): Floor to draw
+
+    Returns:
+        dict: Geometry as returned by compute_geometry
+    """
+    def records():
+        for i in range(len(graph)):
+            position = graph.position(i)
+            yield graph.ids[i], position.get('row', 0), position.get('col', 0), graph.connections(i)
+
+    return compute_geometry(records())
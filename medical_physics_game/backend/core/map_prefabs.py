@@ -0,0 +1,304 @@
+"""
+Prefab map synthesis for the Medical Physics Game.
+Builds floors by stitching together precompiled chunks of a few rows.
+Each floor configuration gets a library of chunks, drawn from its node
+type and difficulty tables and validated once when compiled. Generating
+a floor then only picks chunks, renumbers their nodes and links the rows
+where two chunks meet, which are the only places left to validate.
+"""
+
+import json
+import os
+import random
+import threading
+
+from backend.core.map_generator import (
+    NODES_PER_ROW, _boss_node, _column_position, _difficulty_range, _draw_difficulty,
+    _draw_node_count, _link_rows, _reachable, _row_count, generate_floor_layout,
+    get_node_title, node_type_sampler
+)
+
+# Rows per regular chunk; the last chunk of a floor may be shorter
+CHUNK_ROWS = 3
+
+# Chunks compiled per chunk shape and floor configuration
+LIBRARY_SIZE = 64
+
+# Attempts at compiling a valid chunk before giving up on a library slot
+MAX_COMPILE_ATTEMPTS = 5
+
+
+class PrefabChunk:
+    """A validated run of rows, stored as node prototypes with chunk-local links."""
+
+    __slots__ = ('rows', 'node_count')
+
+    def __init__(self, rows):
+        """
+        Initialize the chunk.
+
+        Args:
+            rows (tuple): Per row, a tuple of (type, title, difficulty, col,
+                local target indexes) prototypes; local indexes number the
+                chunk's nodes row by row
+        """
+        self.rows = rows
+        self.node_count = sum(len(row) for row in rows)
+
+    @classmethod
+    def compile(cls, shape, floor_data, rng):
+        """
+        Draw and validate a chunk.
+
+        Args:
+            shape (tuple): (row count, size of the last row); other rows are full
+            floor_data (dict): Floor configuration to draw types and difficulties from
+            rng (random.Random): Generator to draw from
+
+        Returns:
+            PrefabChunk: Chunk whose rows are all entered from the row above
+                and all lead to the row below, or None if drawing one failed
+        """
+        row_count, last_size = shape
+        sampler = node_type_sampler(floor_data)
+        rows = []
+        local = 0
+        for r in range(row_count):
+            size = last_size if r == row_count - 1 else NODES_PER_ROW
+            row = []
+            for col in range(size):
+                node_type = sampler.sample(rng)
+                row.append({
+                    "id": local,
+                    "type": node_type,
+                    "difficulty": _draw_difficulty(_difficulty_range(floor_data, node_type), rng),
+                    "col": _column_position(col, size),
+                    "paths": []
+                })
+                local += 1
+            if rows:
+                _link_rows(rows[-1], row, rng)
+            rows.append(row)
+
+        if not _chunk_valid(rows):
+            return None
+        return cls(tuple(
+            tuple((node["type"], get_node_title(node["type"]), node["difficulty"], node["col"],
+                   tuple(node["paths"]))
+                  for node in row)
+            for row in rows))
+
+    def instantiate(self, first_row, first_id):
+        """
+        Build the chunk's node dicts at a place in a floor.
+
+        Args:
+            first_row (int): Floor row of the chunk's first row
+            first_id (int): Number of the chunk's first node, as in node_<n>
+
+        Returns:
+            list: Node dicts per row; the last row has no paths yet
+        """
+        ids = [f"node_{first_id + i}" for i in range(self.node_count)]
+        rows = []
+        local = 0
+        for r, row in enumerate(self.rows):
+            nodes = []
+            for node_type, title, difficulty, col, targets in row:
+                nodes.append({
+                    "id": ids[local],
+                    "type": node_type,
+                    "title": title,
+                    "position": {"row": first_row + r, "col": col},
+                    "difficulty": difficulty,
+                    "paths": [ids[t] for t in targets],
+                    "visited": False
+                })
+                local += 1
+            rows.append(nodes)
+        return rows
+
+
+def _chunk_valid(rows):
+    """Check that a chunk is reachable from its first row and every row but the last leads on"""
+    adjacency = {node["id"]: node["paths"] for row in rows for node in row}
+    adjacency["entry"] = [node["id"] for node in rows[0]]
+    if len(_reachable(adjacency, "entry")) != len(adjacency):
+        return False
+    return all(node["paths"] for row in rows[:-1] for node in row)
+
+
+def _seam_valid(previous, entry):
+    """Check the rows where two chunks meet: every node leaves and every node is entered"""
+    entered = {target for node in previous for target in node["paths"]}
+    return all(node["paths"] for node in previous) and all(node["id"] in entered for node in entry)
+
+
+def chunk_shapes(row_count, last_size):
+    """
+    Split a floor's rows into chunk shapes.
+
+    Args:
+        row_count (int): Rows of regular nodes
+        last_size (int): Nodes in the last row
+
+    Returns:
+        list: (row count, last row size) per chunk, top to bottom
+    """
+    full = (row_count - 1) // CHUNK_ROWS
+    shapes = [(CHUNK_ROWS, NODES_PER_ROW)] * full
+    shapes.append((row_count - full * CHUNK_ROWS, last_size))
+    return shapes
+
+
+class ChunkLibrary:
+    """Chunks compiled for one floor configuration, per chunk shape."""
+
+    def __init__(self, floor_number, floor_data, size=LIBRARY_SIZE):
+        """
+        Initialize the library; shapes are compiled on first use.
+
+        Args:
+            floor_number (int): Floor number
+            floor_data (dict): Floor configuration
+            size (int, optional): Chunks per shape
+        """
+        self.floor_number = floor_number
+        self.floor_data = floor_data
+        self.size = size
+        self._chunks = {}
+        self._lock = threading.Lock()
+
+    def chunks(self, shape):
+        """
+        Get the compiled chunks of a shape.
+
+        Chunks are drawn from a generator seeded by floor and shape, so every
+        process compiles the same library and seeded floors stay reproducible.
+
+        Args:
+            shape (tuple): (row count, size of the last row)
+
+        Returns:
+            tuple: PrefabChunk objects
+        """
+        chunks = self._chunks.get(shape)
+        if chunks is None:
+            with self._lock:
+                chunks = self._chunks.get(shape)
+                if chunks is None:
+                    rng = random.Random(f"prefab:{self.floor_number}:{shape[0]}x{shape[1]}")
+                    compiled = []
+                    for _ in range(self.size):
+                        for _ in range(MAX_COMPILE_ATTEMPTS):
+                            chunk = PrefabChunk.compile(shape, self.floor_data, rng)
+                            if chunk is not None:
+                                compiled.append(chunk)
+                                break
+                    chunks = self._chunks[shape] = tuple(compiled)
+        return chunks
+
+
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+def chunk_library(floor_number, floor_data):
+    """
+    Get the chunk library of a floor configuration, shared process-wide.
+
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration
+
+    Returns:
+        ChunkLibrary: Library for the configuration
+    """
+    key = (floor_number, json.dumps(floor_data, sort_keys=True, default=str))
+    library = _libraries.get(key)
+    if library is None:
+        with _libraries_lock:
+            library = _libraries.setdefault(key, ChunkLibrary(floor_number, floor_data))
+    return library
+
+
+def synthesize_floor_layout(floor_number, floor_data, rng=None):
+    """
+    Assemble a floor layout from prefab chunks.
+
+    Layouts have the same shape and invariants as generate_floor_layout's.
+
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration
+        rng (random.Random, optional): Generator to draw from
+
+    Returns:
+        dict: Layout with 'start', 'nodes' and 'boss'
+    """
+    rng = rng or random.Random()
+    library = chunk_library(floor_number, floor_data)
+
+    node_count = _draw_node_count(floor_data, rng)
+    rows = _row_count(node_count)
+    last_size = node_count - (rows - 1) * NODES_PER_ROW
+
+    layout = {
+        "start": {
+            "id": "start",
+            "type": "start",
+            "position": {"row": 0, "col": 1},
+            "paths": [],
+            "visited": True
+        },
+        "nodes": {},
+        "boss": None
+    }
+
+    previous = None
+    row, node_id = 1, 1
+    for shape in chunk_shapes(rows, last_size):
+        chunks = library.chunks(shape)
+        if not chunks:
+            return generate_floor_layout(floor_number, floor_data, rng)
+        chunk = chunks[rng.randrange(len(chunks))]
+        chunk_rows = chunk.instantiate(row, node_id)
+        for nodes in chunk_rows:
+            for node in nodes:
+                layout["nodes"][node["id"]] = node
+
+        if previous is None:
+            layout["start"]["paths"].extend(node["id"] for node in chunk_rows[0])
+        else:
+            _link_rows(previous, chunk_rows[0], rng)
+            if not _seam_valid(previous, chunk_rows[0]):
+                return generate_floor_layout(floor_number, floor_data, rng)
+
+        previous = chunk_rows[-1]
+        row += len(chunk_rows)
+        node_id += chunk.node_count
+
+    for node in previous:
+        node["paths"].append("boss")
+    layout["boss"] = _boss_node(floor_number, floor_data, rows + 1)
+    return layout
+
+
+def generate_layout(floor_number, floor_data, rng=None):
+    """
+    Generate a floor layout with the floor's synthesis mode.
+
+    Floors whose configuration sets "synthesis": "prefab" (or every floor,
+    with the MAP_SYNTHESIS environment variable set to "prefab") are
+    assembled from prefab chunks; others are generated node by node.
+
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration
+        rng (random.Random, optional): Generator to draw from
+
+    Returns:
+        dict: Layout with 'start', 'nodes' and 'boss'
+    """
+    if floor_data.get('synthesis', os.environ.get('MAP_SYNTHESIS')) == 'prefab':
+        return synthesize_floor_layout(floor_number, floor_data, rng)
+    return generate_floor_layout(floor_number, floor_data, rng)
@@ -0,0 +1,194 @@
+"""
+Streamed floor generation for the Medical Physics Game.
+Materializes a generated floor a few rows ahead of the player instead of
+all at once. Every row draws from its own seed, so a stream is stored as
+its seed and the number of rows generated so far, and any row can be
+regenerated exactly without replaying the rows before it.
+"""
+
+import os
+import random
+
+from backend.core.map_generator import (
+    NODES_PER_ROW, _boss_node, _column_position, _difficulty_range, _draw_difficulty,
+    _draw_node_count, _link_rows, _row_count, get_node_title, node_type_sampler
+)
+
+# Rows kept generated ahead of the player's row
+DEFAULT_LOOKAHEAD = 3
+
+
+def stream_lookahead():
+    """
+    Get the configured lookahead for streamed floors.
+
+    Returns:
+        int: Rows of lookahead from the MAP_STREAM_LOOKAHEAD environment
+             variable, or 0 when generated floors are built whole
+    """
+    try:
+        return max(0, int(os.environ.get('MAP_STREAM_LOOKAHEAD', 0)))
+    except ValueError:
+        return 0
+
+
+class FloorStream:
+    """
+    A generated floor whose rows are created as the player advances.
+
+    The partial layout keeps the invariants validate_map checks: every
+    generated node is linked from the row before it, so everything
+    generated is reachable from the start, and every row behind the
+    frontier has a path forward. The boss is added with the last row.
+    """
+
+    def __init__(self, floor_number, floor_data, seed, lookahead=DEFAULT_LOOKAHEAD, rows=0):
+        """
+        Initialize the stream and generate the first rows.
+
+        Args:
+            floor_number (int): Floor number
+            floor_data (dict): Floor configuration
+            seed (str): Seed of the floor, usually the run seed
+            lookahead (int, optional): Rows kept generated ahead of the player
+            rows (int, optional): Rows to generate up front, e.g. when
+                restoring a stream; at least the lookahead
+        """
+        self.floor_number = floor_number
+        self.floor_data = floor_data
+        self.seed = str(seed)
+        self.lookahead = max(1, lookahead)
+
+        self.node_count = _draw_node_count(floor_data, self._rng('size'))
+        self.row_total = _row_count(self.node_count)
+        self.rows_generated = 0
+        self._sampler = node_type_sampler(floor_data)
+        self._difficulty_ranges = {}
+        self._previous_row = []
+        self.layout = {
+            "start": {
+                "id": "start",
+                "type": "start",
+                "position": {"row": 0, "col": 1},
+                "paths": [],
+                "visited": True
+            },
+            # No boss slot until the last row exists, so validate_map checks
+            # the generated part as it stands
+            "nodes": {}
+        }
+        self.ensure_row(max(rows, self.lookahead))
+
+    def _rng(self, part):
+        # String seeds are hashed with SHA-512, so rows do not depend on PYTHONHASHSEED
+        return random.Random(f"{self.seed}:{self.floor_number}:{part}")
+
+    def _row_size(self, row):
+        return min(NODES_PER_ROW, self.node_count - (row - 1) * NODES_PER_ROW)
+
+    @property
+    def complete(self):
+        """bool: True once every row and the boss are generated"""
+        return self.rows_generated >= self.row_total
+
+    def row_of(self, node_id):
+        """Get the row of a generated node, or None if it is not generated"""
+        if node_id == "start":
+            return 0
+        node = self.layout["nodes"].get(node_id) or (
+            self.layout.get("boss") if node_id == "boss" else None)
+        return None if node is None else node["position"]["row"]
+
+    def ensure_row(self, row):
+        """
+        Generate rows up to and including a row.
+
+        Args:
+            row (int): Last row that must exist
+
+        Returns:
+            bool: True if any row was generated
+        """
+        target = min(row, self.row_total)
+        generated = self.rows_generated < target
+        while self.rows_generated < target:
+            self._generate_row(self.rows_generated + 1)
+        return generated
+
+    def advance_to(self, node_id):
+        """
+        Keep the lookahead generated past the player's node.
+
+        Args:
+            node_id (str): Node the player is on
+
+        Returns:
+            bool: True if any row was generated
+        """
+        row = self.row_of(node_id)
+        return row is not None and self.ensure_row(row + self.lookahead)
+
+    def _generate_row(self, row):
+        rng = self._rng(row)
+        size = self._row_size(row)
+        first_id = (row - 1) * NODES_PER_ROW + 1
+
+        nodes = []
+        for col in range(size):
+            node_type = self._sampler.sample(rng)
+            difficulty_range = self._difficulty_ranges.get(node_type)
+            if difficulty_range is None:
+                difficulty_range = self._difficulty_ranges[node_type] = _difficulty_range(self.floor_data, node_type)
+            node = {
+                "id": f"node_{first_id + col}",
+                "type": node_type,
+                "title": get_node_title(node_type),
+                "position": {"row": row, "col": _column_position(col, size)},
+                "difficulty": _draw_difficulty(difficulty_range, rng),
+                "paths": [],
+                "visited": False
+            }
+            self.layout["nodes"][node["id"]] = node
+            nodes.append(node)
+
+        if row == 1:
+            self.layout["start"]["paths"].extend(node["id"] for node in nodes)
+        else:
+            _link_rows(self._previous_row, nodes, rng)
+
+        if row == self.row_total:
+            for node in nodes:
+                node["paths"].append("boss")
+            self.layout["boss"] = _boss_node(self.floor_number, self.floor_data, row + 1)
+
+        self._previous_row = nodes
+        self.rows_generated = row
+
+    def to_dict(self):
+        """
+        Serialize the stream; generated rows are rebuilt from the seed on restore.
+
+        Returns:
+            dict: Floor number, seed, lookahead and rows generated
+        """
+        return {
+            'floor': self.floor_number,
+            'seed': self.seed,
+            'lookahead': self.lookahead,
+            'rows': self.rows_generated
+        }
+
+    @classmethod
+    def from_dict(cls, data, floor_data):
+        """
+        Rebuild a stream from its serialized form.
+
+        Args:
+            data (dict): Data produced by to_dict
+            floor_data (dict): Configuration of the stream's floor
+
+        Returns:
+            FloorStream: Stream with the same rows generated
+        """
+        return cls(data['floor'], floor_data, data['seed'],
+                   lookahead=data.get('lookahead', DEFAULT_LOOKAHEAD), rows=data.get('rows', 0))
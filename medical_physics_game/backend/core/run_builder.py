@@ -0,0 +1,246 @@
+"""
+Run builder for the Medical Physics Game.
+Generates the layouts of every generated floor in maps/floors.json for a
+new run at once, fanning the floors out over a process pool. Each floor
+draws from its own seed derived from the run seed, so a run plan is the
+same whichever process built it, and the same as the floors a seeded run
+would otherwise generate one at a time.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.core.layout_codec import decode_layout, encode_layout
+from backend.core.map_geometry import layout_geometry
+from backend.core.map_generator import fallback_floor_layout, floor_rng, validate_map
+from backend.core.map_prefabs import generate_layout
+
+# Generation attempts before giving up on producing a valid layout
+MAX_ATTEMPTS = 5
+
+# Seconds to wait for pooled floors before building the rest of a run inline
+DEFAULT_TIMEOUT = 10.0
+
+
+def new_run_seed():
+    """Create a random run seed"""
+    return uuid.uuid4().hex[:16]
+
+
+def build_floor_layout(floor_number, floor_data, run_seed):
+    """
+    Generate the validated layout a run plays on a floor.
+
+    Invalid layouts are regenerated from the same generator, so retries are
+    as reproducible as the first attempt; if every attempt fails, the floor's
+    fallback layout is used. The layout's geometry is computed here too, so
+    it is drawn without further work on the request path.
+
+    Args:
+        floor_number (int): Floor number
+        floor_data (dict): Floor configuration
+        run_seed (str): Seed of the run
+
+    Returns:
+        dict: First valid layout, or the fallback layout if none validated
+    """
+    rng = floor_rng(run_seed, floor_number)
+    for _ in range(MAX_ATTEMPTS):
+        layout = generate_layout(floor_number, floor_data, rng)
+        if validate_map(layout):
+            break
+    else:
+        layout = fallback_floor_layout(floor_number, floor_data)
+    layout_geometry(layout)
+    return layout
+
+
+def _build_encoded(floor_number, floor_data, run_seed):
+    """Pool task: build one floor and ship it back in the compact encoding"""
+    return encode_layout(build_floor_layout(floor_number, floor_data, run_seed))
+
+
+def _warm_up():
+    """Pool task: nothing, run once per worker so it is spawned and has imported this module"""
+    return os.getpid()
+
+
+class RunBuilder:
+    """Builds whole-run floor plans on a shared process pool."""
+
+    def __init__(self, max_workers=None, timeout=DEFAULT_TIMEOUT):
+        """
+        Initialize the builder; the pool is started by start() or on first use.
+
+        Args:
+            max_workers (int, optional): Pool processes, defaults to the
+                RUN_BUILDER_WORKERS environment variable or the CPU count
+            timeout (float, optional): Seconds to wait for pooled floors
+        """
+        self.max_workers = int(max_workers or os.environ.get('RUN_BUILDER_WORKERS', 0)
+                               or os.cpu_count() or 1)
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        # One pooled build at a time per worker; builds beyond that run inline
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self.stats = {'runs': 0, 'pooled_floors': 0, 'inline_floors': 0, 'pool_errors': 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the server's threads and locks,
+                # which forking a process with a background saver would
+                self._executor = ProcessPoolExecutor(self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def start(self):
+        """
+        Spawn the pool's workers ahead of the first run, without waiting for them.
+
+        Returns:
+            bool: True if the pool is in use, False with a single worker
+        """
+        if self.max_workers <= 1:
+            return False
+        try:
+            executor = self._get_executor()
+            for _ in range(self.max_workers):
+                executor.submit(_warm_up)
+        except (BrokenProcessPool, OSError, RuntimeError):
+            self._reset_executor()
+            return False
+        return True
+
+    def build(self, run_seed=None, floor_configs=None):
+        """
+        Build the floors of a run.
+
+        Args:
+            run_seed (str, optional): Seed of the run, a new one by default
+            floor_configs (dict, optional): Floor configurations keyed by floor
+                number, defaults to maps/floors.json
+
+        Returns:
+            dict: Run plan with 'run_seed', 'floors' (floor number -> validated
+                  layout for generated floors) and 'templates' (floor number ->
+                  shared template key for authored floors)
+        """
+        if floor_configs is None:
+            from backend.core.floor_templates import FloorTemplateRegistry
+            floor_configs = FloorTemplateRegistry.get_floor_configs()
+        run_seed = new_run_seed() if run_seed is None else str(run_seed)
+
+        plan = {'run_seed': run_seed, 'floors': {}, 'templates': {}}
+        jobs = {}
+        for floor_number, floor_data in sorted(floor_configs.items()):
+            if floor_data.get('nodes'):
+                plan['templates'][floor_number] = f'floor:{floor_number}'
+            else:
+                jobs[floor_number] = floor_data
+
+        pooled = {}
+        # A pool only pays off with several floors and several cores
+        if len(jobs) > 1 and self.max_workers > 1 and self._slots.acquire(blocking=False):
+            try:
+                pooled = self._build_pooled(jobs, run_seed)
+            finally:
+                self._slots.release()
+
+        for floor_number, floor_data in jobs.items():
+            if floor_number in pooled:
+                plan['floors'][floor_number] = pooled[floor_number]
+            else:
+                plan['floors'][floor_number] = build_floor_layout(floor_number, floor_data, run_seed)
+
+        with self._lock:
+            self.stats['pooled_floors'] += len(pooled)
+            self.stats['inline_floors'] += len(jobs) - len(pooled)
+            self.stats['runs'] += 1
+        return plan
+
+    def _build_pooled(self, jobs, run_seed):
+        """Build floors on the pool; floors it fails to deliver are left out"""
+        try:
+            executor = self._get_executor()
+            futures = {floor_number: executor.submit(_build_encoded, floor_number, floor_data, run_seed)
+                       for floor_number, floor_data in jobs.items()}
+        except (BrokenProcessPool, OSError, RuntimeError):
+            self._reset_executor()
+            return {}
+
+        layouts = {}
+        broken = False
+        deadline = time.monotonic() + self.timeout
+        for floor_number, future in futures.items():
+            try:
+                encoded = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                layouts[floor_number] = decode_layout(encoded)
+            except Exception as e:
+                # Timeouts and worker crashes fall back to inline generation
+                with self._lock:
+                    self.stats['pool_errors'] += 1
+                future.cancel()
+                broken = broken or isinstance(e, BrokenProcessPool)
+
+        if broken:
+            self._reset_executor()
+        return layouts
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop the pool's worker processes"""
+        self._reset_executor()
+
+
+# Global builder instance
+_run_builder = None
+_builder_lock = threading.Lock()
+
+def get_run_builder():
+    """
+    Get the global run builder.
+
+    Returns:
+        RunBuilder: Global run builder
+    """
+    global _run_builder
+    if _run_builder is None:
+        with _builder_lock:
+            if _run_builder is None:
+                import atexit
+                _run_builder = RunBuilder()
+                atexit.register(_run_builder.shutdown)
+    return _run_builder
+
+def init_run_builder(app):
+    """
+    Spawn the run builder's workers at app start when RUN_BUILDER_ENABLED is set.
+
+    Otherwise the pool is only started by the first prebuilt run, so building
+    an app (in tests, or in each server worker) spawns no processes.
+
+    Args:
+        app (Flask): Application whose config (or environment) may set
+            RUN_BUILDER_ENABLED
+
+    Returns:
+        bool: True if the pool was started
+    """
+    enabled = app.config.get('RUN_BUILDER_ENABLED', os.environ.get('RUN_BUILDER_ENABLED', False))
+    if isinstance(enabled, str):
+        enabled = enabled.lower() in ('1', 'true', 'yes', 'on')
+    if not enabled:
+        return False
+    return get_run_builder().start()
@@ -0,0 +1,183 @@
+"""
+Save journal for the Medical Physics Game.
+Stores a save slot as a snapshot plus an append-only journal of small
+change records, compacting the journal into a new snapshot periodically
+so that saving costs the size of the change rather than the size of the map.
+
+Writes go through the background saver. Each compaction bumps a generation
+number stored in both the snapshot and the first line of the journal, so
+after a crash between the two writes a stale journal is recognised and not
+replayed twice.
+"""
+
+import json
+import os
+
+from backend.utils.db_utils import get_data_path
+from backend.utils.save_format import SaveFormatError, decode_save, encode_save
+from backend.utils.save_writer import get_background_saver
+
+# Journal length at which the next save writes a fresh snapshot instead
+COMPACT_THRESHOLD = 50
+
+
+class SaveJournal:
+    """Snapshot and change journal for one save slot."""
+
+    def __init__(self, save_slot=0, directory=None, compact_threshold=COMPACT_THRESHOLD, saver=None):
+        """
+        Initialize the journal.
+
+        Args:
+            save_slot (int, optional): Save slot number
+            directory (str, optional): Directory holding the save files
+            compact_threshold (int, optional): Records after which to compact
+            saver (BackgroundSaver, optional): Writer for the save files
+        """
+        self.save_slot = save_slot
+        self.directory = directory or get_data_path()
+        self.compact_threshold = compact_threshold
+        self.snapshot_path = os.path.join(self.directory, f'save_{save_slot}.sav')
+        self.legacy_snapshot_path = os.path.join(self.directory, f'save_{save_slot}.json')
+        self.journal_path = os.path.join(self.directory, f'save_{save_slot}.journal')
+        self.record_count = 0
+        self.generation = 0
+        self.saver = saver or get_background_saver()
+        # Journal reset queued by the last compaction; it fails if the snapshot does
+        self._compaction = None
+
+    def needs_compaction(self, pending=0):
+        """
+        Check whether the next save should write a snapshot.
+
+        Args:
+            pending (int, optional): Records about to be appended
+
+        Returns:
+            bool: True if the journal would grow past the threshold, or the
+                  last compaction failed to write
+        """
+        return self._compaction_failed() or self.record_count + pending > self.compact_threshold
+
+    def _compaction_failed(self):
+        return self._compaction is not None and self._compaction.success is False
+
+    def append(self, records):
+        """
+        Queue change records for appending to the journal.
+
+        Args:
+            records (list): Change records (dicts)
+
+        Returns:
+            bool: True if the records were queued (or written, in sync mode),
+                  False if they failed or the journal awaits a new snapshot
+        """
+        # After a failed compaction the journal on disk belongs to the old
+        # snapshot; these records only fit the snapshot that was never written
+        if self._compaction_failed():
+            return False
+        if not records:
+            return True
+
+        try:
+            lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+        except (TypeError, ValueError):
+            return False
+
+        ticket = self.saver.append(self.journal_path, lines.encode('utf-8'))
+        if ticket.success is False:
+            return False
+        self.record_count += len(records)
+        return True
+
+    def compact(self, snapshot):
+        """
+        Queue a new snapshot and an empty journal for it.
+
+        If the previous compaction failed, this one is written synchronously,
+        so the journal is back on a snapshot that exists before more records
+        are appended.
+
+        Args:
+            snapshot (dict): Full serialized game state
+
+        Returns:
+            bool: True if the snapshot was queued (or written, in sync mode)
+        """
+        retry = self._compaction_failed()
+        generation = self.generation + 1
+        try:
+            blob = encode_save(dict(snapshot, journal_generation=generation))
+        except (TypeError, ValueError):
+            return False
+
+        snapshot_ticket = self.saver.write(self.snapshot_path, blob)
+        # The snapshot already contains every journaled change. The journal is
+        # only reset once the snapshot is durable, and kept if writing it
+        # fails, so the journaled records are never lost
+        header = json.dumps({'generation': generation}) + '\n'
+        journal_ticket = self.saver.write(self.journal_path, header.encode('utf-8'),
+                                          after=snapshot_ticket)
+        if retry:
+            journal_ticket.wait()
+        if snapshot_ticket.success is False or journal_ticket.success is False:
+            return False
+
+        self.generation = generation
+        self.record_count = 0
+        self._compaction = journal_ticket
+        return True
+
+    def load(self):
+        """
+        Read the latest snapshot and the journal tail written after it.
+
+        Snapshots in older formats, including legacy JSON saves, are migrated
+        in memory; the next compaction writes them in the current format.
+
+        Returns:
+            tuple: (snapshot dict, list of change records), or (None, []) if the
+                   slot has no snapshot
+        """
+        # Anything still queued for this slot must land before we read it
+        self.saver.flush()
+
+        snapshot = None
+        for path in (self.snapshot_path, self.legacy_snapshot_path):
+            try:
+                with open(path, 'rb') as f:
+                    snapshot = decode_save(f.read())
+                break
+            except FileNotFoundError:
+                continue
+            except SaveFormatError:
+                return None, []
+
+        if snapshot is None:
+            return None, []
+
+        self.generation = snapshot.pop('journal_generation', 0)
+
+        records = []
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-append; drop the tail
+                        break
+                    if 'op' not in record:
+                        if record.get('generation') != self.generation:
+                            # Journal belongs to an older snapshot that was
+                            # replaced before the journal could be reset
+                            break
+                        continue
+                    records.append(record)
+        except FileNotFoundError:
+            pass
+
+        self.record_count = len(records)
+        self._compaction = None
+        return snapshot, records
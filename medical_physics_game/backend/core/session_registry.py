@@ -0,0 +1,411 @@
+"""
+Session registry for the Medical Physics Game.
+Keeps a bounded working set of GameState objects keyed by session ID,
+evicting the least recently used ones to durable storage and rehydrating
+them transparently on the next request.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from backend.utils.db_utils import get_data_path
+
+# Default age after which an unsaved run counts as abandoned, and time
+# between sweeps for them, in seconds
+DEFAULT_SESSION_MAX_AGE = 7 * 24 * 3600
+DEFAULT_REAP_INTERVAL = 3600
+
+
+class FileSessionStore:
+    """Durable session storage with one compact JSON file per session."""
+
+    def __init__(self, directory=None):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str, optional): Directory for session files,
+                defaults to <data>/sessions
+        """
+        self.directory = directory or os.path.join(get_data_path(), 'sessions')
+
+    def _path(self, session_id):
+        safe_id = ''.join(c for c in str(session_id) if c.isalnum() or c in '-_')
+        return os.path.join(self.directory, f'{safe_id}.json')
+
+    def save(self, session_id, data):
+        """
+        Persist session data.
+
+        Args:
+            session_id (str): Session identifier
+            data (dict): Serialized game state
+
+        Returns:
+            bool: True if the data was written, False otherwise
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(session_id), 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            return True
+        except (IOError, TypeError):
+            return False
+
+    def load(self, session_id):
+        """
+        Load session data.
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            dict: Serialized game state, or None if the session is unknown
+        """
+        try:
+            with open(self._path(session_id), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def delete(self, session_id):
+        """
+        Remove session data.
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            bool: True if data was removed, False if there was none
+        """
+        try:
+            os.remove(self._path(session_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class SessionRegistry:
+    """Bounded, LRU-evicting map of session IDs to GameState objects."""
+
+    def __init__(self, store=None, max_sessions=1000, state_factory=None):
+        """
+        Initialize the registry.
+
+        Args:
+            store (object, optional): Durable store with save/load/delete methods,
+                defaults to the SQLite store set up by init_session_store, or
+                to a sharded store when SESSION_SHARDS is set
+            max_sessions (int, optional): Maximum number of sessions kept in memory
+            state_factory (callable, optional): Creates a fresh GameState
+        """
+        if state_factory is None:
+            from backend.core.state_manager import GameState
+            state_factory = GameState
+
+        if store is None:
+            from backend.data.repositories.session_repo import (
+                ShardedSessionStore, SQLiteSessionStore)
+            if os.environ.get('SESSION_SHARDS'):
+                store = ShardedSessionStore(_store_settings.get('SESSION_SHARD_DIR'))
+            else:
+                store = SQLiteSessionStore(_store_settings.get('SESSION_DB_PATH'))
+
+        self.store = store
+        self.max_sessions = max_sessions
+        self.state_factory = state_factory
+
+        self._sessions = OrderedDict()
+        self._evicting = {}
+        self._locks = {}
+        self._pins = {}
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'rehydrated': 0, 'created': 0, 'evicted': 0}
+
+    @contextmanager
+    def session(self, session_id):
+        """
+        Lock a session and yield its GameState.
+
+        Only one thread works on a given session at a time; other sessions
+        are unaffected.
+
+        Args:
+            session_id (str): Session identifier
+
+        Yields:
+            GameState: The session's game state
+        """
+        try:
+            with self._locked(session_id):
+                yield self._get(session_id)
+        finally:
+            self._evict_overflow()
+
+    @contextmanager
+    def _locked(self, session_id):
+        """Hold a session's lock, creating it on first use and dropping it once unused"""
+        with self._lock:
+            entry = self._locks.get(session_id)
+            if entry is None:
+                entry = self._locks[session_id] = [threading.RLock(), 0]
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                self._release_lock(session_id, entry)
+
+    def _release_lock(self, session_id, entry):
+        """Unpin a session's lock; the caller holds the registry lock"""
+        entry[1] -= 1
+        if entry[1] == 0 and session_id not in self._sessions and self._locks.get(session_id) is entry:
+            del self._locks[session_id]
+
+    def pin(self, session_id):
+        """
+        Keep a session in memory and hand out its GameState.
+
+        A pinned session is never evicted, so changes made through the
+        returned object are not lost; each pin is undone by one unpin().
+        The caller does not hold the session's lock.
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            GameState: The session's game state
+        """
+        with self._locked(session_id):
+            game_state = self._get(session_id)
+            with self._lock:
+                self._pins[session_id] = self._pins.get(session_id, 0) + 1
+        return game_state
+
+    def unpin(self, session_id):
+        """
+        Undo one pin() of a session, letting it be evicted once unpinned.
+
+        Args:
+            session_id (str): Session identifier
+        """
+        with self._lock:
+            count = self._pins.get(session_id, 0)
+            if count > 1:
+                self._pins[session_id] = count - 1
+            else:
+                self._pins.pop(session_id, None)
+        self._evict_overflow()
+
+    def _get(self, session_id):
+        """Find a session in memory, rehydrate it from the store, or create it"""
+        with self._lock:
+            game_state = self._sessions.get(session_id)
+            if game_state is not None:
+                self._sessions.move_to_end(session_id)
+                self.stats['hits'] += 1
+                return game_state
+
+            game_state = self._evicting.get(session_id)
+            if game_state is not None:
+                self._sessions[session_id] = game_state
+                self.stats['hits'] += 1
+                return game_state
+
+        # Load outside the registry lock so other sessions are not blocked on I/O;
+        # the caller holds this session's lock, so nobody else can load it too.
+        data = self.store.load(session_id)
+        if data is not None:
+            game_state = self._restore(data)
+            stat = 'rehydrated'
+        else:
+            game_state = self.state_factory()
+            stat = 'created'
+
+        # Live changes are published on the session's own event channel
+        game_state.event_channel = session_id
+        with self._lock:
+            self._sessions[session_id] = game_state
+            self.stats[stat] += 1
+        return game_state
+
+    def _restore(self, data):
+        game_state = self.state_factory()
+        game_state.restore(data)
+        return game_state
+
+    def _evict_overflow(self):
+        """Write the least recently used idle sessions to the store until under budget"""
+        victims = []
+        with self._lock:
+            overflow = len(self._sessions) - self.max_sessions
+            if overflow <= 0:
+                return
+
+            for session_id in list(self._sessions):
+                if overflow <= 0:
+                    break
+                entry = self._locks.get(session_id)
+                if (entry is not None and entry[1] > 0) or session_id in self._pins:
+                    continue
+
+                # Pin the session's lock, so a request for it waits until it is written
+                if entry is None:
+                    entry = self._locks[session_id] = [threading.RLock(), 0]
+                entry[1] += 1
+                game_state = self._sessions.pop(session_id)
+                self._evicting[session_id] = game_state
+                victims.append((session_id, game_state, entry))
+                overflow -= 1
+
+        for session_id, game_state, entry in victims:
+            with entry[0]:
+                with self._lock:
+                    # Discarded meanwhile: do not write it back
+                    current = self._evicting.get(session_id) is game_state
+                if current:
+                    self.store.save(session_id, game_state.to_dict())
+                with self._lock:
+                    if self._evicting.get(session_id) is game_state:
+                        del self._evicting[session_id]
+                    # A request may have taken the session back meanwhile
+                    if current and session_id not in self._sessions:
+                        self.stats['evicted'] += 1
+                    self._release_lock(session_id, entry)
+
+    def save(self, session_id):
+        """
+        Checkpoint a session to the store.
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            bool: True if the session was written, False otherwise
+        """
+        with self.session(session_id) as game_state:
+            return self.store.save(session_id, game_state.to_dict())
+
+    def discard(self, session_id):
+        """
+        Forget a session both in memory and in the store.
+
+        Args:
+            session_id (str): Session identifier
+        """
+        # Wait for any request or eviction working on the session
+        with self._locked(session_id):
+            with self._lock:
+                self._sessions.pop(session_id, None)
+                self._evicting.pop(session_id, None)
+                self._pins.pop(session_id, None)
+            self.store.delete(session_id)
+
+    def flush(self):
+        """
+        Write every in-memory session to the store.
+
+        Returns:
+            int: Number of sessions written
+        """
+        with self._lock:
+            session_ids = list(self._sessions)
+
+        written = 0
+        for session_id in session_ids:
+            with self._locked(session_id):
+                # Evicted or replaced since the listing: write what is current now
+                with self._lock:
+                    game_state = self._sessions.get(session_id)
+                if game_state is not None:
+                    self.store.save(session_id, game_state.to_dict())
+                    written += 1
+        return written
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+
+
+# Global session registry instance
+_session_registry = None
+_registry_lock = threading.Lock()
+
+# Store locations taken from the app config by init_session_store
+_store_settings = {}
+
+def get_session_registry():
+    """
+    Get the global session registry.
+
+    Returns:
+        SessionRegistry: Global session registry
+    """
+    global _session_registry
+    if _session_registry is None:
+        with _registry_lock:
+            if _session_registry is None:
+                _session_registry = SessionRegistry()
+    return _session_registry
+
+def init_session_store(app):
+    """
+    Point the global registry at the app's session storage.
+
+    The store is only opened by the first session request, so building an
+    app does not touch the database.
+
+    Args:
+        app (Flask): Application whose config may set SESSION_DB_PATH (SQLite
+            file) and SESSION_SHARD_DIR (sharded store directory); otherwise
+            the environment variables of the same names, then the files under
+            the project root, are used
+    """
+    global _session_registry
+    settings = {name: app.config[name] for name in ('SESSION_DB_PATH', 'SESSION_SHARD_DIR')
+                if app.config.get(name)}
+    with _registry_lock:
+        if settings == _store_settings:
+            return
+        # A registry on the old store keeps its sessions there
+        if _session_registry is not None:
+            _session_registry.flush()
+            _session_registry = None
+        _store_settings.clear()
+        _store_settings.update(settings)
+
+def init_session_reaper(app):
+    """
+    Start deleting abandoned runs from the global registry's store.
+
+    Args:
+        app (Flask): Application whose config (or environment) may set
+            SESSION_MAX_AGE and SESSION_REAP_INTERVAL in seconds; a max age
+            of 0 turns reaping off
+
+    Returns:
+        bool: True if a reaper was started, False if it is off or the store
+              cannot reap
+    """
+    def setting(name, default):
+        return float(app.config.get(name, os.environ.get(name, default)))
+
+    max_age = setting('SESSION_MAX_AGE', DEFAULT_SESSION_MAX_AGE)
+    interval = setting('SESSION_REAP_INTERVAL', DEFAULT_REAP_INTERVAL)
+    if max_age <= 0:
+        return False
+    store = get_session_registry().store
+    if not hasattr(store, 'start_reaper'):
+        return False
+    store.start_reaper(max_age, interval)
+    return True
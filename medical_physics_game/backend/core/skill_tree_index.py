@@ -0,0 +1,131 @@
+"""
+Skill tree index for the Medical Physics Game.
+Compiles the skill tree once into integer node numbers, one prerequisite
+bitmask per node, dependents lists and a topological order, so a
+character's unlocked skills become a single int and availability checks
+are bit operations instead of scans over the node list.
+"""
+
+from collections import deque
+
+
+class SkillTreeIndex:
+    """Read-only, bitmask-indexed view of the skill tree's nodes."""
+
+    __slots__ = ('nodes', 'ids', 'index', 'prerequisite_masks', 'dependents', 'order', 'blocked_mask')
+
+    def __init__(self, nodes):
+        """
+        Compile the index.
+
+        Args:
+            nodes (list): SkillTreeNode objects; bit i of every mask is nodes[i]
+        """
+        self.nodes = tuple(nodes)
+        self.ids = tuple(node.id for node in self.nodes)
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+
+        masks = []
+        dependents = [[] for _ in self.nodes]
+        blocked = 0
+        for i, node in enumerate(self.nodes):
+            mask = 0
+            for prerequisite in node.prerequisites:
+                j = self.index.get(prerequisite)
+                if j is None:
+                    # A prerequisite missing from the tree can never be unlocked
+                    blocked |= 1 << i
+                    continue
+                if not mask & (1 << j):
+                    mask |= 1 << j
+                    dependents[j].append(i)
+            masks.append(mask)
+        self.prerequisite_masks = tuple(masks)
+        self.dependents = tuple(tuple(targets) for targets in dependents)
+
+        # Kahn's algorithm; nodes on a prerequisite cycle are left out and blocked
+        indegree = [bin(mask).count('1') for mask in masks]
+        queue = deque(i for i, degree in enumerate(indegree) if degree == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j in self.dependents[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    queue.append(j)
+        self.order = tuple(order)
+        for i, degree in enumerate(indegree):
+            if degree > 0:
+                blocked |= 1 << i
+        self.blocked_mask = blocked
+
+    def index_of(self, node_id):
+        """Get a node's integer index, or None if it is not in the tree"""
+        return self.index.get(node_id)
+
+    def mask_of(self, node_ids):
+        """
+        Build the bitmask of a set of node IDs.
+
+        Args:
+            node_ids (iterable): Node IDs; IDs not in the tree are ignored
+
+        Returns:
+            int: Bitmask with the nodes' bits set
+        """
+        mask = 0
+        for node_id in node_ids:
+            i = self.index.get(node_id)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def ids_of(self, mask):
+        """Get the node IDs of a bitmask, in tree order"""
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return ids
+
+    def prerequisites_met(self, i, unlocked_mask):
+        """Check whether every prerequisite of node i is in the unlocked mask"""
+        return not (self.blocked_mask >> i) & 1 and not self.prerequisite_masks[i] & ~unlocked_mask
+
+    def available_mask(self, unlocked_mask):
+        """
+        Get the nodes that are locked but have all prerequisites unlocked.
+
+        Args:
+            unlocked_mask (int): Bitmask of unlocked nodes
+
+        Returns:
+            int: Bitmask of the available nodes
+        """
+        available = 0
+        for i, mask in enumerate(self.prerequisite_masks):
+            if not mask & ~unlocked_mask:
+                available |= 1 << i
+        return available & ~unlocked_mask & ~self.blocked_mask
+
+    def newly_available(self, i, unlocked_mask):
+        """
+        Get the nodes that unlocking node i makes available.
+
+        Args:
+            i (int): Node just unlocked
+            unlocked_mask (int): Bitmask of unlocked nodes, including node i
+
+        Returns:
+            list: Indexes of the dependents whose prerequisites are now all met
+        """
+        return [j for j in self.dependents[i]
+                if not (unlocked_mask >> j) & 1 and self.prerequisites_met(j, unlocked_mask)]
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node_id):
+        return node_id in self.index
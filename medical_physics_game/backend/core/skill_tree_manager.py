@@ -11,11 +11,37 @@ It handles:
 
 import json
 import os
+import threading
+from backend.core.skill_tree_index import SkillTreeIndex
 from backend.data.models.skill_tree import SkillTreeNode
 from backend.utils.logging import GameLogger
 
 logger = GameLogger()
 
+# Index of the last skill tree loaded, shared by every manager using that tree
+_index_cache = (None, None)
+_index_lock = threading.Lock()
+
+def get_skill_tree_index(nodes):
+    """
+    Get the compiled index of a skill tree, compiling it once per loaded tree.
+    
+    Args:
+        nodes (list): Skill tree nodes, as returned by SkillTreeRepository
+        
+    Returns:
+        SkillTreeIndex: Index of the tree
+    """
+    global _index_cache
+    cached_nodes, index = _index_cache
+    if cached_nodes is not nodes or len(index) != len(nodes):
+        with _index_lock:
+            cached_nodes, index = _index_cache
+            if cached_nodes is not nodes or len(index) != len(nodes):
+                index = SkillTreeIndex(nodes)
+                _index_cache = (nodes, index)
+    return index
+
 class SkillTreeManager:
     def __init__(self, character_id):
         """
@@ -26,7 +52,10 @@ class SkillTreeManager:
         """
         self.character_id = character_id
         self.nodes = self._load_skill_tree()
+        self.index = get_skill_tree_index(self.nodes)
         self._load_character_data()
+        # Unlocked skills as a bitmask over the index; unlocked_nodes keeps the list form
+        self.unlocked_mask = self.index.mask_of(self.unlocked_nodes)
         
     def _load_skill_tree(self):
         """Load the skill tree structure from the data file"""
@@ -59,18 +88,7 @@ class SkillTreeManager:
         Returns:
             list: A list of node IDs that can be unlocked
         """
-        available_nodes = []
-        
-        for node in self.nodes:
-            # Skip already unlocked nodes
-            if node.id in self.unlocked_nodes:
-                continue
-                
-            # Check if prerequisites are met
-            if self.are_prerequisites_met(node.id):
-                available_nodes.append(node.id)
-                
-        return available_nodes
+        return self.index.ids_of(self.index.available_mask(self.unlocked_mask))
         
     def are_prerequisites_met(self, node_id):
         """
@@ -82,19 +100,12 @@ class SkillTreeManager:
         Returns:
             bool: True if all prerequisites are met, False otherwise
         """
-        # Find the node
-        node = next((n for n in self.nodes if n.id == node_id), None)
-        
-        if not node:
+        i = self.index.index_of(node_id)
+        if i is None:
             logger.warning(f"Node {node_id} not found in skill tree")
             return False
             
-        # If no prerequisites, always available
-        if not node.prerequisites:
-            return True
-            
-        # Check if all prerequisites are in unlocked nodes
-        return all(prereq in self.unlocked_nodes for prereq in node.prerequisites)
+        return self.index.prerequisites_met(i, self.unlocked_mask)
         
     def can_unlock_node(self, node_id):
         """
@@ -106,25 +117,27 @@ class SkillTreeManager:
         Returns:
             bool: True if the node can be unlocked, False otherwise
         """
-        # Check if node exists
-        node = next((n for n in self.nodes if n.id == node_id), None)
-        if not node:
+        i = self.index.index_of(node_id)
+        if i is None:
             logger.warning(f"Node {node_id} not found in skill tree")
             return False
-            
-        # Check if already unlocked
-        if node_id in self.unlocked_nodes:
-            return False
-            
-        # Check prerequisites
-        if not self.are_prerequisites_met(node_id):
+        return self._can_unlock(i)
+        
+    def _can_unlock(self, i):
+        """Check node i: locked, prerequisites met and enough skill points"""
+        if (self.unlocked_mask >> i) & 1:
             return False
             
-        # Check if enough skill points
-        if not self.character or self.character.skill_points < node.cost:
+        if not self.index.prerequisites_met(i, self.unlocked_mask):
             return False
             
-        return True
+        return bool(self.character) and self.character.skill_points >= self.index.nodes[i].cost
+        
+    def _node_status(self, i):
+        """Get node i's status: 'unlocked', 'available' or 'locked'"""
+        if (self.unlocked_mask >> i) & 1:
+            return 'unlocked'
+        return 'available' if self._can_unlock(i) else 'locked'
         
     def unlock_node(self, node_id):
         """
@@ -139,13 +152,14 @@ class SkillTreeManager:
         if not self.can_unlock_node(node_id):
             return False
             
-        # Find the node
-        node = next((n for n in self.nodes if n.id == node_id), None)
+        i = self.index.index_of(node_id)
+        node = self.index.nodes[i]
         
         # Deduct skill points
         self.character.skill_points -= node.cost
         
         # Add to unlocked nodes
+        self.unlocked_mask |= 1 << i
         self.unlocked_nodes.append(node_id)
         self.character.unlocked_skills = self.unlocked_nodes
         
@@ -218,19 +232,11 @@ class SkillTreeManager:
         Returns:
             dict: Node details including status (unlocked/available/locked)
         """
-        # Find the node
-        node = next((n for n in self.nodes if n.id == node_id), None)
-        
-        if not node:
+        i = self.index.index_of(node_id)
+        if i is None:
             return None
-            
-        # Determine status
-        if node_id in self.unlocked_nodes:
-            status = 'unlocked'
-        elif self.can_unlock_node(node_id):
-            status = 'available'
-        else:
-            status = 'locked'
+        node = self.index.nodes[i]
+        status = self._node_status(i)
             
         # Convert node to dictionary
         node_dict = {
@@ -242,7 +248,7 @@ class SkillTreeManager:
             'effects': node.effects,
             'category': node.category,
             'position': node.position,
-            'icon': node.icon,
+            'icon': getattr(node, 'icon', None),
             'status': status
         }
         
@@ -257,14 +263,8 @@ class SkillTreeManager:
         """
         nodes_data = []
         
-        for node in self.nodes:
-            # Determine status
-            if node.id in self.unlocked_nodes:
-                status = 'unlocked'
-            elif self.can_unlock_node(node.id):
-                status = 'available'
-            else:
-                status = 'locked'
+        for i, node in enumerate(self.index.nodes):
+            status = self._node_status(i)
                 
             nodes_data.append({
                 'id': node.id,
@@ -274,7 +274,7 @@ class SkillTreeManager:
                 'prerequisites': node.prerequisites,
                 'category': node.category,
                 'position': node.position,
-                'icon': node.icon,
+                'icon': getattr(node, 'icon', None),
                 'status': status
             })
             
@@ -8,7 +8,12 @@ import random
 import os
 from backend.data.repositories.character_repo import CharacterRepository
 from backend.data.repositories.question_repo import QuestionRepository
-from backend.data.models.node import Node
+from backend.core.floor_graph import VisitedSet
+from backend.core.floor_templates import FloorTemplate, FloorTemplateRegistry
+from backend.core.layout_codec import decode_floor_graph, encode_floor_graph
+from backend.core.map_stream import FloorStream, stream_lookahead
+from backend.core.save_journal import COMPACT_THRESHOLD, SaveJournal
+from backend.utils.async_bridge import event_broker
 from backend.utils.db_utils import get_data_path
 
 class GameState:
@@ -18,8 +23,16 @@ class GameState:
         """Initialize a new game state."""
         self.character = None
         self.current_floor = 1
-        self.current_map = []
-        self.visited_nodes = []
+        # Seed for reproducible floors (daily challenges, reruns), None for random ones
+        self.run_seed = None
+        self.floor_template = FloorTemplate([])
+        # Generator of the current floor when it is streamed row by row
+        self.floor_stream = None
+        # Prebuilt layouts of the run's upcoming floors, by floor number; not
+        # saved, since their seeded keys rebuild them
+        self.run_plan = {}
+        self._visited = VisitedSet()
+        self.node_content = {}
         self.current_node_id = None
         self.score = 0
         self.reputation = 0
@@ -29,12 +42,111 @@ class GameState:
         self.character_repo = CharacterRepository()
         self.question_repo = QuestionRepository()
         
-    def new_game(self, character_id):
+        # Change records not yet written to the save journal
+        self._pending_changes = []
+        self._journal = None
+        self._needs_snapshot = True
+        
+        # Sequence number of the last recorded change, and the optional
+        # event log every change is also streamed to
+        self.event_seq = 0
+        self._event_log = None
+        
+        # Event broker channel live changes are published on (the session ID),
+        # None when nobody can be listening
+        self.event_channel = None
+        
+    @property
+    def floor_graph(self):
+        """FloorGraph: Index of the current floor, shared with other runs on it"""
+        return self.floor_template.graph
+        
+    @property
+    def current_map(self):
+        """tuple: Node objects of the current floor; read-only, see resolve_node_content"""
+        return self.floor_template.nodes
+        
+    @current_map.setter
+    def current_map(self, nodes):
+        self.floor_template = FloorTemplate(nodes)
+        self.floor_stream = None
+        self._visited = VisitedSet(len(self.floor_graph))
+        
+    @property
+    def visited_nodes(self):
+        """list: IDs of visited nodes on the current floor, in visit order"""
+        ids = self.floor_graph.ids
+        return [ids[i] for i in self._visited]
+        
+    @visited_nodes.setter
+    def visited_nodes(self, node_ids):
+        self._visited = VisitedSet(len(self.floor_graph))
+        for node_id in node_ids:
+            self._mark_visited(node_id)
+        
+    def is_visited(self, node_id):
+        """
+        Check whether a node on the current floor has been visited.
+        
+        Args:
+            node_id (str): Node ID to check
+            
+        Returns:
+            bool: True if the node was visited
+        """
+        i = self.floor_graph.index_of(node_id)
+        return i is not None and i in self._visited
+        
+    def _mark_visited(self, node_id):
+        """Set a node's visited bit; nodes not on the current floor are ignored"""
+        i = self.floor_graph.index_of(node_id)
+        if i is not None:
+            self._visited.add(i)
+            
+    def resolve_node_content(self, node_id, content):
+        """
+        Record the content this run drew for a node (question, event, item).
+        
+        Floor templates are shared between runs, so per-run content is kept
+        here instead of on the Node object.
+        
+        Args:
+            node_id (str): Node ID
+            content (dict): Resolved content
+        """
+        self.node_content[node_id] = content
+        self._record_change('content_resolved', node_id=node_id, content=content)
+        
+    def get_node_content(self, node_id):
+        """
+        Get the content this run resolved for a node.
+        
+        Args:
+            node_id (str): Node ID
+            
+        Returns:
+            dict: Resolved content, or None if not resolved yet
+        """
+        return self.node_content.get(node_id)
+        
+    def _set_floor(self, floor_template):
+        """Enter a floor, resetting the per-run overlay"""
+        self.floor_template = floor_template
+        self.visited_nodes = []
+        self.node_content = {}
+        self.current_node_id = self._get_starting_node_id()
+        
+    def new_game(self, character_id, seed=None, prebuild=False):
         """
         Start a new game with the selected character.
         
         Args:
             character_id (str): ID of the selected character
+            seed (str, optional): Run seed; runs with the same seed get the
+                same generated floors
+            prebuild (bool, optional): Generate every floor of the run up front
+                on the run builder's process pool; prebuilt runs are always
+                seeded, with a new seed if none is given
             
         Returns:
             bool: True if game was successfully started, False otherwise
@@ -45,12 +157,20 @@ class GameState:
             
         self.character = character
         self.current_floor = 1
-        self.current_map = self._load_floor(self.current_floor)
-        self.visited_nodes = []
-        self.current_node_id = self._get_starting_node_id()
+        self.run_seed = None if seed is None else str(seed)
+        self.run_plan = {}
+        if prebuild:
+            from backend.core.run_builder import get_run_builder
+            plan = get_run_builder().build(self.run_seed)
+            self.run_plan = dict(plan['floors'])
+            self.run_seed = plan['run_seed']
+        self._set_floor(self._load_floor(self.current_floor) or FloorTemplate([]))
         self.score = 0
         self.reputation = 50  # Start with neutral reputation
         self.game_over = False
+        self._needs_snapshot = True
+        self._record_change('game_started', character=character.to_dict(), run_seed=self.run_seed)
+        self._record_floor_entered()
         
         return True
         
@@ -72,9 +192,11 @@ class GameState:
         self.current_node_id = node_id
         
         # Mark node as visited
-        if node_id not in self.visited_nodes:
-            self.visited_nodes.append(node_id)
+        self._mark_visited(node_id)
+        self._advance_stream()
             
+        self._record_change('moved', node_id=node_id)
+        
         # Get node data
         node_data = self._get_node_by_id(node_id)
         
@@ -127,6 +249,8 @@ class GameState:
             points = int(10 * question.get_difficulty_modifier())
             self.score += points
             self.reputation += 2
+            self._record_change('answered', question_id=question_id, correct=True,
+                                points=points, reputation=2)
             
             return {
                 'success': True,
@@ -136,6 +260,8 @@ class GameState:
             }
         else:
             self.reputation -= 1
+            self._record_change('answered', question_id=question_id, correct=False,
+                                points=0, reputation=-1)
             
             return {
                 'success': True,
@@ -155,14 +281,15 @@ class GameState:
         self.current_floor += 1
         
         # Check if this was the last floor
-        floor_data = self._load_floor(self.current_floor)
-        if not floor_data:
+        floor_template = self._load_floor(self.current_floor)
+        if not floor_template:
             self.game_over = True
+            self._record_change('game_over', floor=self.current_floor)
             return False
             
-        self.current_map = floor_data
-        self.visited_nodes = []
-        self.current_node_id = self._get_starting_node_id()
+        self._set_floor(floor_template)
+        self._needs_snapshot = True
+        self._record_floor_entered()
         
         return True
         
@@ -187,6 +314,7 @@ class GameState:
                 return False
                 
             self.character.add_item(item)
+            self._record_change('item_gained', item=item)
             return True
         except (FileNotFoundError, json.JSONDecodeError):
             return False
@@ -202,40 +330,260 @@ class GameState:
             int: New reputation value
         """
         self.reputation = max(0, min(100, self.reputation + amount))
+        self._record_change('reputation_changed', reputation=self.reputation)
         return self.reputation
         
-    def save_game(self, save_slot=0):
+    def _record_change(self, op, **data):
         """
-        Save the current game state.
+        Queue a change record for the next incremental save, stream it to
+        the event log, if one is attached, and publish it to the session's
+        event channel.
         
         Args:
-            save_slot (int, optional): Save slot number
+            op (str): Change type (see apply_change)
+            **data: Change details needed to replay it
+        """
+        self.event_seq += 1
+        data['op'] = op
+        data['seq'] = self.event_seq
+        # A save due to write a snapshot needs no change records, and more than
+        # a journal holds would be compacted anyway, so the queue stays bounded
+        # for sessions that are never saved to a slot
+        if len(self._pending_changes) >= COMPACT_THRESHOLD:
+            self._pending_changes = []
+            self._needs_snapshot = True
+        if not self._needs_snapshot:
+            self._pending_changes.append(data)
+        
+        if self._event_log is not None:
+            self._event_log.append(data)
+            if self._event_log.needs_snapshot():
+                self._event_log.write_snapshot(self.to_dict())
+                
+        if self.event_channel is not None:
+            event_broker.publish(self.event_channel, data)
+                
+    def _record_floor_entered(self):
+        """
+        Record entering the current floor, with what is needed to rebuild it:
+        the key of a shared template, the seed of a streamed floor, or the
+        encoded graph of any other private floor
+        """
+        if self.floor_stream:
+            self._record_change('floor_entered', floor=self.current_floor,
+                                floor_stream=self.floor_stream.to_dict())
+        elif self.floor_template.key:
+            self._record_change('floor_entered', floor=self.current_floor,
+                                floor_template=self.floor_template.key)
+        else:
+            self._record_change('floor_entered', floor=self.current_floor,
+                                current_map=self._saved_map())
+        
+    def _saved_map(self):
+        """
+        Serialize the current floor: shared templates by key and streamed
+        floors by their stream only, other private floors CSR-encoded
+        """
+        if self.floor_template.key or self.floor_stream:
+            return []
+        return encode_floor_graph(self.floor_graph)
+        
+    def _saved_template(self, template_key, current_map, stream_data=None):
+        """Rebuild the floor referenced or stored by a save or change record"""
+        self.floor_stream = None
+        if stream_data:
+            config = FloorTemplateRegistry.get_floor_config(stream_data['floor'])
+            if config:
+                self.floor_stream = FloorStream.from_dict(stream_data, config)
+                return self._stream_template()
             
+        floor_template = FloorTemplateRegistry.get_template(template_key) if template_key else None
+        if floor_template is not None:
+            return floor_template
+        if isinstance(current_map, dict):
+            return FloorTemplate(decode_floor_graph(current_map))
+        # Saves from before the compact encoding store Node dicts
+        return FloorTemplate.from_node_dicts(current_map or [])
+        
+    def apply_change(self, record):
+        """
+        Replay a change record from the save journal or event log.
+        
+        Args:
+            record (dict): Change record produced by _record_change
+        """
+        op = record.get('op')
+        self.event_seq = record.get('seq', self.event_seq + 1)
+        
+        if op == 'game_started':
+            from backend.data.models.character import Character
+            self.character = Character.from_dict(record['character'])
+            self.current_floor = 1
+            self.run_seed = record.get('run_seed')
+            self.score = 0
+            self.reputation = 50
+            self.game_over = False
+            
+        elif op == 'floor_entered':
+            self.current_floor = record.get('floor', self.current_floor)
+            self._set_floor(self._saved_template(record.get('floor_template'), record.get('current_map'),
+                                                 record.get('floor_stream')))
+            
+        elif op == 'game_over':
+            self.current_floor = record.get('floor', self.current_floor)
+            self.game_over = True
+            
+        elif op == 'moved':
+            node_id = record.get('node_id')
+            self.current_node_id = node_id
+            self._mark_visited(node_id)
+            self._advance_stream()
+                
+        elif op == 'answered':
+            self.score += record.get('points', 0)
+            self.reputation += record.get('reputation', 0)
+            
+        elif op == 'item_gained':
+            if self.character:
+                self.character.add_item(record.get('item'))
+                
+        elif op == 'reputation_changed':
+            self.reputation = record.get('reputation', self.reputation)
+            
+        elif op == 'content_resolved':
+            self.node_content[record['node_id']] = record.get('content')
+        
+    def to_dict(self):
+        """
+        Convert the game state to a dictionary for serialization.
+        
         Returns:
-            bool: True if save was successful, False otherwise
+            dict: Dictionary representation of the game state
         """
-        save_data = {
-            'character': self.character.to_dict(),
+        return {
+            'character': self.character.to_dict() if self.character else None,
             'current_floor': self.current_floor,
-            'current_map': [node.to_dict() for node in self.current_map],
+            'run_seed': self.run_seed,
+            # Shared templates are stored by reference, private ones in full
+            'floor_template': self.floor_template.key,
+            'current_map': self._saved_map(),
+            'floor_stream': self.floor_stream.to_dict() if self.floor_stream else None,
             'visited_nodes': self.visited_nodes,
+            'node_content': self.node_content,
             'current_node_id': self.current_node_id,
             'score': self.score,
             'reputation': self.reputation,
-            'game_over': self.game_over
+            'game_over': self.game_over,
+            'event_seq': self.event_seq
         }
         
-        save_path = os.path.join(get_data_path(), f'save_{save_slot}.json')
+    def restore(self, save_data):
+        """
+        Replace the game state with serialized data.
         
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        Args:
+            save_data (dict): Data produced by to_dict
+        """
+        from backend.data.models.character import Character
+        character_data = save_data.get('character')
+        self.character = Character.from_dict(character_data) if character_data else None
+        
+        self.current_floor = save_data.get('current_floor', 1)
+        self.run_seed = save_data.get('run_seed')
+        self.run_plan = {}
+        self.floor_template = self._saved_template(save_data.get('floor_template'), save_data.get('current_map'),
+                                                   save_data.get('floor_stream'))
+        self.visited_nodes = save_data.get('visited_nodes', [])
+        self.node_content = save_data.get('node_content', {})
+        self.current_node_id = save_data.get('current_node_id')
+        self.score = save_data.get('score', 0)
+        self.reputation = save_data.get('reputation', 50)
+        self.game_over = save_data.get('game_over', False)
+        self.event_seq = save_data.get('event_seq', 0)
+        
+        # Restored state is not tied to any save slot's journal yet
+        self._pending_changes = []
+        self._journal = None
+        self._needs_snapshot = True
+        
+    @classmethod
+    def from_dict(cls, save_data):
+        """
+        Create a GameState from serialized data.
+        
+        Args:
+            save_data (dict): Data produced by to_dict
             
-            with open(save_path, 'w') as f:
-                json.dump(save_data, f, indent=2)
-            return True
-        except (IOError, TypeError):
-            return False
+        Returns:
+            GameState: Restored game state
+        """
+        game_state = cls()
+        game_state.restore(save_data)
+        return game_state
+        
+    def attach_event_log(self, event_log):
+        """
+        Stream every later change to an event log.
+        
+        Writes a baseline snapshot when the log has none at the current
+        sequence number, so the stream can always be replayed from here.
+        
+        Args:
+            event_log (EventLog): Event log of this run, written by no other object
+            
+        Raises:
+            ValueError: If the log is already written by another state or event system
+        """
+        event_log.claim(self)
+        event_log.last_seq = max(event_log.last_seq, self.event_seq)
+        if event_log.last_snapshot_seq < self.event_seq or not event_log.snapshot_seqs:
+            event_log.write_snapshot(self.to_dict(), self.event_seq)
+        self._event_log = event_log
+        
+    @classmethod
+    def rebuild(cls, event_log, at_seq=None):
+        """
+        Rebuild a run from its event log, as of its latest or any earlier event.
+        
+        Args:
+            event_log (EventLog): Event log of the run
+            at_seq (int, optional): Sequence number to rebuild up to
+            
+        Returns:
+            GameState: Rebuilt game state, or None if the log has no snapshot
+        """
+        game_state = cls()
+        if event_log.rebuild(game_state.restore, game_state.apply_change, at_seq) is None:
+            return None
+        return game_state
+        
+    def save_game(self, save_slot=0):
+        """
+        Save the current game state.
+        
+        Args:
+            save_slot (int, optional): Save slot number
+            
+        Returns:
+            bool: True if save was successful, False otherwise
+        """
+        journal = self._journal
+        if journal is None or journal.save_slot != save_slot:
+            journal = SaveJournal(save_slot)
+            
+        # Journal the changes since the last save, or compact into a snapshot when
+        # the floor changed, the slot is new to this state or the journal is long
+        if (self._needs_snapshot or journal is not self._journal
+                or journal.needs_compaction(len(self._pending_changes))):
+            saved = journal.compact(self.to_dict())
+        else:
+            saved = journal.append(self._pending_changes)
+            
+        if saved:
+            self._journal = journal
+            self._pending_changes = []
+            self._needs_snapshot = False
+        return saved
             
     def load_game(self, save_slot=0):
         """
@@ -247,28 +595,45 @@ class GameState:
         Returns:
             bool: True if load was successful, False otherwise
         """
-        save_path = os.path.join(get_data_path(), f'save_{save_slot}.json')
+        journal = SaveJournal(save_slot)
+        snapshot, records = journal.load()
+        if snapshot is None:
+            return False
+            
+        # Latest snapshot plus the journal tail written after it
+        self.restore(snapshot)
+        for record in records:
+            self.apply_change(record)
+            
+        self._journal = journal
+        self._needs_snapshot = False
+        return True
+            
+    async def save_game_async(self, save_slot=0):
+        """
+        Save the current game state without blocking the event loop.
         
-        try:
-            with open(save_path, 'r') as f:
-                save_data = json.load(f)
-                
-            # Initialize character
-            from backend.data.models.character import Character
-            self.character = Character.from_dict(save_data.get('character', {}))
+        Args:
+            save_slot (int, optional): Save slot number
             
-            # Load other game state properties
-            self.current_floor = save_data.get('current_floor', 1)
-            self.current_map = [Node.from_dict(node_data) for node_data in save_data.get('current_map', [])]
-            self.visited_nodes = save_data.get('visited_nodes', [])
-            self.current_node_id = save_data.get('current_node_id')
-            self.score = save_data.get('score', 0)
-            self.reputation = save_data.get('reputation', 50)
-            self.game_over = save_data.get('game_over', False)
+        Returns:
+            bool: True if save was successful, False otherwise
+        """
+        from backend.utils.async_bridge import run_sync
+        return await run_sync(self.save_game, save_slot)
+        
+    async def load_game_async(self, save_slot=0):
+        """
+        Load a saved game state without blocking the event loop.
+        
+        Args:
+            save_slot (int, optional): Save slot number
             
-            return True
-        except (FileNotFoundError, json.JSONDecodeError):
-            return False
+        Returns:
+            bool: True if load was successful, False otherwise
+        """
+        from backend.utils.async_bridge import run_sync
+        return await run_sync(self.load_game, save_slot)
             
     def _load_floor(self, floor_number):
         """
@@ -277,25 +642,37 @@ class GameState:
         Args:
             floor_number (int): Floor number to load
             
+        Floors of the run plan are taken from it. Other generated floors are
+        streamed when MAP_STREAM_LOOKAHEAD is set; the stream becomes the
+        run's floor_stream.
+        
         Returns:
-            list: List of Node objects representing the floor map
+            FloorTemplate: Template for the floor, or None if there is no such floor
         """
-        floor_path = os.path.join(get_data_path(), 'maps', 'floors.json')
-        try:
-            with open(floor_path, 'r') as f:
-                floors_data = json.load(f)
-                
-            floor_data = next((f for f in floors_data if f.get('floor') == floor_number), None)
-            if not floor_data:
-                return []
-                
-            nodes = []
-            for node_data in floor_data.get('nodes', []):
-                nodes.append(Node.from_dict(node_data))
-                
-            return nodes
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        self.floor_stream = None
+        layout = self.run_plan.pop(floor_number, None)
+        if layout is not None:
+            floor_template = FloorTemplateRegistry.plan_template(floor_number, self.run_seed, layout)
+            if floor_template is not None:
+                return floor_template
+        config = FloorTemplateRegistry.get_floor_config(floor_number)
+        lookahead = stream_lookahead()
+        if lookahead and config and not config.get('nodes'):
+            from backend.core.run_builder import new_run_seed
+            seed = self.run_seed if self.run_seed is not None else new_run_seed()
+            self.floor_stream = FloorStream(floor_number, config, seed, lookahead)
+            return self._stream_template()
+        return FloorTemplateRegistry.create_floor(floor_number, self.run_seed)
+        
+    def _stream_template(self):
+        """Build a private template of what the floor stream has generated so far"""
+        return FloorTemplate.from_layout(self.floor_stream.layout, config=self.floor_stream.floor_data)
+        
+    def _advance_stream(self):
+        """Generate the streamed floor's lookahead past the current node"""
+        if self.floor_stream and self.floor_stream.advance_to(self.current_node_id):
+            # Nodes keep their indexes as rows are appended, so visited bits stay valid
+            self.floor_template = self._stream_template()
             
     def _get_node_by_id(self, node_id):
         """
@@ -307,10 +684,7 @@ class GameState:
         Returns:
             Node: Node object if found, None otherwise
         """
-        for node in self.current_map:
-            if node.id == node_id:
-                return node
-        return None
+        return self.floor_graph.get(node_id)
         
     def _get_starting_node_id(self):
         """
@@ -319,15 +693,7 @@ class GameState:
         Returns:
             str: Starting node ID, or None if no nodes
         """
-        if not self.current_map:
-            return None
-            
-        # Find node with 'start' type, or take the first node
-        start_nodes = [node for node in self.current_map if node.type == 'start']
-        if start_nodes:
-            return start_nodes[0].id
-            
-        return self.current_map[0].id
+        return self.floor_graph.start_id
         
     def _is_valid_move(self, node_id):
         """
@@ -344,28 +710,51 @@ class GameState:
             starting_node_id = self._get_starting_node_id()
             return node_id == starting_node_id
             
-        # Get current node
-        current_node = self._get_node_by_id(self.current_node_id)
-        if not current_node:
-            return False
-            
         # Check if destination is connected to current node
-        return node_id in current_node.connections
+        return self.floor_graph.is_connected(self.current_node_id, node_id)
+
+# Session used by callers that do not identify a session
+DEFAULT_SESSION_ID = 'default'
+
+def get_game_state(session_id=None):
+    """
+    Get the game state for a session, keeping it in memory.
+    
+    The session is pinned so it is not evicted while the caller holds it;
+    call release_game_state() when done. Prefer game_session(), which also
+    locks the session against concurrent requests.
+    
+    Args:
+        session_id (str, optional): Session identifier, defaults to the shared default session
+        
+    Returns:
+        GameState: The session's game state
+    """
+    from backend.core.session_registry import get_session_registry
+    return get_session_registry().pin(session_id or DEFAULT_SESSION_ID)
 
-# Global game state instance
-_game_state = None
+def release_game_state(session_id=None):
+    """
+    Release a game state obtained from get_game_state().
+    
+    Args:
+        session_id (str, optional): Session identifier, defaults to the shared default session
+    """
+    from backend.core.session_registry import get_session_registry
+    get_session_registry().unpin(session_id or DEFAULT_SESSION_ID)
 
-def get_game_state():
+def game_session(session_id=None):
     """
-    Get the global game state instance.
+    Lock a session for the duration of a with-block.
     
+    Args:
+        session_id (str, optional): Session identifier, defaults to the shared default session
+        
     Returns:
-        GameState: Global game state instance
+        contextmanager: Yields the session's GameState while holding its lock
     """
-    global _game_state
-    if _game_state is None:
-        _game_state = GameState()
-    return _game_state
+    from backend.core.session_registry import get_session_registry
+    return get_session_registry().session(session_id or DEFAULT_SESSION_ID)
 
 # Convenience functions for plugins and other modules
 
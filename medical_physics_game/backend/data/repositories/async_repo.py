@@ -0,0 +1,48 @@
+# backend/data/repositories/async_repo.py
+from backend.utils.async_bridge import run_sync
+from backend.data.repositories.character_repo import CharacterRepository
+from backend.data.repositories.item_repo import ItemRepository
+from backend.data.repositories.question_repo import QuestionRepository
+from backend.data.repositories.skill_tree_repo import SkillTreeRepository
+from backend.data.repositories.patient_case_repo import PatientCaseRepository
+
+class AsyncRepository:
+    """Awaitable view over a sync repository; every call runs in the bridge pool"""
+    
+    def __init__(self, repository):
+        self._repository = repository
+        
+    def __getattr__(self, name):
+        method = getattr(self._repository, name)
+        if not callable(method):
+            return method
+            
+        async def call(*args, **kwargs):
+            return await run_sync(method, *args, **kwargs)
+            
+        call.__name__ = name
+        return call
+
+
+# Async variants of the repositories used by the API
+async_character_repo = AsyncRepository(CharacterRepository)
+async_item_repo = AsyncRepository(ItemRepository)
+async_question_repo = AsyncRepository(QuestionRepository)
+async_skill_tree_repo = AsyncRepository(SkillTreeRepository)
+async_patient_case_repo = AsyncRepository(PatientCaseRepository)
+
+
+def async_session_store(store=None):
+    """
+    Get an awaitable view of a session store.
+
+    Args:
+        store (object, optional): Store to wrap, the global registry's by default
+
+    Returns:
+        AsyncRepository: save/load/delete of session data, run in the bridge pool
+    """
+    if store is None:
+        from backend.core.session_registry import get_session_registry
+        store = get_session_registry().store
+    return AsyncRepository(store)
@@ -0,0 +1,449 @@
+# backend/data/repositories/session_repo.py
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from backend.data.repositories import BASE_DIR
+from backend.utils.save_format import SaveFormatError, decode_save, encode_save, is_encoded_save
+
+class SQLiteSessionStore:
+    """Session storage on the game_states table of game_data.db"""
+
+    def __init__(self, db_path=None, compression_level=6):
+        """
+        Initialize the store and make sure its schema exists.
+
+        Args:
+            db_path (str, optional): SQLite database path, defaults to the
+                SESSION_DB_PATH environment variable or game_data.db at the
+                project root
+            compression_level (int, optional): zlib level used for state blobs
+        """
+        self.db_path = db_path or os.environ.get('SESSION_DB_PATH') or os.path.join(BASE_DIR, 'game_data.db')
+        self.compression_level = compression_level
+        self._local = threading.local()
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+        self._ensure_schema()
+
+    def _connect(self):
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            if self.db_path != ':memory:':
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self):
+        conn = self._connect()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS game_states
+            (game_id TEXT PRIMARY KEY, game_state TEXT, last_updated TEXT)
+        ''')
+        conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_game_states_last_updated
+            ON game_states (last_updated)
+        ''')
+        conn.commit()
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).isoformat()
+
+    def encode(self, data):
+        """Serialize state to a versioned binary save blob"""
+        return sqlite3.Binary(encode_save(data, self.compression_level))
+
+    @staticmethod
+    def decode(blob):
+        """Deserialize a save blob, a headerless zlib blob or a legacy plain JSON row"""
+        if isinstance(blob, str) or is_encoded_save(blob):
+            return decode_save(blob)
+        return decode_save(zlib.decompress(blob))
+
+    def save(self, session_id, data):
+        """
+        Persist session data with a single UPSERT.
+
+        Args:
+            session_id (str): Game identifier
+            data (dict): Serialized game state
+
+        Returns:
+            bool: True if the row was written, False otherwise
+        """
+        conn = self._connect()
+        try:
+            conn.execute('''
+            INSERT INTO game_states (game_id, game_state, last_updated) VALUES (?, ?, ?)
+            ON CONFLICT (game_id) DO UPDATE SET
+                game_state = excluded.game_state,
+                last_updated = excluded.last_updated
+            ''', (str(session_id), self.encode(data), self._now()))
+            conn.commit()
+            return True
+        except (sqlite3.Error, TypeError, ValueError):
+            conn.rollback()
+            return False
+
+    def load(self, session_id):
+        """
+        Load session data.
+
+        Args:
+            session_id (str): Game identifier
+
+        Returns:
+            dict: Serialized game state, or None if the game is unknown
+        """
+        row = self._connect().execute(
+            'SELECT game_state FROM game_states WHERE game_id = ?', (str(session_id),)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+
+        try:
+            return self.decode(row[0])
+        except (zlib.error, SaveFormatError):
+            return None
+
+    def delete(self, session_id):
+        """
+        Remove session data.
+
+        Args:
+            session_id (str): Game identifier
+
+        Returns:
+            bool: True if a row was removed, False if there was none
+        """
+        conn = self._connect()
+        cursor = conn.execute('DELETE FROM game_states WHERE game_id = ?', (str(session_id),))
+        conn.commit()
+        return cursor.rowcount > 0
+
+    def reap(self, max_age_seconds):
+        """
+        Delete runs that have not been saved for a while.
+
+        Args:
+            max_age_seconds (float): Age after which a run counts as abandoned
+
+        Returns:
+            int: Number of runs deleted
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)).isoformat()
+        conn = self._connect()
+        cursor = conn.execute('DELETE FROM game_states WHERE last_updated < ?', (cutoff,))
+        conn.commit()
+        return cursor.rowcount
+
+    def start_reaper(self, max_age_seconds=7 * 24 * 3600, interval_seconds=3600):
+        """
+        Start a daemon thread that periodically reaps abandoned runs.
+
+        Args:
+            max_age_seconds (float, optional): Age after which a run counts as abandoned
+            interval_seconds (float, optional): Time between sweeps
+
+        Returns:
+            threading.Thread: The reaper thread
+        """
+        if self._reaper is not None and self._reaper.is_alive():
+            return self._reaper
+
+        self._reaper_stop.clear()
+
+        def sweep():
+            while not self._reaper_stop.wait(interval_seconds):
+                try:
+                    self.reap(max_age_seconds)
+                except sqlite3.Error:
+                    pass
+
+        self._reaper = threading.Thread(target=sweep, name='session-reaper', daemon=True)
+        self._reaper.start()
+        return self._reaper
+
+    def stop_reaper(self):
+        """Stop the reaper thread if it is running"""
+        self._reaper_stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+
+    def count(self):
+        """Get the number of stored runs"""
+        return self._connect().execute('SELECT COUNT(*) FROM game_states').fetchone()[0]
+
+    def iter_rows(self):
+        """Yield every stored run as raw (game_id, game_state, last_updated) rows"""
+        cursor = self._connect().execute(
+            'SELECT game_id, game_state, last_updated FROM game_states')
+        yield from cursor
+
+    def get_rows(self, session_ids):
+        """Get the raw rows of several runs, skipping unknown ones"""
+        session_ids = [str(session_id) for session_id in session_ids]
+        conn = self._connect()
+        rows = []
+        # Stay under SQLite's limit on bound parameters
+        for start in range(0, len(session_ids), 500):
+            chunk = session_ids[start:start + 500]
+            rows.extend(conn.execute(
+                'SELECT game_id, game_state, last_updated FROM game_states '
+                f'WHERE game_id IN ({", ".join("?" * len(chunk))})', chunk))
+        return rows
+
+    def put_rows(self, rows):
+        """
+        Insert raw rows as returned by iter_rows, keeping their timestamps.
+
+        A row already stored with a later last_updated is left as it is, so
+        an older copy never overwrites a newer save.
+
+        Args:
+            rows (list): (game_id, game_state, last_updated) tuples
+
+        Returns:
+            int: Number of rows written
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany('''
+            INSERT INTO game_states (game_id, game_state, last_updated) VALUES (?, ?, ?)
+            ON CONFLICT (game_id) DO UPDATE SET
+                game_state = excluded.game_state,
+                last_updated = excluded.last_updated
+            WHERE excluded.last_updated > game_states.last_updated
+            ''', rows)
+        return len(rows)
+
+    def delete_many(self, session_ids):
+        """Remove several runs in one transaction"""
+        conn = self._connect()
+        with conn:
+            conn.executemany('DELETE FROM game_states WHERE game_id = ?',
+                             [(str(session_id),) for session_id in session_ids])
+
+
+class ShardedSessionStore:
+    """
+    Session storage spread over several SQLite files by game_id hash.
+
+    SQLite admits one writer per database file, so with a single file every
+    save in every worker queues behind the others. Each shard here is its own
+    SQLiteSessionStore with its own per-thread connections, so saves to
+    different shards proceed in parallel.
+    """
+
+    # Number of locks session IDs are striped over while shards are rebalanced
+    KEY_LOCK_STRIPES = 64
+
+    def __init__(self, directory=None, shard_count=None, compression_level=6):
+        """
+        Initialize the store and open its shards.
+
+        Args:
+            directory (str, optional): Directory for the shard files, defaults
+                to the SESSION_SHARD_DIR environment variable or
+                <project root>/sessions
+            shard_count (int, optional): Number of shards, defaults to the
+                SESSION_SHARDS environment variable or 4
+            compression_level (int, optional): zlib level used for state blobs
+        """
+        self.directory = directory or os.environ.get('SESSION_SHARD_DIR') or os.path.join(BASE_DIR, 'sessions')
+        shard_count = int(shard_count or os.environ.get('SESSION_SHARDS', 4))
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+        self.compression_level = compression_level
+        os.makedirs(self.directory, exist_ok=True)
+        self._key_locks = [threading.Lock() for _ in range(self.KEY_LOCK_STRIPES)]
+        self._rebalance_lock = threading.Lock()
+        self._reaper_args = None
+        # (shard count, shards, shards being moved away from or None), swapped as one
+        self._layout = (shard_count, [self._open_shard(index) for index in range(shard_count)], None)
+
+    @property
+    def shard_count(self):
+        """Number of shards runs are placed on"""
+        return self._layout[0]
+
+    @property
+    def shards(self):
+        """SQLiteSessionStore per shard"""
+        return self._layout[1]
+
+    def _shard_path(self, index):
+        return os.path.join(self.directory, f'game_data_{index}.db')
+
+    def _open_shard(self, index):
+        return SQLiteSessionStore(self._shard_path(index), self.compression_level)
+
+    @staticmethod
+    def shard_index(session_id, shard_count):
+        """
+        Get the shard a run lives on.
+
+        Uses CRC32 rather than hash() so placement is the same in every process.
+
+        Args:
+            session_id (str): Game identifier
+            shard_count (int): Number of shards
+
+        Returns:
+            int: Shard index
+        """
+        return zlib.crc32(str(session_id).encode('utf-8')) % shard_count
+
+    def shard_for(self, session_id):
+        """Get the SQLiteSessionStore holding a run"""
+        shard_count, shards, _ = self._layout
+        return shards[self.shard_index(session_id, shard_count)]
+
+    def connection(self, session_id):
+        """Get this thread's connection to the shard holding a run"""
+        return self.shard_for(session_id)._connect()
+
+    def _key_lock(self, session_id):
+        return self._key_locks[zlib.crc32(str(session_id).encode('utf-8')) % self.KEY_LOCK_STRIPES]
+
+    def _placement(self, session_id):
+        """Get a run's shard and, while rebalancing, the shard it may still be on"""
+        shard_count, shards, previous = self._layout
+        target = shards[self.shard_index(session_id, shard_count)]
+        if previous is None:
+            return target, None
+        source = previous[self.shard_index(session_id, len(previous))]
+        return target, (source if source is not target else None)
+
+    def save(self, session_id, data):
+        """Persist session data on its shard"""
+        with self._key_lock(session_id):
+            target, source = self._placement(session_id)
+            if not target.save(session_id, data):
+                return False
+            if source is not None:
+                source.delete(session_id)
+            return True
+
+    def load(self, session_id):
+        """Load session data from its shard"""
+        with self._key_lock(session_id):
+            target, source = self._placement(session_id)
+            data = target.load(session_id)
+            if data is None and source is not None:
+                data = source.load(session_id)
+            return data
+
+    def delete(self, session_id):
+        """Remove session data from its shard"""
+        with self._key_lock(session_id):
+            target, source = self._placement(session_id)
+            deleted = target.delete(session_id)
+            if source is not None:
+                deleted = source.delete(session_id) or deleted
+            return deleted
+
+    def _all_shards(self):
+        _, shards, previous = self._layout
+        return shards + [shard for shard in previous or () if shard not in shards]
+
+    def reap(self, max_age_seconds):
+        """Delete abandoned runs on every shard and return how many went"""
+        return sum(shard.reap(max_age_seconds) for shard in self._all_shards())
+
+    def start_reaper(self, max_age_seconds=7 * 24 * 3600, interval_seconds=3600):
+        """Start the reaper thread of every shard, including shards added later"""
+        self._reaper_args = (max_age_seconds, interval_seconds)
+        return [shard.start_reaper(max_age_seconds, interval_seconds) for shard in self.shards]
+
+    def stop_reaper(self):
+        """Stop the reaper threads of every shard"""
+        self._reaper_args = None
+        for shard in self._all_shards():
+            shard.stop_reaper()
+
+    def count(self):
+        """Get the number of stored runs across all shards"""
+        return sum(shard.count() for shard in self._all_shards())
+
+    def _existing_shard_indexes(self):
+        indexes = set()
+        for filename in os.listdir(self.directory):
+            stem, ext = os.path.splitext(filename)
+            if ext == '.db' and stem.startswith('game_data_') and stem[10:].isdigit():
+                indexes.add(int(stem[10:]))
+        return sorted(indexes)
+
+    def rebalance(self, shard_count):
+        """
+        Change the number of shards and move every run to its new shard.
+
+        Safe to run while the store is in use. New saves go straight to a
+        run's new shard, and loads fall back to the old one until the run has
+        moved. Each run is moved while holding its key lock, so a concurrent
+        save is never lost. Rows are copied to their destination before being
+        deleted from their source, so an interrupted rebalance leaves
+        duplicates rather than losing runs; running it again finishes the
+        move. Shard files beyond the new count are left empty on disk.
+
+        Args:
+            shard_count (int): New number of shards
+
+        Returns:
+            int: Number of runs moved
+        """
+        shard_count = int(shard_count)
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+
+        if not self._rebalance_lock.acquire(blocking=False):
+            raise RuntimeError("A rebalance is already in progress")
+        try:
+            return self._rebalance(shard_count)
+        finally:
+            self._rebalance_lock.release()
+
+    def _rebalance(self, shard_count):
+        current_count, current, previous = self._layout
+        # After an interrupted rebalance, unmoved runs are still where it found them
+        fallback = previous or current
+
+        indexes = set(self._existing_shard_indexes()) | set(range(shard_count))
+        stores = {index: (current[index] if index < current_count else self._open_shard(index))
+                  for index in sorted(indexes)}
+        if self._reaper_args is not None:
+            for index in range(shard_count):
+                stores[index].start_reaper(*self._reaper_args)
+
+        self._layout = (shard_count, [stores[index] for index in range(shard_count)], fallback)
+
+        moved = 0
+        for index, source in stores.items():
+            stripes = {}
+            for (session_id,) in source._connect().execute('SELECT game_id FROM game_states'):
+                if self.shard_index(session_id, shard_count) != index:
+                    stripes.setdefault(self._key_lock(session_id), []).append(session_id)
+
+            for lock, session_ids in stripes.items():
+                with lock:
+                    # Re-read under the lock: a save may have moved or replaced the run
+                    outgoing = {}
+                    for row in source.get_rows(session_ids):
+                        outgoing.setdefault(self.shard_index(row[0], shard_count), []).append(row)
+                    for target, rows in outgoing.items():
+                        stores[target].put_rows(rows)
+                        source.delete_many([row[0] for row in rows])
+                        moved += len(rows)
+
+        self._layout = (shard_count, self._layout[1], None)
+        for index, store in stores.items():
+            if index >= shard_count:
+                store.stop_reaper()
+        return moved
@@ -0,0 +1,175 @@
+# backend/utils/async_bridge.py
+import asyncio
+import functools
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Blocking calls made from async code (Flask requests, file saves, SQLite,
+# repository loads) are pushed onto this pool so the event loop stays free for idle connections.
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Get the shared thread pool used to run sync code from async code"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = int(os.environ.get('ASYNC_BRIDGE_WORKERS', 16))
+                _executor = ThreadPoolExecutor(max_workers=max_workers,
+                                               thread_name_prefix='async-bridge')
+    return _executor
+
+async def run_sync(func, *args, **kwargs):
+    """Run a blocking function in the bridge thread pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+def to_async(func):
+    """Decorator producing an awaitable variant of a blocking function"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_sync(func, *args, **kwargs)
+    return wrapper
+
+
+class EventBroker:
+    """
+    Fan-out of server-sent events to async subscribers, fed from any thread.
+
+    Every channel numbers its events and keeps the most recent ones, so a
+    client that reconnects or polls again with the last number it saw
+    receives what was published in between instead of losing it.
+    """
+
+    def __init__(self, max_queue=100, max_channels=1024):
+        self.max_queue = max_queue
+        self.max_channels = max_channels
+        self._subscribers = {}
+        # Channel -> [last event number, deque of (number, event)], least recently published first
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Register a subscriber on the running loop and return its queue of (number, event)"""
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add((loop, queue))
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        """Remove a subscriber queue"""
+        with self._lock:
+            subscribers = self._subscribers.get(channel, set())
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+
+    def publish(self, channel, event):
+        """
+        Number and buffer an event, and deliver it to every subscriber of
+        its channel; safe from sync code.
+
+        Args:
+            channel (str): Channel name, e.g. a session ID
+            event (dict): JSON-serializable event
+
+        Returns:
+            int: Number of the event on its channel
+        """
+        with self._lock:
+            buffer = self._buffers.get(channel)
+            if buffer is None:
+                buffer = self._buffers[channel] = [0, deque(maxlen=self.max_queue)]
+                if len(self._buffers) > self.max_channels:
+                    self._buffers.popitem(last=False)
+            else:
+                self._buffers.move_to_end(channel)
+            buffer[0] += 1
+            number = buffer[0]
+            buffer[1].append((number, event))
+            subscribers = list(self._subscribers.get(channel, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, (number, event))
+            except RuntimeError:
+                # The subscriber's loop has closed; it unsubscribes on its way out
+                pass
+        return number
+
+    @staticmethod
+    def _offer(queue, item):
+        # Slow consumers drop their oldest event rather than growing without bound;
+        # they can catch up from the channel buffer with events_since
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
+
+    def last_event(self, channel):
+        """Get the number of the last event published on a channel, 0 if none"""
+        with self._lock:
+            buffer = self._buffers.get(channel)
+            return buffer[0] if buffer else 0
+
+    def events_since(self, channel, cursor):
+        """
+        Get the buffered events of a channel published after a cursor.
+
+        Args:
+            channel (str): Channel name
+            cursor (int): Number of the last event the client has seen
+
+        Returns:
+            list: (number, event) pairs, oldest first; events older than the
+                  buffer are no longer available
+        """
+        with self._lock:
+            buffer = self._buffers.get(channel)
+            if buffer is None:
+                return []
+            return [item for item in buffer[1] if item[0] > cursor]
+
+    async def wait_for_events(self, channel, cursor=None, timeout=None):
+        """
+        Get the events published after a cursor, waiting for one if there are none yet.
+
+        Args:
+            channel (str): Channel name
+            cursor (int, optional): Number of the last event the client has
+                seen; by default only events published from now on are returned
+            timeout (float, optional): Seconds to wait for an event
+
+        Returns:
+            tuple: (cursor to poll with next, list of (number, event) pairs),
+                   with an empty list when the timeout expired
+        """
+        # Subscribe before reading the buffer so nothing published in between is missed
+        queue = self.subscribe(channel)
+        try:
+            if cursor is None:
+                cursor = self.last_event(channel)
+            events = self.events_since(channel, cursor)
+            if not events:
+                try:
+                    await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    return cursor, []
+                events = self.events_since(channel, cursor)
+        finally:
+            self.unsubscribe(channel, queue)
+        return (events[-1][0] if events else cursor), events
+
+    def subscriber_count(self, channel=None):
+        """Get the number of subscribers on one channel or on all channels"""
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+
+# Global broker shared by the ASGI entry point and game logic
+event_broker = EventBroker()
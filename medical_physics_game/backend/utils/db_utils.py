@@ -63,6 +63,20 @@ def execute_query(query, params=None):
     finally:
         conn.close()
 
+async def execute_query_async(query, params=None):
+    """
+    Execute a SQL query without blocking the event loop.
+    
+    Args:
+        query (str): SQL query to execute
+        params (tuple, optional): Parameters for the query
+        
+    Returns:
+        list: Query results
+    """
+    from backend.utils.async_bridge import run_sync
+    return await run_sync(execute_query, query, params)
+
 def read_json_file(file_path):
     """
     Read and parse a JSON file.
@@ -0,0 +1,254 @@
+# backend/utils/metrics.py
+import bisect
+import threading
+import time
+
+from flask import Response, g, request
+
+from backend.utils.logging import GameLogger
+from backend.utils.profiler import PerformanceProfiler
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, _format_labels(self.label_names, labels), value
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value=0):
+        self.values[labels] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}
+
+    def observe(self, value, *labels):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+        entry['counts'][bisect.bisect_left(self.buckets, value)] += 1
+        entry['sum'] += value
+
+    def samples(self):
+        bucket_names = self.label_names + ('le',)
+        for labels, entry in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), entry['counts']):
+                cumulative += count
+                yield (f'{self.name}_bucket',
+                       _format_labels(bucket_names, labels + (_format_value(bound),)),
+                       cumulative)
+            label_str = _format_labels(self.label_names, labels)
+            yield f'{self.name}_sum', label_str, entry['sum']
+            yield f'{self.name}_count', label_str, cumulative
+
+
+class Summary:
+    """Count and sum of observations with labels"""
+
+    kind = 'summary'
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+
+    def observe(self, value, *labels):
+        entry = self.values.setdefault(labels, {'count': 0, 'sum': 0.0})
+        entry['count'] += 1
+        entry['sum'] += value
+
+    def samples(self):
+        for labels, entry in sorted(self.values.items()):
+            label_str = _format_labels(self.label_names, labels)
+            yield f'{self.name}_sum', label_str, entry['sum']
+            yield f'{self.name}_count', label_str, entry['count']
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text format"""
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MetricsRegistry, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.metrics = {}
+        self.collectors = {}
+        self.lock = threading.Lock()
+        self._initialized = True
+
+    def _register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, label_names=()):
+        """Get or create a counter"""
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=()):
+        """Get or create a gauge"""
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        """Get or create a histogram"""
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def add_collector(self, name, collector):
+        """Register (or replace) a callable returning extra metrics to render at scrape time"""
+        with self.lock:
+            self.collectors[name] = collector
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+            for collector in self.collectors.values():
+                metrics.extend(collector())
+
+            lines = []
+            for metric in metrics:
+                lines.append(f'# HELP {metric.name} {metric.help_text}')
+                lines.append(f'# TYPE {metric.name} {metric.kind}')
+                for name, labels, value in metric.samples():
+                    lines.append(f'{name}{labels} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _collect_profiler_stats():
+    """Expose functions timed with @profile as a summary"""
+    summary = Summary('profiled_function_seconds', 'Time spent in @profile-decorated functions',
+                      ('function',))
+    for name, stats in PerformanceProfiler().stats.items():
+        summary.values[(name,)] = {'count': stats['count'], 'sum': stats['total_time']}
+    return [summary]
+
+
+def init_metrics(app):
+    """
+    Record per-route request metrics and expose them at /metrics.
+
+    Args:
+        app (Flask): Application to instrument
+
+    Returns:
+        MetricsRegistry: The process-wide registry
+    """
+    registry = MetricsRegistry()
+    logger = GameLogger()
+
+    latency = registry.histogram('http_request_duration_seconds', 'Request latency',
+                                 ('blueprint', 'route', 'method'))
+    sizes = registry.histogram('http_response_size_bytes', 'Response body size',
+                               ('blueprint', 'route'), buckets=SIZE_BUCKETS)
+    statuses = registry.counter('http_requests_total', 'Requests by status code',
+                                ('blueprint', 'route', 'method', 'status'))
+    in_flight = registry.gauge('http_requests_in_flight', 'Requests being served',
+                               ('blueprint',))
+
+    registry.add_collector('profiler', _collect_profiler_stats)
+
+    def _labels():
+        blueprint = request.blueprint or 'app'
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        return blueprint, route
+
+    def _record(status, size):
+        blueprint, route = _labels()
+        elapsed = time.perf_counter() - g.metrics_start
+        with registry.lock:
+            latency.observe(elapsed, blueprint, route, request.method)
+            statuses.inc(blueprint, route, request.method, str(status))
+            if size is not None:
+                sizes.observe(size, blueprint, route)
+        g.metrics_recorded = True
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_blueprint = request.blueprint or 'app'
+        with registry.lock:
+            in_flight.inc(g.metrics_blueprint)
+
+    @app.after_request
+    def _record_request_metrics(response):
+        if 'metrics_start' in g:
+            _record(response.status_code, response.calculate_content_length())
+            logger.log_api_request(request, response)
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc=None):
+        if 'metrics_start' not in g:
+            return
+        if not g.get('metrics_recorded'):
+            _record(500, None)
+            logger.log_api_request(request, error=exc)
+        with registry.lock:
+            in_flight.dec(g.metrics_blueprint)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    return registry
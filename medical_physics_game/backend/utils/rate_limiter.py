@@ -0,0 +1,206 @@
+# backend/utils/rate_limiter.py
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+# Route classes guarded by admission control. Endpoints that are not listed
+# here (all gameplay routes) bypass the limiter entirely so they keep their
+# latency budget while a client is hammering the write endpoints.
+DEFAULT_ROUTE_CLASSES = {
+    'write': {
+        'endpoints': ['feedback.submit_feedback', 'feedback.submit_bug_report'],
+        'rate': 0.5,           # tokens refilled per second, per client
+        'burst': 5,            # bucket capacity, per client
+        'max_concurrent': 2    # in-flight requests, per process
+    }
+}
+
+
+class TokenBucket:
+    """Token bucket that refills continuously at `rate` tokens per second"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def consume(self, tokens=1):
+        """
+        Try to take tokens from the bucket.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until they will be available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+
+        if self.rate <= 0:
+            return float('inf')
+        return (tokens - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Per-client token buckets plus a per-route-class concurrency cap"""
+
+    def __init__(self, route_classes=None, max_clients=10000):
+        self.route_classes = route_classes or DEFAULT_ROUTE_CLASSES
+        self.max_clients = max_clients
+
+        self._endpoint_classes = {}
+        self._semaphores = {}
+        for class_name, settings in self.route_classes.items():
+            for endpoint in settings.get('endpoints', []):
+                self._endpoint_classes[endpoint] = class_name
+            self._semaphores[class_name] = threading.BoundedSemaphore(settings.get('max_concurrent', 1))
+
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    def classify(self, endpoint):
+        """Get the route class for an endpoint, or None if it is not limited"""
+        return self._endpoint_classes.get(endpoint)
+
+    def _get_bucket(self, class_name, client_id):
+        """Get (or create) the bucket for a client, evicting the least recently used"""
+        key = (class_name, client_id)
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            settings = self.route_classes[class_name]
+            bucket = TokenBucket(settings.get('burst', 1), settings.get('rate', 1))
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        return bucket
+
+    def _count(self, class_name, reason):
+        key = (class_name, reason)
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+    def admit(self, class_name, client_id):
+        """
+        Decide whether a request may proceed.
+
+        Args:
+            class_name (str): Route class of the request
+            client_id (str): Identifier of the calling client
+
+        Returns:
+            tuple: (status, retry_after) where status is None when admitted,
+                   429 when the client is over its rate or 503 when the route
+                   class is at its concurrency cap
+        """
+        with self._lock:
+            wait = self._get_bucket(class_name, client_id).consume()
+            if wait > 0:
+                self._count(class_name, 'rate_limited')
+                return 429, wait
+
+        if not self._semaphores[class_name].acquire(blocking=False):
+            with self._lock:
+                self._count(class_name, 'over_capacity')
+            return 503, 1
+
+        with self._lock:
+            self._count(class_name, 'admitted')
+        return None, 0
+
+    def release(self, class_name):
+        """Release the concurrency slot taken by an admitted request"""
+        self._semaphores[class_name].release()
+
+    def get_stats(self):
+        """Get admission counters keyed by route class"""
+        with self._lock:
+            stats = {name: {'admitted': 0, 'rate_limited': 0, 'over_capacity': 0}
+                     for name in self.route_classes}
+            for (class_name, reason), count in self.counters.items():
+                stats[class_name][reason] = count
+            stats_clients = len(self._buckets)
+
+        return {'route_classes': stats, 'tracked_clients': stats_clients}
+
+    def collect_metrics(self):
+        """Admission counters as metrics for the /metrics endpoint"""
+        from backend.utils.metrics import Counter, Gauge
+
+        requests = Counter('admission_requests_total', 'Admission decisions by route class',
+                           ('route_class', 'outcome'))
+        clients = Gauge('admission_tracked_clients', 'Clients with a live token bucket')
+
+        stats = self.get_stats()
+        for class_name, outcomes in stats['route_classes'].items():
+            for outcome, count in outcomes.items():
+                requests.inc(class_name, outcome, amount=count)
+        clients.set(value=stats['tracked_clients'])
+        return [requests, clients]
+
+
+def _client_id():
+    """
+    Identify the caller by its address.
+
+    X-Forwarded-For is client-controlled and is not read here; behind a
+    reverse proxy, create_app's ProxyFix (PROXY_FIX_HOPS) sets remote_addr
+    from the hops the proxies appended.
+    """
+    return request.remote_addr or 'unknown'
+
+
+def init_rate_limiting(app, route_classes=None):
+    """
+    Install admission control on a Flask app.
+
+    Args:
+        app (Flask): Application to protect
+        route_classes (dict, optional): Route class settings, defaults to
+            app.config['RATE_LIMIT_CLASSES'] or DEFAULT_ROUTE_CLASSES
+
+    Returns:
+        AdmissionController: The controller, also stored in app.extensions
+    """
+    controller = AdmissionController(route_classes or app.config.get('RATE_LIMIT_CLASSES'))
+    app.extensions['admission_controller'] = controller
+
+    from backend.utils.metrics import MetricsRegistry
+    MetricsRegistry().add_collector('admission', controller.collect_metrics)
+
+    @app.before_request
+    def _admit_request():
+        class_name = controller.classify(request.endpoint)
+        if class_name is None:
+            return None
+
+        status, retry_after = controller.admit(class_name, _client_id())
+        if status is None:
+            g.admission_class = class_name
+            return None
+
+        message = 'Too many requests' if status == 429 else 'Service busy, try again shortly'
+        response = jsonify({'error': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(min(retry_after, 3600))))
+        return response
+
+    @app.teardown_request
+    def _release_request(exc=None):
+        class_name = g.pop('admission_class', None)
+        if class_name is not None:
+            controller.release(class_name)
+
+    return controller
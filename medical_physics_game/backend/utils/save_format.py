@@ -0,0 +1,151 @@
+"""
+Save format for the Medical Physics Game.
+Encodes game state as a small versioned binary blob (header plus
+zlib-compressed compact JSON) and upgrades older saves lazily, one
+registered migration at a time, when they are loaded.
+"""
+
+import json
+import struct
+import zlib
+
+MAGIC = b'MPGS'
+HEADER = struct.Struct('>4sH')
+
+# Version 0 is the legacy pretty-printed JSON save without a header
+CURRENT_VERSION = 5
+
+_migrations = {}
+
+
+class SaveFormatError(ValueError):
+    """Raised when save data cannot be decoded or migrated."""
+
+
+def register_migration(from_version):
+    """
+    Decorator registering a migration from one save version to the next.
+
+    Args:
+        from_version (int): Version the migration upgrades from
+
+    Returns:
+        callable: Decorator taking a function dict -> dict
+    """
+    def decorator(func):
+        _migrations[from_version] = func
+        return func
+    return decorator
+
+
+def migrate(data, from_version):
+    """
+    Upgrade save data to the current version.
+
+    Args:
+        data (dict): Decoded save data
+        from_version (int): Version the data was written with
+
+    Returns:
+        dict: Save data in the current schema
+    """
+    if from_version > CURRENT_VERSION:
+        raise SaveFormatError(f"Save version {from_version} is newer than {CURRENT_VERSION}")
+
+    version = from_version
+    while version < CURRENT_VERSION:
+        migration = _migrations.get(version)
+        if migration is None:
+            raise SaveFormatError(f"No migration registered from save version {version}")
+        data = migration(data)
+        version += 1
+    return data
+
+
+def encode_save(data, compression_level=6):
+    """
+    Encode save data in the current binary format.
+
+    Args:
+        data (dict): Save data in the current schema
+        compression_level (int, optional): zlib compression level
+
+    Returns:
+        bytes: Encoded save
+    """
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(MAGIC, CURRENT_VERSION) + zlib.compress(raw, compression_level)
+
+
+def is_encoded_save(blob):
+    """Check whether bytes start with the binary save header"""
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[:4]) == MAGIC
+
+
+def decode_save(blob):
+    """
+    Decode a save written in any known version and migrate it.
+
+    Args:
+        blob (bytes or str): Binary save, or legacy JSON text
+
+    Returns:
+        dict: Save data in the current schema
+    """
+    try:
+        if is_encoded_save(blob):
+            _, version = HEADER.unpack_from(blob)
+            if version > CURRENT_VERSION:
+                raise SaveFormatError(f"Save version {version} is newer than {CURRENT_VERSION}")
+            data = json.loads(zlib.decompress(bytes(blob[HEADER.size:])).decode('utf-8'))
+        else:
+            if isinstance(blob, (bytes, bytearray, memoryview)):
+                blob = bytes(blob).decode('utf-8')
+            data = json.loads(blob)
+            version = 0
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError, struct.error) as e:
+        raise SaveFormatError(f"Unreadable save data: {e}")
+
+    return migrate(data, version)
+
+
+@register_migration(0)
+def _migrate_legacy_json(data):
+    """Legacy JSON saves may lack fields added after the first release"""
+    data.setdefault('current_floor', 1)
+    data.setdefault('current_map', [])
+    data.setdefault('visited_nodes', [])
+    data.setdefault('current_node_id', None)
+    data.setdefault('score', 0)
+    data.setdefault('reputation', 50)
+    data.setdefault('game_over', False)
+    return data
+
+
+@register_migration(1)
+def _add_floor_overlay(data):
+    """Version 2 stores shared floors by template key and per-run node content"""
+    data.setdefault('floor_template', None)
+    data.setdefault('node_content', {})
+    return data
+
+
+@register_migration(2)
+def _add_event_seq(data):
+    """Version 3 numbers state changes for the event log"""
+    data.setdefault('event_seq', 0)
+    return data
+
+
+@register_migration(3)
+def _add_run_seed(data):
+    """Version 4 records the run seed used for seeded floors"""
+    data.setdefault('run_seed', None)
+    return data
+
+
+@register_migration(4)
+def _add_floor_stream(data):
+    """Version 5 stores streamed floors as their generator state"""
+    data.setdefault('floor_stream', None)
+    return data
@@ -0,0 +1,265 @@
+# backend/utils/save_writer.py
+import atexit
+import os
+import threading
+import time
+
+# How long the writer gathers requests before writing them as one group
+DEFAULT_BATCH_WINDOW = 0.02
+
+DURABILITY_MODES = ('none', 'batch', 'sync')
+
+
+class SaveTicket:
+    """Handle on a queued save; wait() blocks until it reached the disk"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.success = None
+
+    def _resolve(self, success):
+        self.success = success
+        self._done.set()
+
+    def done(self):
+        """Check whether the write has finished, successfully or not"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait for the write and return whether it succeeded (None on timeout)"""
+        if not self._done.wait(timeout):
+            return None
+        return self.success
+
+
+class BackgroundSaver:
+    """
+    Write-behind queue for save files.
+
+    Successive writes to the same path are coalesced so only the newest
+    content is written. Every replacement goes through a temp file that is
+    fsynced and renamed over the target, so a crash leaves either the old or
+    the new file, never a torn one. Files written in the same batch share one
+    round of fsyncs. A write can be ordered after another one, in which case
+    it is only made once the other file is renamed into place and its
+    directory fsynced, and not at all if that write failed.
+
+    Durability modes:
+        none  - no fsync; fastest, survives process crashes but not power loss
+        batch - fsync each batch before acknowledging it (default)
+        sync  - like batch, and write()/append() block until acknowledged
+    """
+
+    def __init__(self, durability=None, batch_window=DEFAULT_BATCH_WINDOW):
+        durability = durability or os.environ.get('SAVE_DURABILITY', 'batch')
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+
+        self.durability = durability
+        self.batch_window = batch_window
+        self._pending = {}
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self.stats = {'queued': 0, 'coalesced': 0, 'written': 0, 'batches': 0, 'errors': 0}
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='save-writer', daemon=True)
+            self._thread.start()
+
+    def _enqueue(self, path, content=None, append=None, after=None):
+        ticket = SaveTicket()
+        with self._condition:
+            self._ensure_started()
+            entry = self._pending.get(path)
+            if entry is None:
+                entry = self._pending[path] = {'content': None, 'appends': [], 'tickets': [],
+                                               'after': None}
+            elif content is not None:
+                self.stats['coalesced'] += 1
+
+            if content is not None:
+                # A full rewrite supersedes anything queued before it
+                entry['content'] = content
+                entry['appends'] = []
+                entry['after'] = after
+            else:
+                entry['appends'].append(append)
+
+            entry['tickets'].append(ticket)
+            self.stats['queued'] += 1
+            self._condition.notify()
+
+        if self.durability == 'sync':
+            ticket.wait()
+        return ticket
+
+    def write(self, path, content, after=None):
+        """
+        Queue an atomic replacement of a file.
+
+        Args:
+            path (str): Target file
+            content (bytes): New file content
+            after (SaveTicket, optional): Write that must be durable first; if
+                it fails, this write is dropped and fails too
+
+        Returns:
+            SaveTicket: Handle to wait on
+        """
+        return self._enqueue(path, content=bytes(content), after=after)
+
+    def append(self, path, content):
+        """
+        Queue bytes to append to a file, after anything already queued for it.
+
+        Args:
+            path (str): Target file
+            content (bytes): Bytes to append
+
+        Returns:
+            SaveTicket: Handle to wait on
+        """
+        return self._enqueue(path, append=bytes(content))
+
+    def flush(self, timeout=None):
+        """
+        Wait until everything queued so far is on disk.
+
+        Returns:
+            bool: True if the queue drained before the timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout)
+
+    def stop(self):
+        """Drain the queue and stop the writer thread"""
+        self.flush()
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopping)
+                if self._stopping and not self._pending:
+                    return
+
+            # Let concurrent sessions join this batch so they share the fsyncs
+            if self.batch_window:
+                time.sleep(self.batch_window)
+
+            with self._condition:
+                batch, self._pending = self._pending, {}
+                self._in_flight = len(batch)
+
+            self._write_batch(batch)
+
+            with self._condition:
+                self._in_flight = 0
+                self.stats['batches'] += 1
+                self._condition.notify_all()
+
+    def _write_batch(self, batch):
+        # Writes ordered after others in the batch wait for a later round
+        entries = list(batch.items())
+        while entries:
+            ready, waiting = [], []
+            for path, entry in entries:
+                after = entry['after']
+                if after is None or after.done():
+                    ready.append((path, entry))
+                else:
+                    waiting.append((path, entry))
+
+            if not ready:
+                # What they wait for is not in this batch and will never finish
+                for _, entry in waiting:
+                    self._resolve(entry, False)
+                return
+
+            self._write_group(ready)
+            entries = waiting
+
+    def _write_group(self, entries):
+        fsync = self.durability != 'none'
+        opened = []
+        directories = set()
+
+        for path, entry in entries:
+            if entry['after'] is not None and not entry['after'].success:
+                self._resolve(entry, False)
+                continue
+            try:
+                directory = os.path.dirname(path) or '.'
+                os.makedirs(directory, exist_ok=True)
+                if entry['content'] is not None:
+                    tmp_path = f"{path}.tmp"
+                    f = open(tmp_path, 'wb')
+                    f.write(entry['content'] + b''.join(entry['appends']))
+                else:
+                    tmp_path = None
+                    f = open(path, 'ab')
+                    f.write(b''.join(entry['appends']))
+                opened.append((path, tmp_path, f, entry))
+                directories.add(directory)
+            except OSError:
+                self._resolve(entry, False)
+
+        # One round of fsyncs for the whole group, then the renames
+        results = []
+        for path, tmp_path, f, entry in opened:
+            try:
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+                f.close()
+                if tmp_path is not None:
+                    os.replace(tmp_path, path)
+                results.append((entry, True))
+            except OSError:
+                f.close()
+                results.append((entry, False))
+
+        # Make the renames themselves durable before acknowledging
+        if fsync and hasattr(os, 'O_DIRECTORY'):
+            for directory in directories:
+                try:
+                    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+
+        for entry, success in results:
+            self._resolve(entry, success)
+
+    def _resolve(self, entry, success):
+        self.stats['written' if success else 'errors'] += 1
+        for ticket in entry['tickets']:
+            ticket._resolve(success)
+
+
+# Global saver instance
+_background_saver = None
+_saver_lock = threading.Lock()
+
+def get_background_saver():
+    """Get the process-wide background saver"""
+    global _background_saver
+    if _background_saver is None:
+        with _saver_lock:
+            if _background_saver is None:
+                _background_saver = BackgroundSaver()
+                atexit.register(_background_saver.stop)
+    return _background_saver
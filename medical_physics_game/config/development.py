@@ -1,3 +1,9 @@
 DEBUG = True
 SECRET_KEY = 'dev-secret-key'
 DATABASE_PATH = 'game_data.db'
+
+# Sessions stay in game_data.db; do not reap runs on a developer's database
+SESSION_MAX_AGE = 0
+
+# The run builder's pool starts with the first prebuilt run
+RUN_BUILDER_ENABLED = False
@@ -1,3 +1,11 @@
 DEBUG = False
 SECRET_KEY = 'production-secret-key-change-me'
 DATABASE_PATH = '/var/www/medical_physics_game/game_data.db'
+
+# Runs untouched for a week are abandoned; sweep them hourly. The session
+# database is game_data.db at the project root unless SESSION_DB_PATH is set
+SESSION_MAX_AGE = 7 * 24 * 3600
+SESSION_REAP_INTERVAL = 3600
+
+# The run builder's pool starts with the first prebuilt run; deployments can
+# set RUN_BUILDER_ENABLED in the environment to spawn it at startup instead
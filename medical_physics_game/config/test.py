@@ -2,3 +2,9 @@ DEBUG = True
 TESTING = True
 SECRET_KEY = 'test-secret-key'
 DATABASE_PATH = ':memory:'
+
+# Tests point SESSION_DB_PATH at a temporary database; never reap
+SESSION_MAX_AGE = 0
+
+# Building the app must not spawn worker processes
+RUN_BUILDER_ENABLED = False
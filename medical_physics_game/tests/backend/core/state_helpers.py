@@ -0,0 +1,14 @@
+from backend.core.state_manager import GameState
+from backend.data.models.node import Node
+
+def make_state():
+    """Create a game state on a small three-node floor"""
+    state = GameState()
+    state.current_map = [
+        Node('start', 'start', {'row': 0, 'col': 1}, connections=['a']),
+        Node('a', 'question', {'row': 1, 'col': 1}, connections=['boss']),
+        Node('boss', 'boss', {'row': 2, 'col': 1})
+    ]
+    state.current_node_id = 'start'
+    state.reputation = 50
+    return state
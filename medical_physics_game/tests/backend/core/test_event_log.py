@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+from backend.core.event_log import EventLog
+from backend.core.event_system import EventSystem
+from backend.core.state_manager import GameState
+from state_helpers import make_state
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def make_log(self, snapshot_interval=3):
+        return EventLog('run-1', self.tmp_dir.name, snapshot_interval=snapshot_interval)
+        
+    def test_sequence_resumes_after_reopen(self):
+        """Test that a reopened log continues the sequence"""
+        log = self.make_log()
+        log.write_snapshot({'score': 0}, 0)
+        self.assertEqual(log.append({'op': 'a'}), 1)
+        self.assertEqual(log.append({'op': 'b'}), 2)
+        
+        reopened = self.make_log()
+        self.assertEqual(reopened.last_seq, 2)
+        self.assertEqual(reopened.append({'op': 'c'}), 3)
+        self.assertEqual([e['op'] for e in reopened.read_events()], ['a', 'b', 'c'])
+        
+    def test_replay_starts_at_nearest_snapshot(self):
+        """Test that a rebuild replays only the events after the nearest snapshot"""
+        log = self.make_log()
+        log.write_snapshot({'total': 0}, 0)
+        total = 0
+        for i in range(1, 8):
+            total += i
+            log.append({'op': 'add', 'amount': i})
+            if log.needs_snapshot():
+                log.write_snapshot({'total': total})
+        self.assertEqual(log.snapshot_seqs, [0, 3, 6])
+        
+        applied = []
+        state = {}
+        seq = log.rebuild(state.update, lambda e: applied.append(e['seq']), at_seq=5)
+        self.assertEqual(seq, 5)
+        self.assertEqual(state, {'total': 6})
+        self.assertEqual(applied, [4, 5])
+        
+class TestEventSourcedGameState(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_rebuild_any_point(self):
+        """Test that a run can be rebuilt at its latest and at earlier events"""
+        log = EventLog('run-1', self.tmp_dir.name, snapshot_interval=2)
+        state = make_state()
+        state.attach_event_log(log)
+        state.move_to_node('a')
+        state.resolve_node_content('a', {'question_id': 'q1'})
+        state.update_reputation(5)
+        state.move_to_node('boss')
+        state.update_reputation(-20)
+        
+        latest = GameState.rebuild(EventLog('run-1', self.tmp_dir.name))
+        self.assertEqual(latest.to_dict(), state.to_dict())
+        
+        earlier = GameState.rebuild(EventLog('run-1', self.tmp_dir.name), at_seq=3)
+        self.assertEqual(earlier.current_node_id, 'a')
+        self.assertEqual(earlier.reputation, 55)
+        self.assertEqual(earlier.get_node_content('a'), {'question_id': 'q1'})
+        self.assertEqual(earlier.event_seq, 3)
+        
+    def test_event_system_replay(self):
+        """Test that EventSystem replays logged events without doubling follow-ups"""
+        log = EventLog('events-1', self.tmp_dir.name, snapshot_interval=100)
+        game_state = {'character': {'skill_points': 0, 'current_hp': 100}, 'reputation': 10}
+        events = EventSystem(game_state, log)
+        events.queue_event('question_answered', {'correct': True})
+        events.queue_event('question_answered', {'correct': False})
+        events.process_events()
+        
+        rebuilt = EventSystem.rebuild(EventLog('events-1', self.tmp_dir.name))
+        self.assertEqual(rebuilt, game_state)
+        self.assertEqual(rebuilt['reputation'], 11)
+        
+    def test_log_has_one_writer(self):
+        """Test that a game state and an event system cannot share a log"""
+        log = EventLog('run-1', self.tmp_dir.name)
+        state = make_state()
+        state.attach_event_log(log)
+        state.attach_event_log(log)
+        with self.assertRaises(ValueError):
+            EventSystem({}, log)
+        with self.assertRaises(ValueError):
+            make_state().attach_event_log(log)
+
+if __name__ == '__main__':
+    unittest.main()
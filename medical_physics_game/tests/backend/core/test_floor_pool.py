@@ -0,0 +1,67 @@
+import unittest
+from backend.core.floor_pool import FloorPool
+from backend.core.map_generator import fallback_floor_layout, validate_map
+
+FLOORS = {
+    1: {'id': 1, 'node_count': {'min': 20, 'max': 20}},
+    2: {'id': 2, 'nodes': [{'id': 'start', 'type': 'start'}]}
+}
+
+class TestFloorPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = FloorPool(depth=3)
+        
+    def tearDown(self):
+        self.pool.stop()
+        
+    def test_refills_generated_floors(self):
+        """Test that the pool fills generated floors and skips authored ones"""
+        self.pool.prime(FLOORS)
+        self.pool.start()
+        self.assertTrue(self.pool.wait_full(10))
+        self.assertEqual(self.pool.ready(1), 3)
+        self.assertEqual(self.pool.ready(2), 0)
+        
+        layout = self.pool.take(1, FLOORS[1])
+        self.assertIn('boss', layout)
+        self.assertTrue(self.pool.wait_full(10))
+        
+        stats = self.pool.get_stats()
+        self.assertEqual(stats['floors'][1]['hits'], 1)
+        self.assertGreater(stats['refill_rate'], 0)
+        
+    def test_miss_generates_inline(self):
+        """Test that an empty pool still returns a layout"""
+        layout = self.pool.take(1, FLOORS[1])
+        self.assertIn('boss', layout)
+        self.assertEqual(self.pool.get_stats()['floors'][1]['misses'], 1)
+        
+    def test_invalid_layouts_rejected(self):
+        """Test that layouts failing validation are regenerated"""
+        checked = []
+        pool = FloorPool(depth=1, validate=lambda layout: checked.append(layout) or len(checked) > 1)
+        layout = pool.take(1, FLOORS[1])
+        pool.stop()
+        self.assertIs(layout, checked[1])
+        self.assertGreaterEqual(pool.get_stats()['floors'][1]['rejected'], 1)
+        
+    def test_fallback_when_generation_keeps_failing(self):
+        """Test that a layout failing validation is never served"""
+        pool = FloorPool(depth=1, generate=lambda floor_number, floor_data: {'start': None})
+        layout = pool.take(1, FLOORS[1])
+        pool.stop()
+        self.assertTrue(validate_map(layout))
+        self.assertEqual(layout, fallback_floor_layout(1, FLOORS[1]))
+        self.assertGreaterEqual(pool.get_stats()['floors'][1]['fallbacks'], 1)
+        
+    def test_metrics(self):
+        """Test that pool depth is exposed as metrics"""
+        self.pool.prime(FLOORS)
+        self.pool.start()
+        self.pool.wait_full(10)
+        names = {metric.name for metric in self.pool.collect_metrics()}
+        self.assertIn('floor_pool_ready', names)
+        self.assertIn('floor_pool_refill_rate', names)
+
+if __name__ == '__main__':
+    unittest.main()
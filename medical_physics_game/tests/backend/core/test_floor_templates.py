@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from backend.core.floor_templates import FloorTemplateRegistry
+from backend.core.run_builder import RunBuilder
+from backend.core.state_manager import GameState
+
+FLOORS = {
+    'floors': [
+        {'id': 1, 'name': 'Authored', 'nodes': [
+            {'id': 'start', 'type': 'start', 'position': {'row': 0, 'col': 1}, 'connections': ['q1']},
+            {'id': 'q1', 'type': 'question', 'position': {'row': 1, 'col': 1}, 'connections': ['boss']},
+            {'id': 'boss', 'type': 'boss', 'position': {'row': 2, 'col': 1}}
+        ]},
+        {'id': 2, 'name': 'Generated', 'node_count': {'min': 20, 'max': 20},
+         'node_types': {'question': {'weight': 1}}}
+    ]
+}
+
+class TestFloorTemplates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp_dir.name, 'maps'))
+        with open(os.path.join(self.tmp_dir.name, 'maps', 'floors.json'), 'w') as f:
+            json.dump(FLOORS, f)
+        self.patcher = patch('backend.core.floor_templates.get_data_path', return_value=self.tmp_dir.name)
+        self.patcher.start()
+        FloorTemplateRegistry.clear()
+        
+    def tearDown(self):
+        FloorTemplateRegistry.clear()
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+        
+    def _enter_floor(self, floor_number):
+        state = GameState()
+        state.current_floor = floor_number - 1
+        self.assertTrue(state.complete_floor())
+        return state
+        
+    def test_authored_floor_shared_between_runs(self):
+        """Test that runs share one template but keep their own overlay"""
+        first = self._enter_floor(1)
+        second = self._enter_floor(1)
+        self.assertIs(first.floor_template, second.floor_template)
+        
+        first.move_to_node('q1')
+        first.resolve_node_content('q1', {'question_id': 'q-7'})
+        self.assertTrue(first.is_visited('q1'))
+        self.assertFalse(second.is_visited('q1'))
+        self.assertIsNone(second.get_node_content('q1'))
+        
+    def test_shared_template_saved_by_reference(self):
+        """Test that snapshots of shared floors store the key, not the nodes"""
+        state = self._enter_floor(1)
+        state.move_to_node('q1')
+        data = state.to_dict()
+        self.assertEqual(data['floor_template'], 'floor:1')
+        self.assertEqual(data['current_map'], [])
+        
+        restored = GameState.from_dict(data)
+        self.assertIs(restored.floor_template, state.floor_template)
+        self.assertEqual(restored.get_current_node().id, 'q1')
+        
+    def test_generated_floor_is_private(self):
+        """Test that floors without authored nodes are generated per run"""
+        state = self._enter_floor(2)
+        self.assertIsNone(state.floor_template.key)
+        self.assertEqual(state.get_current_node().type, 'start')
+        data = state.to_dict()
+        self.assertEqual(data['current_map']['ids'], [node.id for node in state.current_map])
+        self.assertEqual(GameState.from_dict(data).floor_template.node_dicts(),
+                         state.floor_template.node_dicts())
+        
+    def test_seeded_floor_shared_and_rebuilt(self):
+        """Test that runs with one seed share a floor that restores from its key"""
+        first = GameState()
+        first.run_seed = 'daily'
+        first.current_floor = 1
+        self.assertTrue(first.complete_floor())
+        second = GameState()
+        second.run_seed = 'daily'
+        second.current_floor = 1
+        second.complete_floor()
+        self.assertIs(first.floor_template, second.floor_template)
+        
+        data = first.to_dict()
+        self.assertEqual(data['floor_template'], 'seed:2:daily')
+        self.assertEqual(data['current_map'], [])
+        node_dicts = first.floor_template.node_dicts()
+        
+        # Evicted or restarted: the floor is regenerated identically from the seed
+        FloorTemplateRegistry.clear()
+        restored = GameState.from_dict(data)
+        self.assertIsNot(restored.floor_template, first.floor_template)
+        self.assertEqual(restored.floor_template.node_dicts(), node_dicts)
+        
+    def test_run_plan_floors_private_to_run(self):
+        """Test that a prebuilt run enters generated floors from its own plan"""
+        plan = RunBuilder(max_workers=1).build('prebuilt')
+        state = GameState()
+        state.run_seed = 'prebuilt'
+        state.run_plan = dict(plan['floors'])
+        state.current_floor = 1
+        with patch('backend.core.run_builder.generate_layout') as generate:
+            self.assertTrue(state.complete_floor())
+        generate.assert_not_called()
+        self.assertEqual(state.floor_template.key, 'seed:2:prebuilt')
+        self.assertEqual([node.id for node in state.current_map][-1], plan['floors'][2]['boss']['id'])
+        self.assertEqual(state.run_plan, {})
+        # The shared seed cache is left to runs that really share a seed
+        self.assertEqual(len(FloorTemplateRegistry._seeded), 0)
+        
+        # A restored run rebuilds the same floor from its seeded key
+        restored = GameState.from_dict(state.to_dict())
+        self.assertEqual(restored.floor_template.node_dicts(), state.floor_template.node_dicts())
+        
+    def test_missing_floor_ends_game(self):
+        """Test that completing the last floor ends the game"""
+        state = self._enter_floor(2)
+        self.assertFalse(state.complete_floor())
+        self.assertTrue(state.game_over)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import random
+import unittest
+from backend.core.floor_graph import FloorGraph
+from backend.core.layout_codec import (LayoutCodecError, decode_floor_graph, decode_layout,
+                                       encode_floor_graph, encode_layout)
+from backend.core.map_generator import generate_floor_layout
+
+FLOOR_DATA = {'node_count': {'min': 20, 'max': 30},
+              'node_types': {'question': {'weight': 50}, 'elite': {'weight': 20, 'difficulty_range': [2, 3]},
+                             'rest': {'weight': 30}}}
+
+class TestLayoutCodec(unittest.TestCase):
+    def test_generated_round_trip(self):
+        """Test that generated layouts survive encoding and JSON unchanged"""
+        for seed in range(20):
+            layout = generate_floor_layout(2, FLOOR_DATA, random.Random(seed))
+            encoded = json.loads(json.dumps(encode_layout(layout)))
+            self.assertEqual(decode_layout(encoded), layout)
+            self.assertIsNone(encoded['ids'])
+            
+    def test_encoding_is_smaller(self):
+        """Test that the encoding is much smaller than the dict shape"""
+        layout = generate_floor_layout(2, FLOOR_DATA, random.Random(1))
+        compact = len(json.dumps(encode_layout(layout), separators=(',', ':')))
+        self.assertLess(compact, len(json.dumps(layout, separators=(',', ':'))) // 2)
+        
+    def test_irregular_layout_round_trip(self):
+        """Test custom IDs, missing fields, odd values and extra keys"""
+        layout = {
+            'start': {'id': 'entry', 'type': 'start', 'paths': ['x', 'y'], 'visited': True},
+            'nodes': {
+                'x': {'id': 'x', 'type': 'question', 'position': {'row': 1, 'col': 0.5},
+                      'difficulty': 1, 'paths': ['y'], 'visited': 1, 'tags': ['a']},
+                'y': {'id': 'y', 'position': {'x': 3}, 'difficulty': 1.0, 'title': None,
+                      'paths': ['elsewhere']}
+            },
+            'boss': None,
+            'geometry': {'width': 3}
+        }
+        encoded = json.loads(json.dumps(encode_layout(layout)))
+        self.assertEqual(encoded['ids'], ['entry', 'x', 'y'])
+        decoded = decode_layout(encoded)
+        self.assertEqual(decoded, layout)
+        self.assertIs(type(decoded['nodes']['x']['visited']), int)
+        self.assertIs(type(decoded['nodes']['y']['difficulty']), float)
+        self.assertNotIn('position', decoded['start'])
+        
+    def test_rejects_other_data(self):
+        """Test that data of another format is refused"""
+        with self.assertRaises(LayoutCodecError):
+            decode_layout({'format': 'floor-csr'})
+        with self.assertRaises(LayoutCodecError):
+            decode_layout({'format': 'layout-csr', 'count': 2})
+            
+    def test_floor_graph_round_trip(self):
+        """Test that floor graphs keep nodes, metadata and irregular extras"""
+        node_dicts = [
+            {'id': 'start', 'type': 'start', 'position': {'row': 0, 'col': 1}, 'connections': ['a'],
+             'metadata': {}, 'visited': False},
+            {'id': 'a', 'type': 'question', 'position': {'row': 1, 'col': 1}, 'connections': ['boss', 'gone'],
+             'metadata': {'title': 'Q', 'difficulty': 2, 'tags': ['x']}, 'visited': False},
+            {'id': 'boss', 'type': 'boss', 'position': {'x': 1, 'y': 2}, 'connections': [],
+             'metadata': {'title': 'Boss'}, 'visited': False}
+        ]
+        graph = FloorGraph.from_dicts(node_dicts)
+        decoded = decode_floor_graph(json.loads(json.dumps(encode_floor_graph(graph))))
+        self.assertEqual([decoded.node_dict(i) for i in range(len(decoded))], node_dicts)
+        self.assertEqual(decoded.start_id, 'start')
+        self.assertTrue(decoded.is_connected('a', 'boss'))
+
+if __name__ == '__main__':
+    unittest.main()
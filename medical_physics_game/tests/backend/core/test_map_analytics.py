@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import patch
+import pytest
+from backend.core import map_generator
+from backend.core.map_analytics import analyze_layout, analyze_layout_batch, profile_floor_config
+from backend.core.map_generator import generate_floor_layouts
+
+FLOOR_DATA = {'node_count': {'min': 20, 'max': 40},
+              'node_types': {'elite': {'weight': 30, 'difficulty_range': [2, 4]}}}
+
+def node(node_id, node_type, row, difficulty, paths):
+    return {'id': node_id, 'type': node_type, 'position': {'row': row, 'col': 1},
+            'difficulty': difficulty, 'paths': paths}
+
+class TestAnalyzeLayout(unittest.TestCase):
+    def test_diamond(self):
+        """Test path counts, exposure and difficulty on start -> a|b -> c -> boss"""
+        layout = {
+            'start': {'id': 'start', 'paths': ['a', 'b']},
+            'nodes': {
+                'a': node('a', 'question', 1, 1, ['c']),
+                'b': node('b', 'elite', 1, 3, ['c']),
+                'c': node('c', 'rest', 2, 1, ['boss'])
+            },
+            'boss': {'id': 'boss', 'difficulty': 2, 'paths': []}
+        }
+        stats = analyze_layout(layout)
+        self.assertEqual(stats['path_count'], 2)
+        self.assertEqual(stats['expected_node_types'], {'question': 0.5, 'elite': 0.5, 'rest': 1.0})
+        self.assertEqual(stats['min_difficulty'], 4)
+        self.assertEqual(stats['max_difficulty'], 6)
+        
+    def test_no_path_to_boss(self):
+        """Test that a floor the boss cannot be reached on has no statistics"""
+        layout = {'start': {'id': 'start', 'paths': ['a']},
+                  'nodes': {'a': node('a', 'question', 1, 1, [])},
+                  'boss': {'id': 'boss', 'paths': []}}
+        self.assertIsNone(analyze_layout(layout))
+        
+    def test_batch_needs_numpy(self):
+        """Test that batch analytics report the missing dependency"""
+        with patch('backend.core.map_analytics.np', None):
+            with self.assertRaises(ImportError):
+                analyze_layout_batch(None)
+
+class TestBatchAnalytics(unittest.TestCase):
+    def setUp(self):
+        pytest.importorskip('numpy')
+        
+    def test_batch_matches_single(self):
+        """Test that the vectorized DP agrees with the per-layout one"""
+        batch = generate_floor_layouts(2, FLOOR_DATA, 50, seed=9)
+        stats = analyze_layout_batch(batch)
+        for i, layout in enumerate(batch):
+            single = analyze_layout(layout)
+            self.assertEqual(stats['path_count'][i], single['path_count'])
+            self.assertEqual(stats['min_difficulty'][i], single['min_difficulty'])
+            self.assertEqual(stats['max_difficulty'][i], single['max_difficulty'])
+            for code, name in enumerate(batch.type_names):
+                self.assertAlmostEqual(stats['expected_node_types'][i, code],
+                                       single['expected_node_types'].get(name, 0))
+                
+    def test_profile(self):
+        """Test the summary of a floor profile"""
+        profile = profile_floor_config(2, FLOOR_DATA, count=500, seed=1)
+        self.assertEqual(profile['layouts'], 500)
+        self.assertGreaterEqual(profile['path_count']['min'], 1)
+        self.assertLessEqual(profile['min_difficulty']['mean'], profile['max_difficulty']['mean'])
+        # Every regular row contributes exactly one node to a path
+        self.assertGreaterEqual(sum(profile['expected_node_types'].values()), map_generator.MIN_ROWS - 1)
+
+if __name__ == '__main__':
+    unittest.main()
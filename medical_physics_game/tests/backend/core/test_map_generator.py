@@ -0,0 +1,146 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+import pytest
+from backend.core import map_generator
+from backend.core.map_generator import (NodeTypeSampler, analyze_map, floor_rng,
+                                        generate_floor_layout, generate_floor_layouts,
+                                        node_type_sampler, validate_map, validate_maps)
+
+FLOOR_DATA = {'node_count': {'min': 20, 'max': 40},
+              'node_types': {'elite': {'weight': 30, 'difficulty_range': [2, 3]}}}
+
+class TestGenerateFloorLayout(unittest.TestCase):
+    def test_layout_structure(self):
+        """Test that a layout has at least 10 rows, links rows downward and ends at the boss"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            layout = generate_floor_layout(2, FLOOR_DATA, floor_rng(7, 2))
+        self.assertEqual(output.getvalue(), '')
+        self.assertTrue(validate_map(layout))
+        
+        nodes = layout['nodes']
+        boss_row = layout['boss']['position']['row']
+        self.assertGreaterEqual(boss_row, map_generator.MIN_ROWS)
+        for node in nodes.values():
+            row = node['position']['row']
+            self.assertIn(len(node['paths']), (1, 2, 3))
+            for target in node['paths']:
+                target_row = boss_row if target == 'boss' else nodes[target]['position']['row']
+                self.assertEqual(target_row, row + 1)
+                
+    def test_seeded_layouts_reproducible(self):
+        """Test that a run seed and floor always give the same layout"""
+        first = generate_floor_layout(2, FLOOR_DATA, floor_rng('daily-2024-01-01', 2))
+        second = generate_floor_layout(2, FLOOR_DATA, floor_rng('daily-2024-01-01', 2))
+        other_floor = generate_floor_layout(2, FLOOR_DATA, floor_rng('daily-2024-01-01', 3))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_floor)
+        
+    def test_links_prefer_closest_columns(self):
+        """Test that single links go to the nearest column of the next row"""
+        self.assertEqual(map_generator._nearest_columns(0, 3, 3)[0], 0)
+        self.assertEqual(map_generator._nearest_columns(2, 3, 1), [0])
+        self.assertEqual(map_generator._nearest_columns(1, 2, 3)[0], 2)
+        
+class TestNodeTypeSampler(unittest.TestCase):
+    def test_matches_weights(self):
+        """Test that alias-table draws follow the configured weights"""
+        sampler = NodeTypeSampler({'question': 3, 'rest': 1, 'shop': 0})
+        rng = floor_rng('sampler', 1)
+        draws = [sampler.sample(rng) for _ in range(20000)]
+        self.assertNotIn('shop', draws)
+        self.assertAlmostEqual(draws.count('question') / len(draws), 0.75, delta=0.02)
+        
+    def test_compiled_once_per_config(self):
+        """Test that a floor config compiles to one shared sampler"""
+        self.assertIs(node_type_sampler(FLOOR_DATA), node_type_sampler(dict(FLOOR_DATA)))
+        self.assertEqual(NodeTypeSampler({}).sample(floor_rng(1, 1)), 'question')
+        
+    def test_vectorized_draws(self):
+        """Test that batch draws follow the same distribution"""
+        np = pytest.importorskip('numpy')
+        sampler = NodeTypeSampler({'question': 1, 'rest': 3})
+        codes = sampler.sample_codes(np.random.default_rng(0), 20000)
+        self.assertAlmostEqual((codes == sampler.types.index('rest')).mean(), 0.75, delta=0.02)
+        
+class TestValidateMap(unittest.TestCase):
+    def make_layout(self):
+        """Diamond start -> a|b -> c -> boss"""
+        return {
+            'start': {'id': 'start', 'paths': ['a', 'b']},
+            'nodes': {
+                'a': {'id': 'a', 'paths': ['c']},
+                'b': {'id': 'b', 'paths': ['c']},
+                'c': {'id': 'c', 'paths': ['boss']}
+            },
+            'boss': {'id': 'boss', 'paths': []}
+        }
+        
+    def test_report(self):
+        """Test the diagnostics of a valid map"""
+        report = analyze_map(self.make_layout())
+        self.assertTrue(report['valid'])
+        self.assertEqual(report['unreachable'], [])
+        self.assertEqual(report['dead_ends'], [])
+        self.assertEqual(report['max_path_length'], 3)
+        self.assertEqual(report['branching']['max'], 2)
+        self.assertEqual(report['branching']['branch_nodes'], 1)
+        
+    def test_unreachable_and_dead_ends(self):
+        """Test that broken maps name the offending nodes"""
+        layout = self.make_layout()
+        layout['start']['paths'] = ['a']
+        layout['nodes']['a']['paths'] = ['c', 'd']
+        layout['nodes']['d'] = {'id': 'd', 'paths': []}
+        
+        report = analyze_map(layout)
+        self.assertFalse(validate_map(layout))
+        self.assertFalse(report['valid'])
+        self.assertEqual(report['unreachable'], ['b'])
+        self.assertEqual(report['dead_ends'], ['d'])
+        
+    def test_authored_floor_and_batch(self):
+        """Test authored node lists and batch validation"""
+        authored = [
+            {'id': 's', 'type': 'start', 'connections': ['q']},
+            {'id': 'q', 'type': 'question', 'connections': ['s', 'end']},
+            {'id': 'end', 'type': 'boss'}
+        ]
+        self.assertTrue(analyze_map(authored)['valid'])
+        # The cycle back to the start leaves no well-defined longest path
+        self.assertIsNone(analyze_map(authored)['max_path_length'])
+        
+        generated = [generate_floor_layout(1, FLOOR_DATA, floor_rng(seed, 1)) for seed in range(20)]
+        result = validate_maps(generated + [authored, {}])
+        self.assertEqual(result['total'], 22)
+        self.assertEqual(result['valid'], 21)
+        self.assertEqual(result['invalid'], [21])
+        self.assertGreaterEqual(result['max_path_length'], map_generator.MIN_ROWS)
+        
+class TestGenerateFloorLayouts(unittest.TestCase):
+    def setUp(self):
+        pytest.importorskip('numpy')
+        
+    def test_batch_layouts_valid(self):
+        """Test that batch layouts follow the single-layout rules"""
+        batch = generate_floor_layouts(2, FLOOR_DATA, 200, seed=3)
+        self.assertEqual(len(batch), 200)
+        
+        single = generate_floor_layout(2, FLOOR_DATA)
+        for layout in batch:
+            self.assertTrue(validate_map(layout))
+            node = next(iter(layout['nodes'].values()))
+            self.assertEqual(set(node), set(next(iter(single['nodes'].values()))))
+            for node in layout['nodes'].values():
+                if node['type'] == 'elite':
+                    self.assertIn(node['difficulty'], (2, 3))
+                    
+    def test_batch_seeded(self):
+        """Test that the same seed produces the same batch"""
+        first = generate_floor_layouts(1, FLOOR_DATA, 5, seed=11)
+        second = generate_floor_layouts(1, FLOOR_DATA, 5, seed=11)
+        self.assertEqual(list(first), list(second))
+
+if __name__ == '__main__':
+    unittest.main()
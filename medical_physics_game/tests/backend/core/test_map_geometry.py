@@ -0,0 +1,49 @@
+import random
+import unittest
+from backend.core.floor_templates import FloorTemplate
+from backend.core.layout_codec import decode_layout, encode_layout
+from backend.core.map_generator import generate_floor_layout
+from backend.core.map_geometry import compute_geometry, layout_geometry
+
+class TestMapGeometry(unittest.TestCase):
+    def test_uncrosses_swapped_rows(self):
+        """Test that a crossing pair of edges is reordered flat"""
+        geometry = compute_geometry([
+            ('start', 0, 1, ['a', 'b']),
+            ('a', 1, 0, ['d']),
+            ('b', 1, 2, ['c']),
+            ('c', 2, 0, ['boss']),
+            ('d', 2, 2, ['boss']),
+            ('boss', 3, 1, [])
+        ])
+        self.assertEqual(geometry['crossings'], 0)
+        self.assertEqual(geometry['rows'][2], ['d', 'c'])
+        self.assertEqual(geometry['positions']['d'], {'x': 0.0, 'y': 2})
+        self.assertEqual(geometry['positions']['boss'], {'x': 1.0, 'y': 3})
+        
+    def test_never_worse_than_columns(self):
+        """Test that sweeps never add crossings to generated layouts"""
+        for seed in range(30):
+            layout = generate_floor_layout(2, {}, random.Random(seed))
+            nodes = [layout['start']] + list(layout['nodes'].values()) + [layout['boss']]
+            records = [(node['id'], node['position']['row'], node['position']['col'], node['paths'])
+                       for node in nodes]
+            self.assertLessEqual(compute_geometry(records)['crossings'],
+                                 compute_geometry(records, max_sweeps=0)['crossings'])
+            
+    def test_cached_with_layout_and_template(self):
+        """Test that geometry is computed once and travels with the layout"""
+        layout = generate_floor_layout(2, {}, random.Random(1))
+        geometry = layout_geometry(layout)
+        self.assertIs(layout_geometry(layout), geometry)
+        self.assertEqual(set(geometry['positions']), {'start', 'boss', *layout['nodes']})
+        
+        template = FloorTemplate.from_layout(layout)
+        self.assertIs(template.geometry, geometry)
+        self.assertEqual(decode_layout(encode_layout(layout))['geometry'], geometry)
+        
+        # Templates without a cached geometry compute the same one from their graph
+        self.assertEqual(FloorTemplate(template.graph).geometry, geometry)
+
+if __name__ == '__main__':
+    unittest.main()
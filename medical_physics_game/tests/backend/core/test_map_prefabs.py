@@ -0,0 +1,60 @@
+import random
+import unittest
+from unittest.mock import patch
+from backend.core import map_prefabs
+from backend.core.map_generator import analyze_map
+from backend.core.map_prefabs import (CHUNK_ROWS, chunk_library, chunk_shapes, generate_layout,
+                                      synthesize_floor_layout)
+
+FLOOR_DATA = {'node_count': {'min': 28, 'max': 40},
+              'node_types': {'question': {'weight': 50, 'difficulty_range': [1, 3]}, 'rest': {'weight': 20}},
+              'boss': {'name': 'Chair', 'difficulty': 2}}
+
+class TestMapPrefabs(unittest.TestCase):
+    def test_chunk_shapes_cover_rows(self):
+        """Test that chunk shapes add up to the floor's rows, ending in the partial row"""
+        for rows in range(9, 15):
+            shapes = chunk_shapes(rows, 2)
+            self.assertEqual(sum(count for count, _ in shapes), rows)
+            self.assertTrue(all(shape == (CHUNK_ROWS, 3) for shape in shapes[:-1]))
+            self.assertEqual(shapes[-1][1], 2)
+            
+    def test_synthesized_layouts_valid(self):
+        """Test that assembled floors keep the generator's layout and invariants"""
+        for seed in range(50):
+            layout = synthesize_floor_layout(2, FLOOR_DATA, random.Random(seed))
+            report = analyze_map(layout)
+            self.assertTrue(report['valid'])
+            self.assertEqual(report['dead_ends'], [])
+            self.assertEqual(report['missing_targets'], [])
+            self.assertGreaterEqual(len(layout['nodes']), 28)
+            self.assertEqual(layout['boss']['title'], 'Chair')
+            rows = [node['position']['row'] for node in layout['nodes'].values()]
+            self.assertEqual(rows, sorted(rows))
+            
+    def test_reproducible(self):
+        """Test that a seed gives the same floor, library compiled or not"""
+        first = synthesize_floor_layout(2, FLOOR_DATA, random.Random(7))
+        map_prefabs._libraries.clear()
+        self.assertEqual(synthesize_floor_layout(2, FLOOR_DATA, random.Random(7)), first)
+        
+    def test_library_chunks_validated(self):
+        """Test that every compiled chunk is entered row by row and leads on"""
+        for chunk in chunk_library(2, FLOOR_DATA).chunks((CHUNK_ROWS, 3)):
+            self.assertEqual(len(chunk.rows), CHUNK_ROWS)
+            for upper, lower in zip(chunk.rows, chunk.rows[1:]):
+                entered = {target for *_, targets in upper for target in targets}
+                self.assertTrue(all(targets for *_, targets in upper))
+                first = sum(len(row) for row in chunk.rows[:chunk.rows.index(lower)])
+                self.assertEqual(entered, set(range(first, first + len(lower))))
+                
+    def test_synthesis_mode(self):
+        """Test that the configuration picks prefab synthesis"""
+        with patch.object(map_prefabs, 'synthesize_floor_layout') as synthesize:
+            generate_layout(2, dict(FLOOR_DATA, synthesis='prefab'))
+            synthesize.assert_called_once()
+            generate_layout(2, FLOOR_DATA)
+            synthesize.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
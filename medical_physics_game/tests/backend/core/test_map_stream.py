@@ -0,0 +1,87 @@
+import os
+import unittest
+from unittest.mock import patch
+from backend.core.floor_templates import FloorTemplateRegistry
+from backend.core.map_generator import analyze_map, validate_map
+from backend.core.map_stream import FloorStream
+from backend.core.state_manager import GameState
+
+FLOOR_DATA = {'id': 2, 'node_count': {'min': 30, 'max': 40}}
+
+class TestFloorStream(unittest.TestCase):
+    def test_generates_lookahead_only(self):
+        """Test that a new stream holds only the first rows"""
+        stream = FloorStream(2, FLOOR_DATA, 'seed', lookahead=3)
+        self.assertEqual(stream.rows_generated, 3)
+        self.assertLessEqual(len(stream.layout['nodes']), 9)
+        self.assertNotIn('boss', stream.layout)
+        self.assertTrue(validate_map(stream.layout))
+        
+    def test_advance_keeps_invariants(self):
+        """Test that walking the floor grows it row by row and ends at a valid map"""
+        stream = FloorStream(2, FLOOR_DATA, 'seed', lookahead=2)
+        node_id = 'start'
+        while node_id != 'boss':
+            stream.advance_to(node_id)
+            row = stream.row_of(node_id)
+            self.assertEqual(stream.rows_generated, min(row + 2, stream.row_total))
+            self.assertTrue(validate_map(stream.layout))
+            paths = (stream.layout['start'] if node_id == 'start' else stream.layout['nodes'][node_id])['paths']
+            self.assertTrue(paths)
+            node_id = paths[-1]
+        self.assertTrue(stream.complete)
+        report = analyze_map(stream.layout)
+        self.assertTrue(report['valid'])
+        self.assertEqual(report['dead_ends'], [])
+        self.assertEqual(report['missing_targets'], [])
+        
+    def test_deterministic_and_restorable(self):
+        """Test that a stream restored from its state regenerates the same rows"""
+        stream = FloorStream(2, FLOOR_DATA, 'seed', lookahead=2)
+        stream.ensure_row(6)
+        restored = FloorStream.from_dict(stream.to_dict(), FLOOR_DATA)
+        self.assertEqual(restored.layout, stream.layout)
+        
+        # Rows do not depend on when they were generated
+        whole = FloorStream(2, FLOOR_DATA, 'seed', lookahead=2)
+        whole.ensure_row(whole.row_total)
+        self.assertEqual({k: v for k, v in whole.layout['nodes'].items() if k in stream.layout['nodes']
+                          and v['position']['row'] < 6},
+                         {k: v for k, v in stream.layout['nodes'].items() if v['position']['row'] < 6})
+
+class TestStreamedRun(unittest.TestCase):
+    def setUp(self):
+        FloorTemplateRegistry.clear()
+        configs = {1: {'id': 1, 'node_count': {'min': 30, 'max': 30}}}
+        self.patchers = [patch.dict(os.environ, {'MAP_STREAM_LOOKAHEAD': '2'}),
+                         patch.object(FloorTemplateRegistry, '_floor_configs', configs)]
+        for patcher in self.patchers:
+            patcher.start()
+            
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        FloorTemplateRegistry.clear()
+        
+    def test_run_streams_and_saves_generator_state(self):
+        """Test that moving extends the floor and saves restore it from the seed"""
+        state = GameState()
+        state.run_seed = 'run'
+        state.current_floor = 0
+        self.assertTrue(state.complete_floor())
+        self.assertEqual(state.floor_stream.rows_generated, 2)
+        
+        first = state.get_available_moves()[0]
+        self.assertIsNotNone(state.move_to_node(first))
+        self.assertEqual(state.floor_stream.rows_generated, 3)
+        self.assertTrue(state.is_visited(first))
+        
+        data = state.to_dict()
+        self.assertEqual(data['current_map'], [])
+        self.assertEqual(data['floor_stream']['rows'], 3)
+        restored = GameState.from_dict(data)
+        self.assertEqual(restored.floor_template.node_dicts(), state.floor_template.node_dicts())
+        self.assertTrue(restored.is_visited(first))
+
+if __name__ == '__main__':
+    unittest.main()
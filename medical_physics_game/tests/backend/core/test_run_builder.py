@@ -0,0 +1,74 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from backend.core.map_generator import validate_map
+from backend.core.run_builder import RunBuilder, build_floor_layout, init_run_builder
+
+FLOORS = {
+    1: {'node_count': {'min': 20, 'max': 25}},
+    2: {'node_count': {'min': 25, 'max': 30}, 'node_types': {'elite': {'weight': 40}}},
+    3: {'nodes': [{'id': 'start', 'type': 'start', 'position': {'row': 0, 'col': 1}}]}
+}
+
+class TestRunBuilder(unittest.TestCase):
+    def test_inline_plan(self):
+        """Test that a run plan has every floor, validated and seeded per floor"""
+        plan = RunBuilder(max_workers=1).build('seed-1', FLOORS)
+        self.assertEqual(plan['run_seed'], 'seed-1')
+        self.assertEqual(plan['templates'], {3: 'floor:3'})
+        self.assertEqual(sorted(plan['floors']), [1, 2])
+        for floor_number, layout in plan['floors'].items():
+            self.assertTrue(validate_map(layout))
+            self.assertEqual(layout, build_floor_layout(floor_number, FLOORS[floor_number], 'seed-1'))
+        self.assertNotEqual(plan['floors'][1], RunBuilder(max_workers=1).build('seed-2', FLOORS)['floors'][1])
+        
+    def test_fallback_layout_when_generation_keeps_failing(self):
+        """Test that a floor that never validates gets the fallback layout"""
+        with patch('backend.core.run_builder.validate_map', return_value=False):
+            layout = build_floor_layout(1, FLOORS[1], 'seed-1')
+        self.assertTrue(validate_map(layout))
+        self.assertEqual(len(layout['nodes']), 9)
+        
+    def test_pooled_plan_matches_inline(self):
+        """Test that floors built in worker processes equal inline ones"""
+        builder = RunBuilder(max_workers=2)
+        try:
+            # Workers are spawned ahead of the first run
+            self.assertTrue(builder.start())
+            plan = builder.build('seed-1', FLOORS)
+        finally:
+            builder.shutdown()
+        self.assertEqual(builder.stats['pooled_floors'], 2)
+        self.assertEqual(plan, RunBuilder(max_workers=1).build('seed-1', FLOORS))
+        
+    def test_app_starts_pool_only_when_enabled(self):
+        """Test that building an app spawns no workers unless the config asks"""
+        with patch('backend.core.run_builder.get_run_builder') as get_builder:
+            self.assertFalse(init_run_builder(SimpleNamespace(config={'RUN_BUILDER_ENABLED': False})))
+            get_builder.assert_not_called()
+            
+            get_builder.return_value.start.return_value = True
+            self.assertTrue(init_run_builder(SimpleNamespace(config={'RUN_BUILDER_ENABLED': 'true'})))
+            get_builder.return_value.start.assert_called_once_with()
+            
+    def test_busy_pool_falls_back_inline(self):
+        """Test that builds beyond the pool's capacity run inline"""
+        builder = RunBuilder(max_workers=2)
+        for _ in range(2):
+            builder._slots.acquire()
+        with patch.object(builder, '_build_pooled') as pooled:
+            plan = builder.build('seed-1', FLOORS)
+        pooled.assert_not_called()
+        self.assertEqual(builder.stats['inline_floors'], 2)
+        self.assertEqual(sorted(plan['floors']), [1, 2])
+        
+    def test_pool_errors_fall_back_inline(self):
+        """Test that floors the pool fails to deliver are built inline"""
+        builder = RunBuilder(max_workers=2)
+        with patch.object(builder, '_get_executor', side_effect=OSError):
+            plan = builder.build('seed-1', FLOORS)
+        self.assertEqual(builder.stats['inline_floors'], 2)
+        self.assertTrue(all(validate_map(layout) for layout in plan['floors'].values()))
+
+if __name__ == '__main__':
+    unittest.main()
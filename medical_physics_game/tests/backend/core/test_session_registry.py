@@ -0,0 +1,197 @@
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from backend.core import session_registry
+from backend.core.session_registry import (FileSessionStore, SessionRegistry,
+                                           init_session_reaper, init_session_store)
+
+def touch(registry, session_id):
+    """Use a session for one request and return its state"""
+    with registry.session(session_id) as state:
+        return state
+
+class TestSessionRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = FileSessionStore(self.tmp_dir.name)
+        self.registry = SessionRegistry(store=self.store, max_sessions=2)
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_sessions_are_independent(self):
+        """Test that each session gets its own GameState"""
+        with self.registry.session('a') as state_a:
+            state_a.score = 10
+        with self.registry.session('b') as state_b:
+            state_b.score = 20
+            
+        self.assertIsNot(touch(self.registry, 'a'), touch(self.registry, 'b'))
+        self.assertEqual(touch(self.registry, 'a').score, 10)
+        
+    def test_lru_eviction_and_rehydration(self):
+        """Test that the working set is bounded and evicted sessions come back"""
+        for session_id, score in (('a', 1), ('b', 2), ('c', 3)):
+            with self.registry.session(session_id) as state:
+                state.score = score
+                
+        self.assertEqual(len(self.registry), 2)
+        self.assertNotIn('a', self.registry)
+        self.assertEqual(self.store.load('a')['score'], 1)
+        
+        self.assertEqual(touch(self.registry, 'a').score, 1)
+        self.assertEqual(self.registry.stats['rehydrated'], 1)
+        self.assertNotIn('b', self.registry)
+        
+    def test_locked_session_not_evicted(self):
+        """Test that a session in use stays in memory"""
+        entered = threading.Event()
+        release = threading.Event()
+        
+        def hold():
+            with self.registry.session('held'):
+                entered.set()
+                release.wait(1)
+                
+        worker = threading.Thread(target=hold)
+        worker.start()
+        entered.wait(1)
+        
+        for session_id in ('x', 'y', 'z'):
+            touch(self.registry, session_id)
+        self.assertIn('held', self.registry)
+        
+        release.set()
+        worker.join()
+        
+    def test_request_waits_for_eviction_write(self):
+        """Test that a session taken back while it is being evicted waits for its write"""
+        saving = threading.Event()
+        release = threading.Event()
+        save = self.store.save
+        
+        def slow_save(session_id, data):
+            saving.set()
+            release.wait(1)
+            return save(session_id, data)
+            
+        self.store.save = slow_save
+        with self.registry.session('a') as state:
+            state.score = 1
+        touch(self.registry, 'b')
+        evictor = threading.Thread(target=touch, args=(self.registry, 'c'))
+        evictor.start()
+        self.assertTrue(saving.wait(1))
+        
+        taken = []
+        
+        def take_back():
+            with self.registry.session('a') as state:
+                taken.append(release.is_set())
+                state.score = 2
+                
+        requester = threading.Thread(target=take_back)
+        requester.start()
+        requester.join(0.1)
+        self.assertEqual(taken, [])
+        
+        release.set()
+        evictor.join()
+        requester.join()
+        self.assertEqual(taken, [True])
+        self.assertEqual(self.store.load('a')['score'], 1)
+        self.assertEqual(touch(self.registry, 'a').score, 2)
+        
+    def test_discard_during_eviction_stays_discarded(self):
+        """Test that a session discarded while being evicted is not written back"""
+        saving = threading.Event()
+        release = threading.Event()
+        
+        def slow_save(session_id, data):
+            saving.set()
+            release.wait(1)
+            return FileSessionStore.save(self.store, session_id, data)
+            
+        self.store.save = slow_save
+        touch(self.registry, 'a')
+        touch(self.registry, 'b')
+        evictor = threading.Thread(target=touch, args=(self.registry, 'c'))
+        evictor.start()
+        self.assertTrue(saving.wait(1))
+        
+        discarder = threading.Thread(target=self.registry.discard, args=('a',))
+        discarder.start()
+        release.set()
+        evictor.join()
+        discarder.join()
+        self.assertIsNone(self.store.load('a'))
+        self.assertNotIn('a', self.registry)
+        
+    def test_pinned_session_not_evicted(self):
+        """Test that changes through a pinned session survive eviction pressure"""
+        registry = SessionRegistry(store=self.store, max_sessions=1)
+        state = registry.pin('a')
+        touch(registry, 'b')
+        state.score = 99
+        
+        self.assertIn('a', registry)
+        self.assertEqual(touch(registry, 'a').score, 99)
+        
+        registry.unpin('a')
+        touch(registry, 'b')
+        self.assertNotIn('a', registry)
+        self.assertEqual(self.store.load('a')['score'], 99)
+        
+    def test_flush_writes_current_state(self):
+        """Test that flush does not write back a state replaced while it ran"""
+        with self.registry.session('a') as state:
+            state.score = 1
+        with self.registry.session('b') as state:
+            state.score = 2
+        save = self.store.save
+        
+        def save_and_replace(session_id, data):
+            self.store.save = save
+            # Evict 'b' and bring it back as a new object while 'a' is written
+            touch(self.registry, 'c')
+            with self.registry.session('b') as state:
+                state.score = 5
+            return save(session_id, data)
+            
+        self.store.save = save_and_replace
+        self.registry.flush()
+        self.assertEqual(self.store.load('b')['score'], 5)
+        
+    def test_reaper_started_from_app_config(self):
+        """Test that the app starts the store's reaper with its configured age"""
+        store = Mock()
+        app = SimpleNamespace(config={'SESSION_MAX_AGE': 60, 'SESSION_REAP_INTERVAL': 5})
+        with patch('backend.core.session_registry.get_session_registry',
+                   return_value=SessionRegistry(store=store)):
+            self.assertTrue(init_session_reaper(app))
+            store.start_reaper.assert_called_once_with(60.0, 5.0)
+            
+            app.config['SESSION_MAX_AGE'] = 0
+            self.assertFalse(init_session_reaper(app))
+        self.assertEqual(store.start_reaper.call_count, 1)
+        
+    def test_app_store_opened_lazily(self):
+        """Test that the app config picks the session database without opening it"""
+        db_path = os.path.join(self.tmp_dir.name, 'sessions.db')
+        app = SimpleNamespace(config={'SESSION_DB_PATH': db_path, 'SESSION_MAX_AGE': 0})
+        with patch.object(session_registry, '_session_registry', None), \
+             patch.dict(session_registry._store_settings, clear=True):
+            init_session_store(app)
+            self.assertFalse(init_session_reaper(app))
+            self.assertFalse(os.path.exists(db_path))
+            
+            with session_registry.get_session_registry().session('a') as state:
+                state.score = 3
+            session_registry.get_session_registry().flush()
+            self.assertTrue(os.path.exists(db_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from backend.core.session_registry import SessionRegistry
+from backend.data.repositories.session_repo import ShardedSessionStore, SQLiteSessionStore
+
+class TestSQLiteSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'game_data.db')
+        self.store = SQLiteSessionStore(self.db_path)
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_upsert_round_trip(self):
+        """Test that saving twice keeps one compressed row with the latest data"""
+        self.assertTrue(self.store.save('run-1', {'score': 1}))
+        self.assertTrue(self.store.save('run-1', {'score': 2}))
+        
+        self.assertEqual(self.store.load('run-1'), {'score': 2})
+        self.assertEqual(self.store.count(), 1)
+        self.assertIsNone(self.store.load('missing'))
+        
+    def test_legacy_text_rows_readable(self):
+        """Test that rows written as plain JSON text still load"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO game_states VALUES ('old', '{\"score\": 5}', '2020-01-01T00:00:00+00:00')")
+        conn.commit()
+        conn.close()
+        
+        self.assertEqual(self.store.load('old')['score'], 5)
+        
+    def test_reap_abandoned_runs(self):
+        """Test that the reaper deletes only stale runs"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO game_states VALUES ('old', '{}', '2020-01-01T00:00:00+00:00')")
+        conn.commit()
+        conn.close()
+        self.store.save('fresh', {})
+        
+        self.assertEqual(self.store.reap(3600), 1)
+        self.assertIsNone(self.store.load('old'))
+        self.assertEqual(self.store.load('fresh'), {})
+        
+    def test_registry_backed_by_store(self):
+        """Test that evicted sessions are rehydrated from SQLite"""
+        registry = SessionRegistry(store=self.store, max_sessions=1)
+        with registry.session('a') as state:
+            state.score = 42
+        with registry.session('b'):
+            pass
+        
+        self.assertNotIn('a', registry)
+        with registry.session('a') as state:
+            self.assertEqual(state.score, 42)
+
+class TestShardedSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ShardedSessionStore(self.tmp_dir.name, shard_count=4)
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_runs_spread_over_shards(self):
+        """Test that runs land on the shard picked by their hash"""
+        for i in range(40):
+            self.assertTrue(self.store.save(f'run-{i}', {'score': i}))
+            
+        self.assertEqual(self.store.count(), 40)
+        self.assertTrue(all(shard.count() > 0 for shard in self.store.shards))
+        self.assertEqual(self.store.load('run-7'), {'score': 7})
+        self.assertEqual(self.store.shard_for('run-7').load('run-7'), {'score': 7})
+        
+    def test_rebalance(self):
+        """Test that changing the shard count moves runs without losing any"""
+        for i in range(40):
+            self.store.save(f'run-{i}', {'score': i})
+            
+        self.assertGreater(self.store.rebalance(7), 0)
+        self.assertEqual(len(self.store.shards), 7)
+        self.assertEqual(self.store.count(), 40)
+        for i in range(40):
+            self.assertEqual(self.store.load(f'run-{i}'), {'score': i})
+            
+        # A fresh store with the new count finds every run in place
+        reopened = ShardedSessionStore(self.tmp_dir.name, shard_count=7)
+        self.assertEqual(reopened.load('run-3'), {'score': 3})
+        reopened.rebalance(2)
+        self.assertEqual(reopened.count(), 40)
+        self.assertEqual(reopened.load('run-3'), {'score': 3})
+        
+    def test_put_rows_keeps_newer_row(self):
+        """Test that a moved copy never overwrites a later save"""
+        shard = self.store.shards[0]
+        shard.save('run-1', {'score': 2})
+        old_row = ('run-1', shard.encode({'score': 1}), '2020-01-01T00:00:00+00:00')
+        shard.put_rows([old_row])
+        self.assertEqual(shard.load('run-1'), {'score': 2})
+        
+    def test_saves_during_rebalance_survive(self):
+        """Test that runs saved while shards are rebalanced keep the new data"""
+        for i in range(40):
+            self.store.save(f'run-{i}', {'score': i})
+            
+        def save_all():
+            for i in range(40):
+                self.store.save(f'run-{i}', {'score': i + 100})
+                
+        saver = threading.Thread(target=save_all)
+        put_rows = SQLiteSessionStore.put_rows
+        
+        def put_rows_racing(shard, rows):
+            if not saver.is_alive() and saver.ident is None:
+                saver.start()
+            return put_rows(shard, rows)
+            
+        with patch.object(SQLiteSessionStore, 'put_rows', put_rows_racing):
+            self.store.rebalance(7)
+        saver.join()
+        
+        self.assertEqual(self.store.count(), 40)
+        for i in range(40):
+            self.assertEqual(self.store.load(f'run-{i}'), {'score': i + 100})
+            
+    def test_rebalance_starts_reapers_on_new_shards(self):
+        """Test that shards opened by a rebalance are reaped like the others"""
+        self.store.start_reaper(3600, 3600)
+        self.store.rebalance(6)
+        try:
+            self.assertTrue(all(shard._reaper is not None and shard._reaper.is_alive()
+                                for shard in self.store.shards))
+        finally:
+            self.store.stop_reaper()
+
+if __name__ == '__main__':
+    unittest.main()
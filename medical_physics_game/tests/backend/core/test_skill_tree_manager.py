@@ -0,0 +1,101 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from backend.core.skill_tree_index import SkillTreeIndex
+from backend.core.skill_tree_manager import SkillTreeManager
+from backend.data.models.skill_tree import SkillTreeNode
+
+def skill(node_id, prerequisites=(), cost=1, effects=None):
+    return SkillTreeNode(node_id, node_id.title(), '', cost, list(prerequisites), effects)
+
+TREE = [
+    skill('core'),
+    skill('dosimetry', ['core']),
+    skill('imaging', ['core'], effects=[{'type': 'max_hp', 'value': 5}]),
+    skill('planning', ['dosimetry', 'imaging'], cost=2),
+    skill('orphan', ['missing']),
+    skill('loop_a', ['loop_b']),
+    skill('loop_b', ['loop_a'])
+]
+
+class TestSkillTreeIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SkillTreeIndex(TREE)
+        
+    def test_compiled_structure(self):
+        """Test prerequisite masks, dependents and topological order"""
+        self.assertEqual(self.index.prerequisite_masks[3], 0b110)
+        self.assertEqual(self.index.dependents[0], (1, 2))
+        order = [self.index.ids[i] for i in self.index.order]
+        self.assertEqual(order[0], 'core')
+        self.assertLess(order.index('imaging'), order.index('planning'))
+        self.assertNotIn('loop_a', order)
+        
+    def test_masks(self):
+        """Test converting between node IDs and bitmasks"""
+        mask = self.index.mask_of(['imaging', 'core', 'unknown'])
+        self.assertEqual(mask, 0b101)
+        self.assertEqual(self.index.ids_of(mask), ['core', 'imaging'])
+        
+    def test_availability(self):
+        """Test availability as bit operations, with unreachable nodes blocked"""
+        self.assertEqual(self.index.ids_of(self.index.available_mask(0)), ['core'])
+        unlocked = self.index.mask_of(['core', 'dosimetry'])
+        self.assertEqual(self.index.ids_of(self.index.available_mask(unlocked)), ['imaging'])
+        unlocked |= 1 << 2
+        self.assertEqual(self.index.newly_available(2, unlocked), [3])
+        self.assertFalse(self.index.prerequisites_met(4, (1 << len(TREE)) - 1))
+        self.assertFalse(self.index.prerequisites_met(5, (1 << len(TREE)) - 1))
+
+class TestSkillTreeManager(unittest.TestCase):
+    def setUp(self):
+        self.character = SimpleNamespace(skill_points=3, unlocked_skills=['core'], max_hp=100, current_hp=90)
+        patchers = [
+            patch('backend.data.repositories.skill_tree_repo.SkillTreeRepository.get_skill_tree',
+                  return_value=TREE),
+            patch('backend.data.repositories.character_repo.CharacterRepository.get_character_by_id',
+                  return_value=self.character),
+            patch('backend.data.repositories.character_repo.CharacterRepository.update_character',
+                  create=True)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.manager = SkillTreeManager('resident')
+        
+    def test_available_nodes(self):
+        """Test that nodes with all prerequisites unlocked are available"""
+        self.assertEqual(self.manager.get_available_nodes(), ['dosimetry', 'imaging'])
+        self.assertTrue(self.manager.are_prerequisites_met('imaging'))
+        self.assertFalse(self.manager.are_prerequisites_met('planning'))
+        self.assertFalse(self.manager.are_prerequisites_met('nonexistent'))
+        
+    def test_unlock_updates_mask_and_character(self):
+        """Test unlocking spends points, applies effects and opens dependents"""
+        self.assertTrue(self.manager.unlock_node('imaging'))
+        self.assertFalse(self.manager.unlock_node('imaging'))
+        self.assertEqual(self.character.skill_points, 2)
+        self.assertEqual(self.character.unlocked_skills, ['core', 'imaging'])
+        self.assertEqual(self.character.max_hp, 105)
+        self.assertTrue(self.manager.unlock_node('dosimetry'))
+        
+        # Planning costs 2 with 1 point left
+        self.assertFalse(self.manager.can_unlock_node('planning'))
+        self.assertEqual(self.manager.get_node_details('planning')['status'], 'locked')
+        self.character.skill_points = 2
+        self.assertEqual(self.manager.get_node_details('planning')['status'], 'available')
+        self.assertEqual(self.manager.get_node_details('core')['status'], 'unlocked')
+        self.assertIsNone(self.manager.get_node_details('nonexistent'))
+        
+    def test_skill_tree_data(self):
+        """Test the UI data lists every node with its status and every edge"""
+        data = self.manager.get_skill_tree_data()
+        statuses = {node['id']: node['status'] for node in data['nodes']}
+        self.assertEqual(statuses['core'], 'unlocked')
+        self.assertEqual(statuses['dosimetry'], 'available')
+        self.assertEqual(statuses['orphan'], 'locked')
+        self.assertIn({'from': 'dosimetry', 'to': 'planning'}, data['connections'])
+        self.assertEqual(data['skill_points'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
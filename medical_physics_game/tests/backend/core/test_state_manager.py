@@ -0,0 +1,211 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+from backend.core.floor_graph import FloorGraph, VisitedSet
+from backend.core.floor_templates import FloorTemplate
+from backend.core.map_generator import generate_floor_layout
+from backend.core.save_journal import COMPACT_THRESHOLD, SaveJournal
+from backend.core.state_manager import GameState
+from backend.data.models.node import Node
+from state_helpers import make_state
+
+from backend.utils.save_writer import BackgroundSaver, get_background_saver
+
+class TestFloorGraph(unittest.TestCase):
+    def test_indexed_lookups(self):
+        """Test node lookup, start node and move validation through the index"""
+        state = make_state()
+        self.assertEqual(state._get_starting_node_id(), 'start')
+        self.assertEqual(state.get_current_node().id, 'start')
+        self.assertTrue(state._is_valid_move('a'))
+        self.assertFalse(state._is_valid_move('boss'))
+        
+        self.assertEqual(state.move_to_node('a').id, 'a')
+        self.assertTrue(state.is_visited('a'))
+        self.assertEqual(state.get_available_moves(), ['boss'])
+        self.assertIsNone(state.move_to_node('start'))
+        
+    def test_reassigning_map_rebuilds_index(self):
+        """Test that assigning current_map re-indexes the floor"""
+        state = make_state()
+        state.current_map = [Node('only', 'rest', {'row': 0, 'col': 0})]
+        self.assertEqual(state._get_starting_node_id(), 'only')
+        self.assertIsNone(state._get_node_by_id('a'))
+        
+    def test_compact_round_trip(self):
+        """Test that the array-backed floor rebuilds the same nodes"""
+        state = make_state()
+        node_dicts = [node.to_dict() for node in make_state().current_map]
+        graph = FloorGraph.from_dicts(node_dicts)
+        self.assertEqual([graph.node_dict(i) for i in range(len(graph))], node_dicts)
+        self.assertEqual(list(graph.neighbors(graph.index_of('start'))), [graph.index_of('a')])
+        self.assertEqual(state.floor_template.node_dicts(), node_dicts)
+        
+    def test_generated_floor_fits_arrays(self):
+        """Test that a generated floor's fractional columns stay in the arrays"""
+        layout = generate_floor_layout(1, {'node_count': {'min': 29, 'max': 29}}, random.Random(1))
+        graph = FloorTemplate.from_layout(layout).graph
+        self.assertEqual(graph._extra, {})
+        expected = [layout['start']] + list(layout['nodes'].values()) + [layout['boss']]
+        for node in expected:
+            self.assertEqual(graph.position(graph.index_of(node['id'])), node['position'])
+        
+    def test_edge_set_adjacency(self):
+        """Test that adjacency checks use the edge set and match the CSR rows"""
+        graph = make_state().floor_graph
+        self.assertEqual(len(graph.edges), len(graph.targets))
+        self.assertTrue(graph.is_connected('start', 'a'))
+        self.assertTrue(graph.is_connected('a', 'boss'))
+        self.assertFalse(graph.is_connected('start', 'boss'))
+        self.assertFalse(graph.is_connected('boss', 'a'))
+        self.assertFalse(graph.is_connected('start', 'missing'))
+        
+    def test_visited_bitset(self):
+        """Test that visits are kept as bits in visit order"""
+        visited = VisitedSet(3)
+        self.assertTrue(visited.add(9))
+        self.assertTrue(visited.add(2))
+        self.assertFalse(visited.add(9))
+        self.assertIn(2, visited)
+        self.assertNotIn(3, visited)
+        self.assertEqual(list(visited), [9, 2])
+        
+        state = make_state()
+        state.visited_nodes = ['boss', 'start', 'missing']
+        self.assertEqual(state.visited_nodes, ['boss', 'start'])
+
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patcher = patch('backend.core.save_journal.get_data_path', return_value=self.tmp_dir.name)
+        self.patcher.start()
+        
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+        
+    def test_incremental_save_appends_to_journal(self):
+        """Test that saves after the first only append change records"""
+        state = make_state()
+        self.assertTrue(state.save_game(0))
+        get_background_saver().flush()
+        snapshot_path = os.path.join(self.tmp_dir.name, 'save_0.sav')
+        snapshot_mtime = os.stat(snapshot_path).st_mtime_ns
+        
+        state.move_to_node('a')
+        state.update_reputation(5)
+        self.assertTrue(state.save_game(0))
+        get_background_saver().flush()
+        
+        self.assertEqual(os.stat(snapshot_path).st_mtime_ns, snapshot_mtime)
+        with open(os.path.join(self.tmp_dir.name, 'save_0.journal')) as f:
+            # Generation header plus one line per change
+            self.assertEqual(len(f.readlines()), 3)
+            
+    def test_load_replays_journal_tail(self):
+        """Test that loading applies the journal on top of the snapshot"""
+        state = make_state()
+        state.save_game(0)
+        state.move_to_node('a')
+        state.update_reputation(5)
+        state.save_game(0)
+        
+        loaded = GameState()
+        self.assertTrue(loaded.load_game(0))
+        self.assertEqual(loaded.current_node_id, 'a')
+        self.assertEqual(loaded.visited_nodes, ['a'])
+        self.assertEqual(loaded.reputation, 55)
+        
+    def test_compaction(self):
+        """Test that a long journal is folded into a new snapshot"""
+        state = make_state()
+        state.save_game(0)
+        state._journal.compact_threshold = 3
+        
+        for _ in range(4):
+            state.update_reputation(1)
+        state.save_game(0)
+        
+        self.assertEqual(state._journal.record_count, 0)
+        loaded = GameState()
+        loaded.load_game(0)
+        self.assertEqual(loaded.reputation, 54)
+        
+    def test_stale_journal_is_not_replayed(self):
+        """Test that a journal from an older snapshot is ignored"""
+        state = make_state()
+        state.save_game(0)
+        state.update_reputation(5)
+        state.save_game(0)
+        get_background_saver().flush()
+        journal_path = os.path.join(self.tmp_dir.name, 'save_0.journal')
+        with open(journal_path, 'rb') as f:
+            stale_journal = f.read()
+        
+        # Crash after the next snapshot landed but before the journal reset
+        state._needs_snapshot = True
+        state.save_game(0)
+        get_background_saver().flush()
+        with open(journal_path, 'wb') as f:
+            f.write(stale_journal)
+        
+        loaded = GameState()
+        loaded.load_game(0)
+        self.assertEqual(loaded.reputation, 55)
+        
+    def test_failed_compaction_is_redone(self):
+        """Test that records are not appended for a snapshot that failed to write"""
+        saver = BackgroundSaver(durability='batch', batch_window=0.05)
+        self.addCleanup(saver.stop)
+        journal = SaveJournal(0, self.tmp_dir.name, saver=saver)
+        self.assertTrue(journal.compact({'reputation': 50}))
+        self.assertTrue(journal.append([{'op': 'reputation_changed', 'reputation': 51}]))
+        saver.flush()
+        
+        # A directory in the way makes the next snapshot's rename fail
+        os.remove(journal.snapshot_path)
+        os.mkdir(journal.snapshot_path)
+        self.assertTrue(journal.compact({'reputation': 52}))
+        saver.flush()
+        self.assertFalse(journal.append([{'op': 'reputation_changed', 'reputation': 53}]))
+        self.assertTrue(journal.needs_compaction())
+        
+        os.rmdir(journal.snapshot_path)
+        self.assertTrue(journal.compact({'reputation': 53}))
+        # The retry was written before compact returned
+        self.assertTrue(os.path.isfile(journal.snapshot_path))
+        self.assertTrue(journal.append([{'op': 'reputation_changed', 'reputation': 54}]))
+        saver.flush()
+        snapshot, records = SaveJournal(0, self.tmp_dir.name, saver=saver).load()
+        self.assertEqual(snapshot, {'reputation': 53})
+        self.assertEqual(records, [{'op': 'reputation_changed', 'reputation': 54}])
+        
+    def test_unsaved_changes_stay_bounded(self):
+        """Test that changes never saved to a slot do not pile up"""
+        state = make_state()
+        state.save_game(0)
+        for _ in range(COMPACT_THRESHOLD * 3):
+            state.update_reputation(-1)
+            state.update_reputation(1)
+        self.assertLessEqual(len(state._pending_changes), COMPACT_THRESHOLD)
+        
+        state.update_reputation(7)
+        self.assertTrue(state.save_game(0))
+        loaded = GameState()
+        loaded.load_game(0)
+        self.assertEqual(loaded.reputation, 57)
+        
+    def test_shared_floor_recorded_by_key(self):
+        """Test that entering a shared floor records its key, not its graph"""
+        state = make_state()
+        state.save_game(0)
+        state.floor_template = FloorTemplate(state.floor_graph, key='floor:1')
+        state._record_floor_entered()
+        record = state._pending_changes[-1]
+        self.assertEqual(record['floor_template'], 'floor:1')
+        self.assertNotIn('current_map', record)
+
+if __name__ == '__main__':
+    unittest.main()
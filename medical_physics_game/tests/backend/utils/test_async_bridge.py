@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from backend.utils.async_bridge import EventBroker, run_sync, to_async
+
+class TestAsyncBridge(unittest.TestCase):
+    def test_run_sync_runs_off_loop_thread(self):
+        """Test that blocking calls run on a bridge thread"""
+        async def main():
+            return await run_sync(threading.current_thread)
+        thread = asyncio.run(main())
+        self.assertNotEqual(thread, threading.current_thread())
+        
+    def test_broker_publish_from_thread(self):
+        """Test that events published from sync code reach async subscribers"""
+        broker = EventBroker()
+        
+        async def main():
+            queue = broker.subscribe('run-1')
+            threading.Thread(target=broker.publish, args=('run-1', {'type': 'moved'})).start()
+            event = await asyncio.wait_for(queue.get(), 1)
+            broker.unsubscribe('run-1', queue)
+            return event
+            
+        self.assertEqual(asyncio.run(main()), (1, {'type': 'moved'}))
+        self.assertEqual(broker.subscriber_count(), 0)
+        
+    def test_events_between_polls_are_kept(self):
+        """Test that a poll with a cursor gets the events published since it"""
+        broker = EventBroker()
+        broker.publish('run-1', {'op': 'moved'})
+        broker.publish('run-1', {'op': 'answered'})
+        broker.publish('run-2', {'op': 'moved'})
+        
+        cursor, events = asyncio.run(broker.wait_for_events('run-1', 1, timeout=0.01))
+        self.assertEqual(cursor, 2)
+        self.assertEqual(events, [(2, {'op': 'answered'})])
+        
+        # Without a cursor only events from now on count
+        cursor, events = asyncio.run(broker.wait_for_events('run-1', timeout=0.01))
+        self.assertEqual((cursor, events), (2, []))
+        
+    def test_game_state_publishes_changes(self):
+        """Test that GameState changes reach the session's event channel"""
+        from backend.core.state_manager import GameState
+        from backend.utils.async_bridge import event_broker
+        
+        game_state = GameState()
+        game_state.event_channel = 'session-events-test'
+        game_state.update_reputation(5)
+        events = event_broker.events_since('session-events-test', 0)
+        self.assertEqual([event['op'] for _, event in events], ['reputation_changed'])
+
+class TestAsgiApp(unittest.TestCase):
+    def _call(self, path, query_string=b''):
+        from asgi import app
+        messages = []
+        
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+            
+        async def send(message):
+            messages.append(message)
+            
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query_string,
+                 'headers': [], 'http_version': '1.1', 'scheme': 'http', 'root_path': '',
+                 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234)}
+        asyncio.run(app(scope, receive, send))
+        return messages
+        
+    def test_flask_routes_served(self):
+        """Test that the Flask blueprints are reachable through ASGI"""
+        messages = self._call('/test')
+        self.assertEqual(messages[0]['status'], 200)
+        body = b''.join(m.get('body', b'') for m in messages[1:])
+        self.assertEqual(json.loads(body)['status'], 'ok')
+        
+    def test_long_poll_timeout(self):
+        """Test that an idle long-poll returns 204 after its timeout"""
+        messages = self._call('/api/poll/run-1', b'timeout=0.01')
+        self.assertEqual(messages[0]['status'], 204)
+        
+    def test_long_poll_cursor(self):
+        """Test that a long-poll returns the events published after its cursor"""
+        from backend.utils.async_bridge import event_broker
+        first = event_broker.publish('poll-cursor-test', {'op': 'moved'})
+        event_broker.publish('poll-cursor-test', {'op': 'answered'})
+        
+        messages = self._call('/api/poll/poll-cursor-test', f'timeout=0.01&cursor={first}'.encode())
+        self.assertEqual(messages[0]['status'], 200)
+        body = json.loads(messages[1]['body'])
+        self.assertEqual(body['cursor'], first + 1)
+        self.assertEqual(body['events'], [{'op': 'answered'}])
+        
+    def test_flask_requests_run_concurrently(self):
+        """Test that Flask requests are not serialized on one thread"""
+        import time
+        from asgi import ThreadPoolWsgiToAsgi
+        
+        def slow_app(environ, start_response):
+            time.sleep(0.2)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'ok']
+            
+        wrapped = ThreadPoolWsgiToAsgi(slow_app)
+        scope = {'type': 'http', 'method': 'GET', 'path': '/', 'query_string': b'',
+                 'headers': [], 'http_version': '1.1'}
+                 
+        async def request():
+            messages = []
+            
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+                
+            async def send(message):
+                messages.append(message)
+                
+            await wrapped(scope, receive, send)
+            return messages[0]['status']
+            
+        async def main():
+            return await asyncio.gather(*[request() for _ in range(4)])
+            
+        start = time.monotonic()
+        self.assertEqual(asyncio.run(main()), [200] * 4)
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_to_async_wraps_blocking_function(self):
+        """Test that to_async gives an awaitable run on a bridge thread"""
+        blocking = to_async(lambda value: (value, threading.current_thread()))
+        value, thread = asyncio.run(blocking(3))
+        self.assertEqual(value, 3)
+        self.assertIsNot(thread, threading.main_thread())
+
+class TestAsyncWrappers(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_async_repository_forwards_calls(self):
+        """Test that repository methods become awaitable"""
+        from backend.data.repositories.async_repo import AsyncRepository
+        class Repo:
+            name = 'repo'
+            @staticmethod
+            def get_by_id(item_id):
+                return {'id': item_id}
+        repo = AsyncRepository(Repo)
+        self.assertEqual(repo.name, 'repo')
+        self.assertEqual(asyncio.run(repo.get_by_id(7)), {'id': 7})
+        
+    def test_async_session_store_round_trip(self):
+        """Test saving and loading session data through the async store"""
+        from backend.core.session_registry import FileSessionStore
+        from backend.data.repositories.async_repo import async_session_store
+        store = async_session_store(FileSessionStore(self.tmp_dir.name))
+        async def main():
+            self.assertTrue(await store.save('run-1', {'score': 4}))
+            return await store.load('run-1')
+        self.assertEqual(asyncio.run(main()), {'score': 4})
+        
+    def test_execute_query_async(self):
+        """Test that queries run through the bridge return their rows"""
+        from backend.utils.db_utils import execute_query_async
+        db_path = os.path.join(self.tmp_dir.name, 'game_data.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE items (id INTEGER)")
+            conn.execute("INSERT INTO items VALUES (1)")
+        with patch('backend.utils.db_utils.get_data_path', return_value=self.tmp_dir.name):
+            rows = asyncio.run(execute_query_async("SELECT id FROM items"))
+        self.assertEqual([tuple(row) for row in rows], [(1,)])
+        
+    def test_save_and_load_game_async(self):
+        """Test that async save/load round-trip a game state"""
+        from backend.core.state_manager import GameState
+        from backend.data.models.node import Node
+        from backend.utils.save_writer import get_background_saver
+        with patch('backend.core.save_journal.get_data_path', return_value=self.tmp_dir.name):
+            state = GameState()
+            state.current_map = [Node('start', 'start', {'row': 0, 'col': 1})]
+            state.current_node_id = 'start'
+            state.update_reputation(5)
+            self.assertTrue(asyncio.run(state.save_game_async(0)))
+            loaded = GameState()
+            self.assertTrue(asyncio.run(loaded.load_game_async(0)))
+            get_background_saver().flush()
+        self.assertEqual(loaded.reputation, state.reputation)
+
+if __name__ == '__main__':
+    unittest.main()
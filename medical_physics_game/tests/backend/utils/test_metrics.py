@@ -0,0 +1,38 @@
+import unittest
+from app import create_app
+from backend.utils.metrics import Histogram
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        """Test that bucket samples are cumulative and end with +Inf"""
+        histogram = Histogram('latency', 'test', ('route',), buckets=(0.1, 1))
+        histogram.observe(0.05, '/a')
+        histogram.observe(0.5, '/a')
+        histogram.observe(5, '/a')
+        
+        samples = {(name, labels): value for name, labels, value in histogram.samples()}
+        self.assertEqual(samples[('latency_bucket', '{route="/a",le="0.1"}')], 1)
+        self.assertEqual(samples[('latency_bucket', '{route="/a",le="1"}')], 2)
+        self.assertEqual(samples[('latency_bucket', '{route="/a",le="+Inf"}')], 3)
+        self.assertEqual(samples[('latency_count', '{route="/a"}')], 3)
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('test')
+        self.client = self.app.test_client()
+        
+    def test_route_metrics_exposed(self):
+        """Test that requests show up in the Prometheus output"""
+        self.client.get('/api/characters')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        
+        body = response.get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_bucket{blueprint="api",route="/api/characters",method="GET",le="+Inf"}', body)
+        self.assertIn('http_requests_total{blueprint="api",route="/api/characters",method="GET",status="200"}', body)
+        self.assertIn('# TYPE http_requests_in_flight gauge', body)
+        self.assertIn('# TYPE admission_requests_total counter', body)
+        self.assertEqual(body.count('# TYPE admission_requests_total'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import unittest
+from unittest.mock import patch
+from app import create_app
+from backend.utils.rate_limiter import AdmissionController, TokenBucket
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_reject(self):
+        """Test that a bucket allows its burst and then reports a wait"""
+        bucket = TokenBucket(capacity=2, rate=1)
+        self.assertEqual(bucket.consume(), 0)
+        self.assertEqual(bucket.consume(), 0)
+        self.assertGreater(bucket.consume(), 0)
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.controller = AdmissionController({
+            'write': {'endpoints': ['feedback.submit_feedback'], 'rate': 0, 'burst': 10, 'max_concurrent': 1}
+        })
+        
+    def test_concurrency_cap(self):
+        """Test that the route class rejects requests beyond its concurrency cap"""
+        self.assertEqual(self.controller.admit('write', 'a'), (None, 0))
+        status, retry_after = self.controller.admit('write', 'b')
+        self.assertEqual(status, 503)
+        self.controller.release('write')
+        self.assertEqual(self.controller.admit('write', 'b'), (None, 0))
+        
+        stats = self.controller.get_stats()['route_classes']['write']
+        self.assertEqual(stats['admitted'], 2)
+        self.assertEqual(stats['over_capacity'], 1)
+        
+    def test_unlisted_endpoint_not_limited(self):
+        """Test that gameplay endpoints are not classified"""
+        self.assertIsNone(self.controller.classify('api.get_game_state'))
+
+class TestRateLimitedRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('test')
+        self.client = self.app.test_client()
+        
+    def test_feedback_rate_limited(self):
+        """Test that a client over its burst gets 429 with Retry-After"""
+        statuses = [self.client.post('/api/feedback', json={'content': 'hi'}).status_code
+                    for _ in range(5)]
+        self.assertEqual(statuses, [200] * 5)
+        
+        response = self.client.post('/api/feedback', json={'content': 'hi'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+        
+        # Gameplay routes are unaffected
+        self.assertEqual(self.client.get('/api/game_state').status_code, 200)
+        
+    def test_forwarded_for_does_not_reset_bucket(self):
+        """Test that a spoofed X-Forwarded-For does not get a fresh bucket"""
+        statuses = [self.client.post('/api/feedback', json={'content': 'hi'},
+                                     headers={'X-Forwarded-For': f'10.0.0.{i}'}).status_code
+                    for i in range(6)]
+        self.assertEqual(statuses[-1], 429)
+        
+    def test_trusted_proxy_hops(self):
+        """Test that with a trusted proxy, clients are told apart by its forwarded address"""
+        with patch.dict(os.environ, {'PROXY_FIX_HOPS': '1'}):
+            client = create_app('test').test_client()
+        for address in ('10.0.0.1', '10.0.0.2'):
+            statuses = [client.post('/api/feedback', json={'content': 'hi'},
+                                    headers={'X-Forwarded-For': f'6.6.6.6, {address}'}).status_code
+                        for _ in range(5)]
+            self.assertEqual(statuses, [200] * 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import unittest
+from unittest.mock import patch
+from backend.utils import save_format
+from backend.utils.save_format import SaveFormatError, decode_save, encode_save
+
+SAVE_DATA = {
+    'character': {'id': 'resident', 'name': 'Resident'},
+    'current_floor': 2,
+    'current_map': [{'id': f'node_{i}', 'type': 'question', 'position': {'row': i, 'col': 1},
+                     'connections': [f'node_{i + 1}'], 'metadata': {}, 'visited': False}
+                    for i in range(30)],
+    'visited_nodes': ['node_0'],
+    'current_node_id': 'node_0',
+    'score': 10,
+    'reputation': 52,
+    'game_over': False
+}
+
+class TestSaveFormat(unittest.TestCase):
+    def test_round_trip(self):
+        """Test that encoded saves decode to the same data"""
+        self.assertEqual(decode_save(encode_save(SAVE_DATA)), SAVE_DATA)
+        
+    def test_smaller_than_legacy_json(self):
+        """Test that the binary format is several times smaller than indented JSON"""
+        legacy = json.dumps(SAVE_DATA, indent=2).encode('utf-8')
+        self.assertLess(len(encode_save(SAVE_DATA)) * 4, len(legacy))
+        
+    def test_legacy_json_migrated(self):
+        """Test that headerless JSON saves load as version 0 and gain missing fields"""
+        data = decode_save(json.dumps({'current_floor': 3}, indent=2))
+        self.assertEqual(data['current_floor'], 3)
+        self.assertEqual(data['reputation'], 50)
+        self.assertEqual(data['visited_nodes'], [])
+        
+    def test_migrations_chain_lazily(self):
+        """Test that a new version's migration runs on older saves at load time"""
+        old_blob = encode_save({'score': 1})
+        new_version = save_format.CURRENT_VERSION + 1
+        with patch.object(save_format, 'CURRENT_VERSION', new_version), \
+                patch.dict(save_format._migrations, {new_version - 1: lambda d: dict(d, score=d['score'] * 10)}):
+            self.assertEqual(decode_save(old_blob), {'score': 10})
+            
+    def test_newer_version_rejected(self):
+        """Test that saves from a newer version raise SaveFormatError"""
+        blob = save_format.HEADER.pack(save_format.MAGIC, 99) + b'x'
+        with self.assertRaises(SaveFormatError):
+            decode_save(blob)
+
+if __name__ == '__main__':
+    unittest.main()
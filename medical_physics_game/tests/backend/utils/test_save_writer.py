@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from backend.utils.save_writer import BackgroundSaver
+
+class TestBackgroundSaver(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'save_0.sav')
+        self.saver = BackgroundSaver(durability='batch', batch_window=0.05)
+        
+    def tearDown(self):
+        self.saver.stop()
+        self.tmp_dir.cleanup()
+        
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+        
+    def test_write_replaces_file(self):
+        """Test that a write lands atomically and leaves no temp file"""
+        ticket = self.saver.write(self.path, b'first')
+        self.assertTrue(ticket.wait(5))
+        self.assertEqual(self.read(), b'first')
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+        
+    def test_writes_are_coalesced(self):
+        """Test that queued writes to one file collapse to the newest"""
+        tickets = [self.saver.write(self.path, str(i).encode()) for i in range(5)]
+        self.assertTrue(self.saver.flush(5))
+        self.assertTrue(all(ticket.success for ticket in tickets))
+        self.assertEqual(self.read(), b'4')
+        self.assertLessEqual(self.saver.stats['written'], 2)
+        
+    def test_appends_follow_write(self):
+        """Test that appends keep their order after a queued rewrite"""
+        self.saver.write(self.path, b'header\n')
+        self.saver.append(self.path, b'one\n')
+        self.saver.append(self.path, b'two\n')
+        self.assertTrue(self.saver.flush(5))
+        self.assertEqual(self.read(), b'header\none\ntwo\n')
+        
+    def test_ordered_write_follows_dependency(self):
+        """Test that a write ordered after another lands only after it"""
+        journal_path = os.path.join(self.tmp_dir.name, 'save_0.journal')
+        # Queued first, so the batch would otherwise rename it first
+        self.saver.append(journal_path, b'old\n')
+        snapshot = self.saver.write(self.path, b'snapshot')
+        replaced = []
+        original_replace = os.replace
+        
+        def replace(src, dst):
+            replaced.append(dst)
+            original_replace(src, dst)
+            
+        with patch('os.replace', side_effect=replace):
+            journal = self.saver.write(journal_path, b'reset\n', after=snapshot)
+            self.assertTrue(journal.wait(5))
+        self.assertEqual(replaced, [self.path, journal_path])
+        
+    def test_ordered_write_dropped_when_dependency_fails(self):
+        """Test that a write ordered after a failed one is not made"""
+        journal_path = os.path.join(self.tmp_dir.name, 'save_0.journal')
+        with open(journal_path, 'wb') as f:
+            f.write(b'records\n')
+        # A directory in the way makes the snapshot's rename fail
+        os.mkdir(self.path)
+        snapshot = self.saver.write(self.path, b'snapshot')
+        journal = self.saver.write(journal_path, b'reset\n', after=snapshot)
+        self.assertFalse(journal.wait(5))
+        self.assertFalse(snapshot.success)
+        with open(journal_path, 'rb') as f:
+            self.assertEqual(f.read(), b'records\n')
+        
+    def test_sync_mode_blocks(self):
+        """Test that sync durability returns only after the write is done"""
+        saver = BackgroundSaver(durability='sync', batch_window=0)
+        try:
+            ticket = saver.write(self.path, b'done')
+            self.assertTrue(ticket.success)
+            self.assertEqual(self.read(), b'done')
+        finally:
+            saver.stop()
+            
+    def test_unknown_durability(self):
+        """Test that an unknown durability mode is rejected"""
+        with self.assertRaises(ValueError):
+            BackgroundSaver(durability='eventually')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,16 @@
 import pytest
 from app import create_app
 
+@pytest.fixture(autouse=True, scope='session')
+def session_db(tmp_path_factory):
+    """Keep sessions created by tests out of the tracked game_data.db"""
+    directory = tmp_path_factory.mktemp('sessions')
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv('SESSION_DB_PATH', str(directory / 'game_data.db'))
+        monkeypatch.setenv('SESSION_SHARD_DIR', str(directory / 'shards'))
+        monkeypatch.setattr('backend.core.session_registry._session_registry', None)
+        yield directory
+
 @pytest.fixture
 def app():
     app = create_app('test')